@@ -17,31 +17,31 @@ public class PlayerStatsController : ControllerBase
     }
 
     // GET /api/tournaments/4/players
+    // PlayerLeaderboard is written pre-joined and ranked by the importer, so this
+    // is one clustered range scan on (MundialitoId, Rank): no joins, no sort
     [HttpGet]
     public async Task<ActionResult<IEnumerable<PlayerTournamentStatDto>>> GetPlayerStats(int tournamentId)
     {
         var query =
-            from pts in _db.PlayerTournamentStats
-            join p in _db.Players on pts.PlayerId equals p.PlayerId
-            join t in _db.Teams on pts.TeamId equals t.TeamId
-            where pts.MundialitoId == tournamentId
-            orderby pts.Goals descending, pts.Assists descending
+            from lb in _db.PlayerLeaderboard.AsNoTracking()
+            where lb.MundialitoId == tournamentId
+            orderby lb.Rank
             select new PlayerTournamentStatDto
             {
-                PlayerId = pts.PlayerId,
-                PlayerName = p.Name,
-                TeamId = pts.TeamId,
-                TeamName = t.TeamName,
-                TeamAbbr = t.TeamAbbr,
-                MundialitoId = pts.MundialitoId,
-                GamesPlayed = pts.GamesPlayed,
-                GamesWon = pts.GamesWon,
-                GamesDrawn = pts.GamesDrawn,
-                GamesLost = pts.GamesLost,
-                Goals = pts.Goals,
-                Assists = pts.Assists,
-                CleanSheets = pts.CleanSheets,
-                GoalsConceded = pts.GoalsConceded
+                PlayerId = lb.PlayerId,
+                PlayerName = lb.PlayerName,
+                TeamId = lb.TeamId,
+                TeamName = lb.TeamName,
+                TeamAbbr = lb.TeamAbbr,
+                MundialitoId = lb.MundialitoId,
+                GamesPlayed = lb.GamesPlayed,
+                GamesWon = lb.GamesWon,
+                GamesDrawn = lb.GamesDrawn,
+                GamesLost = lb.GamesLost,
+                Goals = lb.Goals,
+                Assists = lb.Assists,
+                CleanSheets = lb.CleanSheets,
+                GoalsConceded = lb.GoalsConceded
             };
 
         var stats = await query.ToListAsync();
@@ -14,6 +14,7 @@ public class MundialitoDbContext : DbContext
     public DbSet<Player> Players { get; set; }
     public DbSet<Team> Teams { get; set; }
     public DbSet<Mundialitos> Mundialitos { get; set; }
+    public DbSet<PlayerLeaderboard> PlayerLeaderboard { get; set; }
 
     protected override void OnModelCreating(ModelBuilder modelBuilder)
     {
@@ -41,6 +42,12 @@ public class MundialitoDbContext : DbContext
             entity.HasKey(e => e.MundialitoId);
         });
 
+        modelBuilder.Entity<PlayerLeaderboard>(entity =>
+        {
+            entity.ToTable("PlayerLeaderboard");
+            entity.HasKey(e => new { e.MundialitoId, e.Rank });
+        });
+
         base.OnModelCreating(modelBuilder);
     }
 }
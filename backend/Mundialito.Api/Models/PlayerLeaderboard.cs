@@ -0,0 +1,34 @@
+namespace Mundialito.Api.Models;
+
+// One row of a tournament's player list as the importer writes it:
+// names copied in, already ranked (see stats/scripts/data_processing/leaderboard.py)
+public class PlayerLeaderboard
+{
+    public int MundialitoId { get; set; }
+    public int Rank { get; set; }
+
+    public int PlayerId { get; set; }
+    public string PlayerName { get; set; } = string.Empty;
+
+    public int TeamId { get; set; }
+    public string TeamName { get; set; } = string.Empty;
+    public string TeamAbbr { get; set; } = string.Empty;
+
+    public int GamesPlayed { get; set; }
+    public int GamesWon { get; set; }
+    public int GamesDrawn { get; set; }
+    public int GamesLost { get; set; }
+
+    public int Goals { get; set; }
+    public int Assists { get; set; }
+
+    public int? CleanSheets { get; set; }
+    public int? GoalsConceded { get; set; }
+
+    public bool IsMVP { get; set; }
+    public bool IsGoldenBoot { get; set; }
+    public bool IsPlaymaker { get; set; }
+
+    public int GoalsRank { get; set; }
+    public int AssistsRank { get; set; }
+}
@@ -0,0 +1,164 @@
+-- SQLite mirror of schema.sql for local runs, tests and benchmarks.
+-- Same tables, keys, defaults and foreign keys; IDENTITY columns become INTEGER PRIMARY KEY.
+-- Secondary indexes, SchemaVersion and ImportCheckpoint are added by stats/scripts/data_processing/schema_migrations.py.
+
+CREATE TABLE IF NOT EXISTS Mundialitos (
+    MundialitoId INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Date TEXT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Players (
+    PlayerId INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS Teams (
+    TeamId INTEGER PRIMARY KEY,
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    TeamName TEXT NOT NULL,
+    TeamAbbr TEXT NOT NULL,
+    CONSTRAINT UQ_Teams_Mundialito_Abbr UNIQUE (MundialitoId, TeamAbbr),
+    CONSTRAINT UQ_Teams_Mundialito_TeamName UNIQUE (MundialitoId, TeamName)
+);
+
+-- GameId is packed from (MundialitoId, TeamAId, TeamBId, Game), see game_ids.py;
+-- GameCode is the former text id, for display
+
+CREATE TABLE IF NOT EXISTS Games (
+    GameId INTEGER NOT NULL,
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    TeamAId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    TeamBId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    GoalsA INTEGER NOT NULL,
+    GoalsB INTEGER NOT NULL,
+    GameCode TEXT NULL,
+    CONSTRAINT PK_Games PRIMARY KEY (GameId)
+);
+
+CREATE TABLE IF NOT EXISTS PlayerGameStats (
+    GameId INTEGER NOT NULL REFERENCES Games (GameId) ON DELETE CASCADE,
+    PlayerId INTEGER NOT NULL REFERENCES Players (PlayerId),
+    TeamId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    OppTeamId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    WL TEXT NOT NULL,
+    Goals INTEGER NOT NULL,
+    Assists INTEGER NOT NULL,
+    GoalsConceded INTEGER NOT NULL,
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    CONSTRAINT PK_PlayerGameStats PRIMARY KEY (GameId, PlayerId)
+);
+
+CREATE TABLE IF NOT EXISTS PlayerTournamentStats (
+    PlayerId INTEGER NOT NULL REFERENCES Players (PlayerId),
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    TeamId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    GamesPlayed INTEGER NOT NULL DEFAULT 0,
+    GamesWon INTEGER NOT NULL DEFAULT 0,
+    GamesLost INTEGER NOT NULL DEFAULT 0,
+    Goals INTEGER NOT NULL DEFAULT 0,
+    Assists INTEGER NOT NULL DEFAULT 0,
+    CleanSheets INTEGER NULL,
+    GoalsConceded INTEGER NULL,
+    GamesDrawn INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT PK_PlayerTournamentStats PRIMARY KEY (PlayerId, MundialitoId)
+);
+
+CREATE TABLE IF NOT EXISTS PlayerAwards (
+    PlayerID INTEGER NOT NULL REFERENCES Players (PlayerId),
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    IsMVP INTEGER NULL DEFAULT 0,
+    IsGoldenBoot INTEGER NULL DEFAULT 0,
+    IsPlaymaker INTEGER NULL DEFAULT 0,
+    PRIMARY KEY (PlayerID, MundialitoId)
+);
+
+CREATE TABLE IF NOT EXISTS TeamTournamentStats (
+    TeamId INTEGER NOT NULL REFERENCES Teams (TeamId),
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    GamesPlayed INTEGER NOT NULL DEFAULT 0,
+    GamesWon INTEGER NOT NULL DEFAULT 0,
+    GamesLost INTEGER NOT NULL DEFAULT 0,
+    Goals INTEGER NOT NULL DEFAULT 0,
+    GoalsConceded INTEGER NULL DEFAULT 0,
+    CleanSheets INTEGER NULL DEFAULT 0,
+    IsChampion INTEGER NOT NULL DEFAULT 0,
+    Assists INTEGER NULL,
+    GamesDrawn INTEGER NULL,
+    CONSTRAINT PK_TeamTournamentStats PRIMARY KEY (TeamId, MundialitoId)
+);
+
+-- All-time totals, maintained incrementally by the importer (see career_stats.py)
+
+CREATE TABLE IF NOT EXISTS PlayerCareerStats (
+    PlayerId INTEGER NOT NULL REFERENCES Players (PlayerId),
+    Tournaments INTEGER NOT NULL DEFAULT 0,
+    GamesPlayed INTEGER NOT NULL DEFAULT 0,
+    GamesWon INTEGER NOT NULL DEFAULT 0,
+    GamesDrawn INTEGER NOT NULL DEFAULT 0,
+    GamesLost INTEGER NOT NULL DEFAULT 0,
+    Goals INTEGER NOT NULL DEFAULT 0,
+    Assists INTEGER NOT NULL DEFAULT 0,
+    CleanSheets INTEGER NOT NULL DEFAULT 0,
+    GoalsConceded INTEGER NOT NULL DEFAULT 0,
+    MVPs INTEGER NOT NULL DEFAULT 0,
+    GoldenBoots INTEGER NOT NULL DEFAULT 0,
+    Playmakers INTEGER NOT NULL DEFAULT 0,
+    GoalsPerGame REAL NOT NULL DEFAULT 0,
+    AssistsPerGame REAL NOT NULL DEFAULT 0,
+    WinRate REAL NOT NULL DEFAULT 0,
+    CONSTRAINT PK_PlayerCareerStats PRIMARY KEY (PlayerId)
+);
+
+CREATE TABLE IF NOT EXISTS TeamHistory (
+    TeamName TEXT NOT NULL,
+    Tournaments INTEGER NOT NULL DEFAULT 0,
+    GamesPlayed INTEGER NOT NULL DEFAULT 0,
+    GamesWon INTEGER NOT NULL DEFAULT 0,
+    GamesDrawn INTEGER NOT NULL DEFAULT 0,
+    GamesLost INTEGER NOT NULL DEFAULT 0,
+    Goals INTEGER NOT NULL DEFAULT 0,
+    Assists INTEGER NOT NULL DEFAULT 0,
+    CleanSheets INTEGER NOT NULL DEFAULT 0,
+    GoalsConceded INTEGER NOT NULL DEFAULT 0,
+    Championships INTEGER NOT NULL DEFAULT 0,
+    GoalsPerGame REAL NOT NULL DEFAULT 0,
+    WinRate REAL NOT NULL DEFAULT 0,
+    CONSTRAINT PK_TeamHistory PRIMARY KEY (TeamName)
+);
+
+-- Content hashes of the last import per tournament, so unchanged ones are skipped (see manifest.py)
+
+CREATE TABLE IF NOT EXISTS ImportManifest (
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    InputHash TEXT NULL,
+    StagingHash TEXT NOT NULL,
+    ImportedAt TEXT NOT NULL,
+    CONSTRAINT PK_ImportManifest PRIMARY KEY (MundialitoId)
+);
+
+-- Denormalized, pre-sorted player table per tournament for the API (see leaderboard.py)
+
+CREATE TABLE IF NOT EXISTS PlayerLeaderboard (
+    MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId),
+    Rank INTEGER NOT NULL,
+    PlayerId INTEGER NOT NULL,
+    PlayerName TEXT NOT NULL,
+    TeamId INTEGER NOT NULL,
+    TeamName TEXT NOT NULL,
+    TeamAbbr TEXT NOT NULL,
+    GamesPlayed INTEGER NOT NULL,
+    GamesWon INTEGER NOT NULL,
+    GamesDrawn INTEGER NOT NULL,
+    GamesLost INTEGER NOT NULL,
+    Goals INTEGER NOT NULL,
+    Assists INTEGER NOT NULL,
+    CleanSheets INTEGER NULL,
+    GoalsConceded INTEGER NULL,
+    IsMVP INTEGER NOT NULL DEFAULT 0,
+    IsGoldenBoot INTEGER NOT NULL DEFAULT 0,
+    IsPlaymaker INTEGER NOT NULL DEFAULT 0,
+    GoalsRank INTEGER NOT NULL,
+    AssistsRank INTEGER NOT NULL,
+    CONSTRAINT PK_PlayerLeaderboard PRIMARY KEY (MundialitoId, Rank)
+);
@@ -0,0 +1,163 @@
+"""
+Tournament aggregations: aggregation.py vs. the lambda-based derive_tables it replaced.
+
+Checks that both produce identical tables, then times them on synthetic
+tournaments of growing size (rows = teams*(teams-1) * games-per-pairing * players).
+
+Run from this folder:
+    python bench_aggregation.py
+    python bench_aggregation.py --teams 20 60 150 300 --legacy-max 300000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import make_tournament, player_names  # noqa: E402
+from csv_creator_current import validate_input, compute_awards, assign_ids, build_staging  # noqa: E402
+from aggregation import aggregate  # noqa: E402
+from import_data_current import TABLE_COLUMNS  # noqa: E402
+
+EMPTY_REGISTRY = {"players": {}, "max_player_id": 0, "teams": {}, "max_team_id": 0}
+
+
+def make_staging(n_teams, players_per_team, games_per_pairing):
+    df = make_tournament(n_teams, players_per_team, games_per_pairing, player_names(n_teams * players_per_team))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = validate_input(df)
+        ids = assign_ids(df, 1, EMPTY_REGISTRY)
+        return build_staging(df, 1, ids, compute_awards(df))
+
+
+def legacy_derive(df):
+    """derive_tables as it was before aggregation.py (prints removed)."""
+    games_df = (
+        df.assign(
+            TeamAId=lambda x: x[["TeamId", "OppId"]].min(axis=1),
+            TeamBId=lambda x: x[["TeamId", "OppId"]].max(axis=1),
+        )
+        .assign(
+            GoalsA=lambda x: x["Goals"].where(x["TeamId"] == x["TeamAId"], 0),
+            GoalsB=lambda x: x["GoalsConceded"].where(x["TeamId"] == x["TeamAId"], 0),
+        )
+        .groupby(["GameId", "MundialitoId", "TeamAId", "TeamBId"], as_index=False, observed=True)
+        .agg(
+            GoalsA=("GoalsA", "sum"),
+            GoalsB=("GoalsB", "max"),
+        )
+    )
+
+    pgs_df = df.rename(columns={"OppId": "OppTeamId"})
+
+    pts_df = df.groupby(
+        ["PlayerId", "TeamName", "TeamId", "TeamAbbr", "MundialitoId"],
+        as_index=False,
+        observed=True
+    ).agg(
+        GamesPlayed=("WL", "count"),
+        GamesWon=("WL", lambda x: (x == "W").sum()),
+        GamesDrawn=("WL", lambda x: (x == "D").sum()),
+        GamesLost=("WL", lambda x: (x == "L").sum()),
+        Goals=("Goals", "sum"),
+        Assists=("Assists", "sum"),
+        GoalsConceded=("GoalsConceded", "sum"),
+        CleanSheets=("CleanSheet", "sum"),
+    )
+
+    awards_df = (
+        df.groupby(["PlayerId", "MundialitoId"], as_index=False, observed=True)
+          .agg({
+              "IsMVP": "max",
+              "IsGoldenBoot": "max",
+              "IsPlaymaker": "max",
+          })
+    )
+
+    tts_df = pts_df.groupby(
+        ["TeamId", "MundialitoId"],
+        as_index=False,
+        observed=True
+    ).agg(
+        GamesPlayed=("GamesPlayed", "max"),
+        GamesWon=("GamesWon", "max"),
+        GamesDrawn=("GamesDrawn", "max"),
+        GamesLost=("GamesLost", "max"),
+        Goals=("Goals", "sum"),
+        Assists=("Assists", "sum"),
+        GoalsConceded=("GoalsConceded", "max"),
+        CleanSheets=("CleanSheets", "max"),
+    )
+
+    max_wins = tts_df["GamesWon"].max()
+    tts_df["IsChampion"] = tts_df["GamesWon"].apply(
+        lambda w: 1 if w == max_wins else 0
+    )
+
+    return {
+        "Games": games_df,
+        "PlayerGameStats": pgs_df,
+        "PlayerTournamentStats": pts_df,
+        "PlayerAwards": awards_df,
+        "TeamTournamentStats": tts_df,
+    }
+
+
+def check_identical(df):
+    new, old = aggregate(df), legacy_derive(df)
+
+    for table, columns in TABLE_COLUMNS.items():
+        # the legacy code predates Games.GameCode
+        names = [c for c, _ in columns if c in old[table]]
+        a = new[table][names].reset_index(drop=True)
+        b = old[table][names].reset_index(drop=True)
+        pd.testing.assert_frame_equal(a, b, check_dtype=False)
+        assert np.array_equal(a.to_numpy(), b.to_numpy()), table
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[8, 30, 100, 220])
+    parser.add_argument("--players", type=int, default=10, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--legacy-max", type=int, default=500_000,
+                        help="skip the lambda version above this many rows (it is slow)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'players':>8} {'aggregate (s)':>14} {'rows/s':>12} {'legacy (s)':>11} {'speedup':>8}")
+
+    for n_teams in args.teams:
+        df = make_staging(n_teams, args.players, args.games_per_pairing)
+
+        new = best_of(aggregate, df, args.repeat)
+
+        if len(df) <= args.legacy_max:
+            check_identical(df)
+            legacy = best_of(legacy_derive, df, 1)
+            legacy_str, speedup = f"{legacy:11.3f}", f"{legacy / new:7.1f}x"
+        else:
+            legacy_str, speedup = f"{'-':>11}", f"{'-':>8}"
+
+        players = df["PlayerId"].nunique()
+        print(f"{len(df):>10,} {players:>8,} {new:14.4f} {len(df) / new:12,.0f} {legacy_str} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
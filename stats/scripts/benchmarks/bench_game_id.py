@@ -0,0 +1,202 @@
+"""
+Games / PlayerGameStats keyed by the old text GameId vs. the packed integer one.
+
+Builds the Games and PlayerGameStats rows of synthetic tournaments, writes them
+into two SQLite databases, one per key layout (the text layout as before
+game_ids.py, the packed one from schema_sqlite.sql), and reports:
+
+    - the pages each table and index takes (dbstat, after VACUUM)
+    - the best time of a full PlayerGameStats-Games join with a GROUP BY
+    - the best time of per-game lookups (one game and its player rows, by key)
+
+The join results are checked to be the same in both layouts.
+
+Run from this folder:
+    python bench_game_id.py
+    python bench_game_id.py --tournaments 50 --teams 24
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import make_tournament, player_names  # noqa: E402
+from aggregation import aggregate  # noqa: E402
+from csv_creator_current import validate_input, compute_awards, assign_ids, build_staging  # noqa: E402
+from storage import SQLITE_SCHEMA  # noqa: E402
+
+TEXT_DDL = [
+    """CREATE TABLE Games (
+        GameId TEXT NOT NULL,
+        MundialitoId INTEGER NOT NULL,
+        TeamAId INTEGER NOT NULL,
+        TeamBId INTEGER NOT NULL,
+        GoalsA INTEGER NOT NULL,
+        GoalsB INTEGER NOT NULL,
+        CONSTRAINT PK_Games PRIMARY KEY (GameId)
+    )""",
+    """CREATE TABLE PlayerGameStats (
+        GameId TEXT NOT NULL REFERENCES Games (GameId) ON DELETE CASCADE,
+        PlayerId INTEGER NOT NULL,
+        TeamId INTEGER NOT NULL,
+        OppTeamId INTEGER NOT NULL,
+        WL TEXT NOT NULL,
+        Goals INTEGER NOT NULL,
+        Assists INTEGER NOT NULL,
+        GoalsConceded INTEGER NOT NULL,
+        MundialitoId INTEGER NOT NULL,
+        CONSTRAINT PK_PlayerGameStats PRIMARY KEY (GameId, PlayerId)
+    )""",
+]
+
+GAME_COLUMNS = ["GameId", "MundialitoId", "TeamAId", "TeamBId", "GoalsA", "GoalsB"]
+PGS_COLUMNS = ["GameId", "PlayerId", "TeamId", "OppTeamId", "WL", "Goals", "Assists", "GoalsConceded", "MundialitoId"]
+
+JOIN_SQL = """
+    SELECT g.MundialitoId, g.TeamAId, COUNT(*), SUM(s.Goals), SUM(g.GoalsA)
+    FROM PlayerGameStats s JOIN Games g ON g.GameId = s.GameId
+    GROUP BY g.MundialitoId, g.TeamAId
+"""
+
+LOOKUP_SQL = """
+    SELECT g.GoalsA, g.GoalsB, s.PlayerId, s.Goals
+    FROM Games g JOIN PlayerGameStats s ON s.GameId = g.GameId
+    WHERE g.GameId = ?
+"""
+
+
+def packed_ddl():
+    with open(SQLITE_SCHEMA, "r") as f:
+        return [
+            s.replace("IF NOT EXISTS ", "").split("\n\n")[-1]
+            for s in f.read().split(";")
+            if "CREATE TABLE IF NOT EXISTS Games " in s or "CREATE TABLE IF NOT EXISTS PlayerGameStats " in s
+        ]
+
+
+def make_rows(n_tournaments, n_teams, players_per_team, games_per_pairing):
+    """(games, player game stats) frames of n_tournaments tournaments, team ids unique per tournament."""
+    pool = player_names(2 * n_teams * players_per_team)
+    games, pgs = [], []
+
+    for mund_id in range(1, n_tournaments + 1):
+        df = make_tournament(n_teams, players_per_team, games_per_pairing, pool, seed=mund_id)
+        registry = {"players": {}, "max_player_id": 0, "teams": {}, "max_team_id": (mund_id - 1) * n_teams}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = validate_input(df)
+            tables = aggregate(build_staging(df, mund_id, assign_ids(df, mund_id, registry), compute_awards(df)))
+
+        games.append(tables["Games"])
+        pgs.append(tables["PlayerGameStats"])
+
+    return games, pgs
+
+
+def build_db(path, ddl, games, pgs, text_ids):
+    conn = sqlite3.connect(path)
+
+    for statement in ddl:
+        conn.execute(statement)
+
+    for g, s in zip(games, pgs):
+        if text_ids:
+            # the old id is what GameCode keeps
+            code = dict(zip(g["GameId"], g["GameCode"]))
+            g = g.assign(GameId=g["GameCode"])
+            s = s.assign(GameId=s["GameId"].map(code))
+
+        conn.executemany(
+            f"INSERT INTO Games ({', '.join(GAME_COLUMNS)}) VALUES ({', '.join('?' * len(GAME_COLUMNS))})",
+            g[GAME_COLUMNS].astype(object).itertuples(index=False, name=None),
+        )
+        conn.executemany(
+            f"INSERT INTO PlayerGameStats ({', '.join(PGS_COLUMNS)}) VALUES ({', '.join('?' * len(PGS_COLUMNS))})",
+            s[PGS_COLUMNS].astype(object).itertuples(index=False, name=None),
+        )
+
+    conn.commit()
+    conn.execute("VACUUM")
+    return conn
+
+
+def page_counts(conn):
+    """{table or index: pages}; Games' own b-tree is its primary key when the key is the rowid."""
+    return dict(conn.execute(
+        "SELECT name, COUNT(*) FROM dbstat WHERE name NOT LIKE 'sqlite_%' OR name LIKE 'sqlite_autoindex%' GROUP BY name"
+    ).fetchall())
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tournaments", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--players", type=int, default=10, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--lookups", type=int, default=5000, help="games looked up one by one")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    games, pgs = make_rows(args.tournaments, args.teams, args.players, args.games_per_pairing)
+    n_games, n_rows = sum(len(g) for g in games), sum(len(s) for s in pgs)
+    print(f"{args.tournaments} tournaments, {n_games:,} games, {n_rows:,} player game rows\n")
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, ddl, text_ids in [("text", TEXT_DDL, True), ("packed", packed_ddl(), False)]:
+            conn = build_db(os.path.join(work_dir, f"{name}.db"), ddl, games, pgs, text_ids)
+
+            try:
+                keys = [k for (k,) in conn.execute("SELECT GameId FROM Games ORDER BY random()").fetchall()]
+                keys = (keys * (args.lookups // len(keys) + 1))[:args.lookups]
+
+                def lookups():
+                    for key in keys:
+                        conn.execute(LOOKUP_SQL, (key,)).fetchall()
+
+                results[name] = {
+                    "pages": page_counts(conn),
+                    "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+                    "join_rows": sorted(conn.execute(JOIN_SQL).fetchall()),
+                    "join": best_of(lambda: conn.execute(JOIN_SQL).fetchall(), args.repeat),
+                    "lookup": best_of(lookups, args.repeat),
+                }
+            finally:
+                conn.close()
+
+    assert results["text"]["join_rows"] == results["packed"]["join_rows"], "join results differ"
+
+    names = sorted(set(results["text"]["pages"]) | set(results["packed"]["pages"]))
+    print(f"{'b-tree':<40} {'text (KiB)':>11} {'packed (KiB)':>13}")
+    for btree in names + ["total"]:
+        sizes = []
+        for name in ("text", "packed"):
+            pages = results[name]["pages"]
+            count = sum(pages.values()) if btree == "total" else pages.get(btree, 0)
+            sizes.append(count * results[name]["page_size"] / 1024)
+        print(f"{btree:<40} {sizes[0]:11,.0f} {sizes[1]:13,.0f}")
+
+    print(f"\n{'query':<40} {'text (ms)':>11} {'packed (ms)':>13} {'speedup':>8}")
+    for query, label in [("join", "join + GROUP BY"), ("lookup", f"{args.lookups:,} game lookups")]:
+        text, packed = results["text"][query] * 1000, results["packed"][query] * 1000
+        print(f"{label:<40} {text:11.1f} {packed:13.1f} {text / packed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
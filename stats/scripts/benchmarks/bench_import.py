@@ -0,0 +1,232 @@
+"""
+Import phase: sequential import_staging vs. concurrent_import over parallel
+connections vs. set_import (one bulk load, tables derived in the database).
+
+Builds staging for synthetic tournaments of growing size, imports each one into
+a fresh SQLite database every way, checks the databases end up identical, and
+reports the best time of each, with its speedup over sequential. SQLite round
+trips are almost free, so --latency-ms adds a delay to every execute/executemany
+to stand in for the network round trip to SQL Server, which is what the
+concurrent mode overlaps and the set-based mode avoids.
+
+Then the same tournaments are imported again over a database already holding
+them, with --changed of the staging rows altered, by import_staging (delete and
+reinsert) and upsert_import (only the rows that differ), and it reports how
+long each held the write lock: from its first INSERT/UPDATE/DELETE to commit.
+
+Run from this folder:
+    python bench_import.py
+    python bench_import.py --teams 8 24 48 --latency-ms 2 --workers 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import make_tournament, player_names  # noqa: E402
+from csv_creator_current import validate_input, compute_awards, assign_ids, build_staging  # noqa: E402
+from import_data_current import import_staging  # noqa: E402
+from concurrent_import import import_staging_concurrent  # noqa: E402
+from set_import import import_staging_set_based  # noqa: E402
+from upsert_import import upsert_staging  # noqa: E402
+from storage import CountingCursor, SqliteStorage  # noqa: E402
+
+EMPTY_REGISTRY = {"players": {}, "max_player_id": 0, "teams": {}, "max_team_id": 0}
+
+TABLES = [
+    "Players", "Teams", "Games", "PlayerGameStats", "PlayerTournamentStats",
+    "PlayerAwards", "TeamTournamentStats", "PlayerCareerStats", "TeamHistory",
+]
+
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+class LatencyCursor(CountingCursor):
+    def __init__(self, cursor, storage):
+        super().__init__(cursor)
+        self._storage = storage
+
+    def execute(self, *args):
+        self._storage.round_trip(args[0])
+        return super().execute(*args)
+
+    def executemany(self, *args):
+        self._storage.round_trip(args[0])
+        return super().executemany(*args)
+
+
+class LatencyStorage(SqliteStorage):
+    """
+    SqliteStorage whose every round trip (loader connections included) takes latency
+    seconds longer, and which times its first write transaction (lock_seconds).
+    """
+
+    def __init__(self, path, latency):
+        super().__init__(path)
+        self.latency = latency
+        self.first_write = None
+        self.lock_seconds = None
+
+    def cursor(self):
+        return LatencyCursor(self.conn.cursor(), self)
+
+    def open_loader(self, slot):
+        return LatencyStorage(self.loader_path(slot), self.latency)
+
+    def round_trip(self, sql):
+        time.sleep(self.latency)
+
+        # SQLite takes the write lock at the transaction's first write and keeps it to commit
+        if self.first_write is None and sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+            self.first_write = time.perf_counter()
+
+    def commit(self):
+        super().commit()
+
+        if self.first_write is not None and self.lock_seconds is None:
+            self.lock_seconds = time.perf_counter() - self.first_write
+
+
+def make_staging(n_teams, players_per_team, games_per_pairing):
+    df = make_tournament(n_teams, players_per_team, games_per_pairing, player_names(n_teams * players_per_team))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = validate_input(df)
+        ids = assign_ids(df, 1, EMPTY_REGISTRY)
+        return build_staging(df, 1, ids, compute_awards(df))
+
+
+def run_import(work_dir, name, df, chunk_size, latency, workers):
+    """Import df into a fresh database named name; workers > 1 is concurrent, 0 set-based."""
+    path = os.path.join(work_dir, f"{name}.db")
+    for stale in [path] + [os.path.join(work_dir, f) for f in os.listdir(work_dir) if f.startswith(f"{name}.db.")]:
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    storage = LatencyStorage(path, latency)
+    storage.ensure_schema()
+
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if workers > 1:
+                import_staging_concurrent(storage, df, "2026-01-01", chunk_size, workers)
+            elif workers == 0:
+                import_staging_set_based(storage, df, "2026-01-01", chunk_size)
+            else:
+                import_staging(storage, df, "2026-01-01", chunk_size)
+        return time.perf_counter() - start, path
+    finally:
+        storage.close()
+
+
+def change_rows(df, fraction, seed=0):
+    """df as imported again: its players and teams registered, Assists + 1 on fraction of its rows."""
+    changed = df.assign(IsNewPlayer=False, IsNewTeam=False)
+    rows = changed.sample(frac=fraction, random_state=seed).index
+    changed.loc[rows, "Assists"] += 1
+    return changed, len(rows)
+
+
+def run_reimport(work_dir, name, base, df, chunk_size, latency):
+    """Import df over a copy of the database at base; returns the seconds the write lock was held, and the path."""
+    path = os.path.join(work_dir, f"{name}.db")
+    shutil.copyfile(base, path)
+
+    storage = LatencyStorage(path, latency)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if name == "upsert":
+                upsert_staging(storage, df, "2026-01-01", chunk_size)
+            else:
+                import_staging(storage, df, "2026-01-01", chunk_size)
+        return storage.lock_seconds, path
+    finally:
+        storage.close()
+
+
+def table_contents(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall()) for t in TABLES}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[8, 24, 48])
+    parser.add_argument("--players", type=int, default=10, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every DB round trip")
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction of staging rows changed for re-import")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+
+    print(f"latency {args.latency_ms} ms/round trip, {args.workers} workers, chunk size {args.chunk_size}\n")
+    print(f"{'rows':>10} {'sequential (s)':>15} {'concurrent (s)':>15} {'speedup':>8} {'set-based (s)':>14} {'speedup':>8}")
+
+    modes = {"sequential": 1, "concurrent": args.workers, "set_based": 0}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        stored = {}
+
+        for n_teams in args.teams:
+            df = make_staging(n_teams, args.players, args.games_per_pairing)
+
+            best = dict.fromkeys(modes, float("inf"))
+            paths = {}
+            for _ in range(args.repeat):
+                for name, workers in modes.items():
+                    took, paths[name] = run_import(work_dir, name, df, args.chunk_size, latency, workers)
+                    best[name] = min(best[name], took)
+
+            expected = table_contents(paths["sequential"])
+            for name in ("concurrent", "set_based"):
+                assert table_contents(paths[name]) == expected, f"{name} import differs"
+
+            sequential = best["sequential"]
+            print(
+                f"{len(df):>10,} {sequential:15.3f} {best['concurrent']:15.3f} {sequential / best['concurrent']:7.2f}x "
+                f"{best['set_based']:14.3f} {sequential / best['set_based']:7.2f}x"
+            )
+            # the sequential database is rewritten for the next size: keep a copy to import over
+            stored[n_teams] = (df, os.path.join(work_dir, f"stored_{n_teams}.db"))
+            shutil.copyfile(paths["sequential"], stored[n_teams][1])
+
+        print(f"\nimported again, {args.changed:.0%} of the rows changed: seconds the write lock was held\n")
+        print(f"{'rows':>10} {'changed':>8} {'replace (s)':>12} {'upsert (s)':>11} {'saved':>7}")
+
+        for n_teams, (df, base) in stored.items():
+            changed, n_changed = change_rows(df, args.changed)
+
+            best = dict.fromkeys(("replace", "upsert"), float("inf"))
+            paths = {}
+            for _ in range(args.repeat):
+                for name in best:
+                    took, paths[name] = run_reimport(work_dir, name, base, changed, args.chunk_size, latency)
+                    best[name] = min(best[name], took)
+
+            assert table_contents(paths["upsert"]) == table_contents(paths["replace"]), "upsert import differs"
+
+            print(
+                f"{len(df):>10,} {n_changed:>8,} {best['replace']:12.3f} {best['upsert']:11.3f} "
+                f"{1 - best['upsert'] / best['replace']:7.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
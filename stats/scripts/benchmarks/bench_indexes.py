@@ -0,0 +1,186 @@
+"""
+Per-tournament deletes and reads with and without the schema_migrations.py indexes.
+
+Imports a long synthetic history (set-based, into SQLite) with the bare
+schema_sqlite.sql tables, copies the database and applies the migrations to
+the copy, then times on both:
+
+    delete       the importer's DELETE ... WHERE MundialitoId = ? on every
+                 per-tournament table, rolled back
+    stored rows  upsert_import's read of a tournament's stored rows, every table
+    derive TTS   the TeamTournamentStats derivation's SELECT for one tournament
+    player games one player's PlayerGameStats, grouped by tournament
+    re-import    a whole tournament imported again (what --force does)
+
+each over a spread of tournaments (or players), best of --repeat, and checks
+both databases return the same rows.
+
+Run from this folder:
+    python bench_indexes.py
+    python bench_indexes.py --tournaments 200 --teams 24
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import make_tournament, player_names  # noqa: E402
+from csv_creator_current import validate_input, compute_awards, assign_ids, build_staging, load_existing_ids  # noqa: E402
+from import_data_current import TABLE_COLUMNS  # noqa: E402
+from schema_migrations import migrate  # noqa: E402
+from upsert_import import fetch_stored  # noqa: E402
+from set_import import DERIVE_SQL, import_staging_set_based  # noqa: E402
+from storage import SQLITE_SCHEMA, SqliteStorage  # noqa: E402
+
+DELETE_TABLES = ["PlayerLeaderboard", "ImportManifest"] + list(reversed(list(TABLE_COLUMNS)))
+
+PLAYER_GAMES_SQL = """
+    SELECT MundialitoId, COUNT(*), SUM(Goals), SUM(Assists)
+    FROM PlayerGameStats WHERE PlayerId = ?
+    GROUP BY MundialitoId ORDER BY MundialitoId
+"""
+
+
+def make_staging(storage, mund_id, n_teams, players_per_team, games_per_pairing, pool):
+    df = make_tournament(n_teams, players_per_team, games_per_pairing, pool, seed=mund_id)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = validate_input(df)
+        ids = assign_ids(df, mund_id, load_existing_ids(storage))
+        return build_staging(df, mund_id, ids, compute_awards(df))
+
+
+def build_history(path, args):
+    """Import args.tournaments tournaments into a database with no secondary indexes; returns the last staging."""
+    storage = SqliteStorage(path)
+    pool = player_names(2 * args.teams * args.players)
+
+    try:
+        with open(SQLITE_SCHEMA, "r") as f:
+            storage.conn.executescript(f.read())
+
+        for mund_id in range(1, args.tournaments + 1):
+            df = make_staging(storage, mund_id, args.teams, args.players, args.games_per_pairing, pool)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                import_staging_set_based(storage, df, "2026-01-01")
+    finally:
+        storage.close()
+
+    return df
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(path, df, mund_ids, player_ids, repeat):
+    """{name: (best seconds, result)} for each workload against the database at path."""
+    storage = SqliteStorage(path)
+    conn = storage.conn
+    cursor = storage.cursor()
+    results = {}
+
+    def delete():
+        counts = []
+        for mund_id in mund_ids:
+            conn.execute("BEGIN")
+            counts.append([conn.execute(f"DELETE FROM {t} WHERE MundialitoId = ?", (mund_id,)).rowcount
+                           for t in DELETE_TABLES])
+            conn.rollback()
+        return counts
+
+    def stored_rows():
+        return [
+            sorted(fetch_stored(cursor, table, mund_id).itertuples(index=False, name=None))
+            for mund_id in mund_ids for table in TABLE_COLUMNS
+        ]
+
+    def derive_tts():
+        select = DERIVE_SQL["TeamTournamentStats"]
+        return [sorted(conn.execute(select, (mund_id, mund_id)).fetchall()) for mund_id in mund_ids]
+
+    def player_games():
+        return [conn.execute(PLAYER_GAMES_SQL, (player_id,)).fetchall() for player_id in player_ids]
+
+    def reimport():
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_staging_set_based(storage, df, "2026-01-01")
+
+    try:
+        for name, fn in [("delete", delete), ("stored rows", stored_rows), ("derive TTS", derive_tts),
+                         ("player games", player_games), ("re-import", reimport)]:
+            result = fn()
+            results[name] = (best_of(fn, repeat), result)
+
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        results["size"] = conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+    finally:
+        cursor.close()
+        storage.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tournaments", type=int, default=100)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--players", type=int, default=10, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--sample", type=int, default=10, help="tournaments (and players) per workload")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        before, after = os.path.join(work_dir, "before.db"), os.path.join(work_dir, "after.db")
+
+        start = time.perf_counter()
+        # the last tournament's players and teams are registered now
+        df = build_history(before, args).assign(IsNewPlayer=False, IsNewTeam=False)
+        print(f"history: {args.tournaments} tournaments imported in {time.perf_counter() - start:.1f}s")
+
+        shutil.copyfile(before, after)
+        storage = SqliteStorage(after)
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                migrate(storage)
+            print(f"migration: {time.perf_counter() - start:.2f}s")
+        finally:
+            storage.close()
+
+        step = max(1, args.tournaments // args.sample)
+        mund_ids = list(range(1, args.tournaments + 1, step))[:args.sample]
+        player_ids = sorted(df["PlayerId"].unique().tolist())[:args.sample]
+
+        results = {name: measure(path, df, mund_ids, player_ids, args.repeat)
+                   for name, path in [("before", before), ("after", after)]}
+
+    print(f"{len(mund_ids)} tournaments / {len(player_ids)} players per workload\n")
+
+    print(f"{'workload':<14} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    for name in ("delete", "stored rows", "derive TTS", "player games", "re-import"):
+        (b, b_result), (a, a_result) = results["before"][name], results["after"][name]
+        if name != "re-import":
+            assert b_result == a_result, f"{name} results differ"
+        print(f"{name:<14} {b * 1000:12.1f} {a * 1000:11.1f} {b / a:7.2f}x")
+
+    size_before, size_after = results["before"]["size"], results["after"]["size"]
+    print(f"\ndatabase size: {size_before / 2 ** 20:.1f} MiB -> {size_after / 2 ** 20:.1f} MiB "
+          f"(+{(size_after - size_before) / size_before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
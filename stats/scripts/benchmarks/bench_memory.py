@@ -0,0 +1,101 @@
+"""
+Memory of the input and staging DataFrames: pandas defaults vs. the declared dtypes.
+
+Generates a multi-season set of synthetic tournaments, stages each one, and
+compares memory_usage(deep=True) of
+    input    pd.read_csv defaults (int64/object)  vs. read_input (INPUT_DTYPES)
+    staging  pd.read_csv defaults                 vs. read_staging_frame (STAGING_DTYPES)
+
+Run from this folder:
+    python bench_memory.py
+    python bench_memory.py --tournaments 10 --teams 40 --players 10 --format parquet
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import add_size_arguments, write_tournaments  # noqa: E402
+from csv_creator_current import (  # noqa: E402
+    read_input, validate_input, compute_awards, assign_ids, build_staging, register_new_ids
+)
+from staging_format import STAGING_FORMATS, write_staging, read_staging_frame  # noqa: E402
+
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def measure(files, work_dir, fmt):
+    existing = {"players": {}, "max_player_id": 0, "teams": {}, "max_team_id": 0}
+    results = []
+
+    for mund_id, _, path in files:
+        staging_file = os.path.join(work_dir, os.path.basename(path).replace(".csv", f"_STAGING.{fmt}"))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = read_input(path)
+            input_typed = frame_mb(df)
+
+            df = validate_input(df)
+            ids = assign_ids(df, mund_id, existing)
+            register_new_ids(existing, ids)
+            write_staging(build_staging(df, mund_id, ids, compute_awards(df)), staging_file)
+
+        # the defaults are what a plain read_csv of the same data gives
+        default_staging = os.path.join(work_dir, f"default_{mund_id}.csv")
+        read_staging_frame(staging_file).to_csv(default_staging, index=False)
+
+        results.append({
+            "mundialito_id": mund_id,
+            "rows": len(df),
+            "input_default": frame_mb(pd.read_csv(path, index_col=False)),
+            "input_typed": input_typed,
+            "staging_default": frame_mb(pd.read_csv(default_staging)),
+            "staging_typed": frame_mb(read_staging_frame(staging_file)),
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument("--format", choices=STAGING_FORMATS, default="csv", help="staging file format")
+    parser.set_defaults(tournaments=6, teams=24, players=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        files = write_tournaments(
+            os.path.join(work_dir, "input"), args.tournaments, args.teams, args.players,
+            args.games_per_pairing, args.pool, seed=args.seed
+        )
+        results = measure(files, work_dir, args.format)
+
+    print(f"{'season':>6} {'rows':>9} {'input MB':>9} {'typed':>8} {'staging MB':>11} {'typed':>8}")
+
+    for r in results:
+        print(
+            f"{r['mundialito_id']:>6} {r['rows']:>9,} {r['input_default']:9.2f} {r['input_typed']:8.2f} "
+            f"{r['staging_default']:11.2f} {r['staging_typed']:8.2f}"
+        )
+
+    totals = {k: sum(r[k] for r in results) for k in results[0] if k != "mundialito_id"}
+    print(
+        f"{'total':>6} {totals['rows']:>9,} {totals['input_default']:9.2f} {totals['input_typed']:8.2f} "
+        f"{totals['staging_default']:11.2f} {totals['staging_typed']:8.2f}"
+    )
+
+    for kind in ("input", "staging"):
+        saved = 1 - totals[f"{kind}_typed"] / totals[f"{kind}_default"]
+        print(f"{kind}: {saved:.0%} less memory with the declared dtypes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+End-to-end pipeline benchmark on synthetic tournaments.
+
+Generates tournaments with synthetic.py, then runs csv_creator_current.py and
+import_data_current.py stage by stage against a fresh SQLite database and
+times each stage: CSV read, validation, awards, name matching and ID load, ID
+assignment, staging build/write/read, and the import of every table,
+PlayerLeaderboard included. Results are written as JSON so runs from
+different commits can be compared.
+
+Run from this folder:
+    python bench_pipeline.py --tournaments 3 --teams 16 --players 10 --games-per-pairing 2
+    python bench_pipeline.py --out after.json --compare before.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import add_size_arguments, write_tournaments  # noqa: E402
+from csv_creator_current import (  # noqa: E402
+    read_input, validate_input, compute_awards, resolve_file, assign_ids, build_staging, register_new_ids
+)
+from career_stats import update_career_stats  # noqa: E402
+from import_data_current import (  # noqa: E402
+    check_staging, insert_mundialito, insert_new_players_and_teams, derive_tables, replace_table
+)
+from bulk_writer import DEFAULT_CHUNK_SIZE  # noqa: E402
+from staging_format import STAGING_FORMATS, write_staging, read_staging_frame  # noqa: E402
+from id_index import IdIndex  # noqa: E402
+from leaderboard import leaderboard_frame, replace_leaderboard  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+
+
+class Timer:
+    """Collects stage -> seconds; stage output is swallowed unless verbose."""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        out = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        with out:
+            start = time.perf_counter()
+            yield
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def run_tournament(storage, index, mund_id, mund_date, path, staging_file, chunk_size, timer):
+    with timer.stage("read_csv"):
+        df = read_input(path)
+
+    with timer.stage("validate"):
+        df = validate_input(df)
+
+    with timer.stage("awards"):
+        awards = compute_awards(df)
+
+    with timer.stage("load_ids"):
+        if index is not None:
+            index.sync(storage)
+        df, awards, existing = resolve_file(storage, index, {}, df, awards, mund_id)
+
+    with timer.stage("assign_ids"):
+        ids = assign_ids(df, mund_id, existing)
+        register_new_ids(existing, ids)
+
+    with timer.stage("build_staging"):
+        staging_df = build_staging(df, mund_id, ids, awards)
+
+    with timer.stage("write_staging"):
+        write_staging(staging_df, staging_file)
+
+    with timer.stage("read_staging"):
+        staging_df = read_staging_frame(staging_file)
+        check_staging(staging_df)
+
+    cursor = storage.cursor()
+    storage.begin()
+
+    try:
+        with timer.stage("import.Players+Teams"):
+            insert_mundialito(storage, cursor, mund_id, mund_date)
+            insert_new_players_and_teams(storage, cursor, staging_df, chunk_size)
+
+        with timer.stage("import.derive"):
+            tables = derive_tables(staging_df)
+
+        with timer.stage("import.career_stats"):
+            update_career_stats(cursor, mund_id, staging_df, tables, chunk_size)
+
+        for table, frame in tables.items():
+            with timer.stage(f"import.{table}"):
+                replace_table(cursor, table, frame, mund_id, chunk_size)
+
+        with timer.stage("import.PlayerLeaderboard"):
+            replace_leaderboard(cursor, mund_id, leaderboard_frame(staging_df, tables), chunk_size)
+
+        with timer.stage("import.commit"):
+            storage.commit()
+    except Exception:
+        storage.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return len(df)
+
+
+def run_once(files, work_dir, fmt, chunk_size, use_index, verbose):
+    db_path = os.path.join(work_dir, "bench.db")
+    index_path = os.path.join(work_dir, "id_index.db")
+    for path in (db_path, index_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    storage = SqliteStorage(db_path)
+    storage.ensure_schema()
+    index = IdIndex(index_path) if use_index else None
+
+    results = []
+
+    try:
+        for mund_id, mund_date, path in files:
+            timer = Timer(verbose)
+            staging_file = os.path.join(work_dir, os.path.basename(path).replace(".csv", f"_STAGING.{fmt}"))
+            rows = run_tournament(storage, index, mund_id, mund_date, path, staging_file, chunk_size, timer)
+            results.append({"mundialito_id": mund_id, "rows": rows, "stages": timer.stages})
+    finally:
+        if index is not None:
+            index.close()
+        storage.close()
+
+    return results
+
+
+def best_of(runs):
+    """Per tournament and stage, the fastest of the repeated runs."""
+    best = runs[0]
+
+    for run in runs[1:]:
+        for kept, other in zip(best, run):
+            for stage, seconds in other["stages"].items():
+                kept["stages"][stage] = min(kept["stages"][stage], seconds)
+
+    return best
+
+
+def stage_totals(tournaments):
+    totals = {}
+    for t in tournaments:
+        for stage, seconds in t["stages"].items():
+            totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result, baseline=None):
+    rows = result["total_rows"]
+    base_totals = baseline["totals"] if baseline else {}
+
+    header = f"{'stage':<34}{'seconds':>10}{'rows/s':>14}"
+    if baseline:
+        header += f"{'baseline':>10}{'change':>9}"
+    print(header)
+
+    for stage, seconds in result["totals"].items():
+        rate = rows / seconds if seconds > 0 else float("inf")
+        line = f"{stage:<34}{seconds:10.4f}{rate:14,.0f}"
+
+        if stage in base_totals:
+            before = base_totals[stage]
+            change = (seconds - before) / before if before > 0 else 0
+            line += f"{before:10.4f}{change:+9.0%}"
+
+        print(line)
+
+    total = sum(result["totals"].values())
+    print(f"{'total':<34}{total:10.4f}{rows / total:14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument("--format", choices=STAGING_FORMATS, default="csv", help="staging file format")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=3, help="keep the fastest time of each stage")
+    parser.add_argument("--work-dir", default=None, help="keep generated files and the database here")
+    parser.add_argument("--out", default="bench_pipeline.json", help="JSON results file")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    parser.add_argument("--id-index", action="store_true",
+                        help="resolve ids through the local id index instead of loading the registry")
+    parser.add_argument("--verbose", action="store_true", help="show the scripts' own output")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(work_dir, exist_ok=True)
+
+        files = write_tournaments(
+            os.path.join(work_dir, "input"), args.tournaments, args.teams, args.players,
+            args.games_per_pairing, args.pool, seed=args.seed
+        )
+
+        runs = [
+            run_once(files, work_dir, args.format, args.chunk_size, args.id_index, args.verbose)
+            for _ in range(args.repeat)
+        ]
+
+    tournaments = best_of(runs)
+
+    result = {
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": {
+            "tournaments": args.tournaments,
+            "teams": args.teams,
+            "players_per_team": args.players,
+            "games_per_pairing": args.games_per_pairing,
+            "pool": args.pool,
+            "seed": args.seed,
+            "format": args.format,
+            "chunk_size": args.chunk_size,
+            "repeat": args.repeat,
+            "storage": "sqlite",
+            "id_index": args.id_index,
+        },
+        "total_rows": sum(t["rows"] for t in tournaments),
+        "totals": stage_totals(tournaments),
+        "tournaments": tournaments,
+    }
+
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+
+    print(f"{result['total_rows']:,} rows in {args.tournaments} tournament(s), best of {args.repeat}\n")
+    print_report(result, baseline)
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
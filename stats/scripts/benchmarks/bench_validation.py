@@ -0,0 +1,87 @@
+"""
+Goals scored vs. conceded validation: grouped engine vs. the old per-game loop.
+
+Times both on synthetic tournaments of growing size
+(rows = teams*(teams-1) * games-per-pairing * players).
+
+Run from this folder:
+    python bench_validation.py
+    python bench_validation.py --teams 24 70 160 --legacy-max 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from synthetic import make_tournament, player_names  # noqa: E402
+from csv_creator_current import add_row_columns  # noqa: E402
+from validation import goals_report  # noqa: E402
+
+
+def make_rows(n_teams, players_per_team, games_per_pairing):
+    """A synthetic tournament's player-game rows (with GameIdStr); its goals always reconcile."""
+    df = make_tournament(n_teams, players_per_team, games_per_pairing, player_names(n_teams * players_per_team))
+    return add_row_columns(df)
+
+
+def legacy_check(df):
+    """The per-game loop csv_creator_current.py used before the grouped engine."""
+    for game_id_str, g in df.groupby("GameIdStr"):
+        teams = g["TeamAbbr"].unique()
+
+        if len(teams) != 2:
+            raise ValueError(f"Game {game_id_str} does not have exactly 2 teams")
+
+        teamA, teamB = teams[0], teams[1]
+
+        A_goals = g[g["TeamAbbr"] == teamA]["Goals"].sum()
+        A_conceded = g[g["TeamAbbr"] == teamA]["GoalsConceded"].max()
+
+        B_goals = g[g["TeamAbbr"] == teamB]["Goals"].sum()
+        B_conceded = g[g["TeamAbbr"] == teamB]["GoalsConceded"].max()
+
+        assert A_goals == B_conceded
+        assert B_goals == A_conceded
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[8, 24, 70, 112])
+    parser.add_argument("--players", type=int, default=10, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--legacy-max", type=int, default=20_000,
+                        help="skip the old loop above this many rows (it is slow)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'games':>8} {'grouped (s)':>12} {'rows/s':>12} {'legacy (s)':>11} {'speedup':>8}")
+
+    for n_teams in args.teams:
+        df = make_rows(n_teams, args.players, args.games_per_pairing)
+        assert goals_report(df).empty
+
+        grouped = best_of(goals_report, df, args.repeat)
+
+        if len(df) <= args.legacy_max:
+            legacy = best_of(legacy_check, df, 1)
+            legacy_str, speedup = f"{legacy:11.3f}", f"{legacy / grouped:7.1f}x"
+        else:
+            legacy_str, speedup = f"{'-':>11}", f"{'-':>8}"
+
+        games = df["GameIdStr"].nunique()
+        print(f"{len(df):>10,} {games:>8,} {grouped:12.4f} {len(df) / grouped:12,.0f} {legacy_str} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Synthetic tournaments in the csv_creator_current.py input format.
+
+Every team plays every other team games_per_pairing times with all of its
+players; a team's GoalsConceded is the sum of the opponent's Goals, so the
+files pass validation. Player names come from a shared pool, so later
+tournaments reuse players already registered by earlier ones.
+
+    python synthetic.py OUT_DIR --tournaments 5 --teams 16 --players 10 --games-per-pairing 2
+"""
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_processing"))
+
+from csv_creator_current import EXPECTED_COLUMNS  # noqa: E402
+
+FIRST_DATE = datetime.date(2026, 1, 3)
+
+
+def player_names(n):
+    return [f"Player {i:05d}" for i in range(1, n + 1)]
+
+
+def make_tournament(n_teams=8, players_per_team=7, games_per_pairing=2, pool=None, seed=0):
+    """One tournament as a DataFrame with EXPECTED_COLUMNS, one row per player per game."""
+    rng = np.random.default_rng(seed)
+
+    if pool is None:
+        pool = player_names(n_teams * players_per_team)
+
+    if len(pool) < n_teams * players_per_team:
+        raise ValueError(f"Player pool of {len(pool)} is too small for {n_teams} x {players_per_team} players")
+
+    roster = np.array(pool, dtype=object)[
+        rng.choice(len(pool), size=n_teams * players_per_team, replace=False)
+    ].reshape(n_teams, players_per_team)
+
+    team_names = np.array([f"Team {t:03d}" for t in range(n_teams)], dtype=object)
+    team_abbrs = np.array([f"T{t:03d}" for t in range(n_teams)], dtype=object)
+
+    a, b = np.triu_indices(n_teams, k=1)
+    team_a = np.repeat(a, games_per_pairing)
+    team_b = np.repeat(b, games_per_pairing)
+    game_no = np.tile(np.arange(1, games_per_pairing + 1), len(a))
+    n_games = len(game_no)
+
+    # [game, side, player]
+    shape = (n_games, 2, players_per_team)
+    goals = rng.poisson(0.4, size=shape)
+    assists = np.minimum(rng.poisson(0.3, size=shape), goals.sum(axis=2, keepdims=True))
+
+    scored = goals.sum(axis=2)
+    conceded = scored[:, ::-1]
+    wl = np.where(scored > conceded, "W", np.where(scored < conceded, "L", "D"))
+
+    team = np.stack([team_a, team_b], axis=1)
+    opp = team[:, ::-1]
+
+    team_rows = np.broadcast_to(team[:, :, None], shape).ravel()
+    opp_rows = np.broadcast_to(opp[:, :, None], shape).ravel()
+    slot_rows = np.broadcast_to(np.arange(players_per_team), shape).ravel()
+    names = roster[team_rows, slot_rows]
+
+    mvp = roster[rng.integers(n_teams), rng.integers(players_per_team)]
+
+    df = pd.DataFrame({
+        "Name": names,
+        "TeamName": team_names[team_rows],
+        "TeamAbbr": team_abbrs[team_rows],
+        "OppName": team_names[opp_rows],
+        "OppAbbr": team_abbrs[opp_rows],
+        "WL": np.broadcast_to(wl[:, :, None], shape).ravel(),
+        "Goals": goals.ravel(),
+        "Assists": assists.ravel(),
+        "GoalsConceded": np.broadcast_to(conceded[:, :, None], shape).ravel(),
+        "Game": np.broadcast_to(game_no[:, None, None], shape).ravel(),
+        "MVP": (names == mvp).astype(int),
+    })
+
+    return df[EXPECTED_COLUMNS].sort_values(["TeamAbbr", "Name", "OppAbbr", "Game"]).reset_index(drop=True)
+
+
+def write_tournaments(out_dir, n_tournaments=1, n_teams=8, players_per_team=7,
+                      games_per_pairing=2, pool_size=None, first_id=1, seed=0):
+    """
+    Write mundialito_<id>_<date>.csv files into out_dir, one week apart.
+    Returns [(mundialito_id, date_str, path)] like common.find_tournament_files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    pool = player_names(pool_size or 2 * n_teams * players_per_team)
+    written = []
+
+    for i in range(n_tournaments):
+        mund_id = first_id + i
+        date_str = (FIRST_DATE + datetime.timedelta(weeks=i)).isoformat()
+        path = os.path.join(out_dir, f"mundialito_{mund_id}_{date_str}.csv")
+
+        df = make_tournament(n_teams, players_per_team, games_per_pairing, pool, seed + i)
+        df.to_csv(path, index=False)
+
+        written.append((mund_id, date_str, path))
+
+    return written
+
+
+def add_size_arguments(parser):
+    parser.add_argument("--tournaments", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--players", type=int, default=7, help="players per team")
+    parser.add_argument("--games-per-pairing", type=int, default=2)
+    parser.add_argument("--pool", type=int, default=None,
+                        help="distinct player names shared by all tournaments (default 2 x teams x players)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    written = write_tournaments(
+        args.out_dir, args.tournaments, args.teams, args.players,
+        args.games_per_pairing, args.pool, seed=args.seed
+    )
+
+    for _, _, path in written:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
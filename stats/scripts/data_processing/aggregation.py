@@ -0,0 +1,107 @@
+"""
+Per-tournament aggregations from staging rows, without per-group Python calls.
+
+WL is one-hot encoded once into GamesWon/GamesDrawn/GamesLost columns, so every
+table is a single built-in grouped reduction (sum/max) over plain columns.
+Output matches what import_data_current.derive_tables produced with lambdas.
+"""
+import numpy as np
+import pandas as pd
+
+from game_ids import game_code
+
+PTS_KEYS = ["PlayerId", "TeamName", "TeamId", "TeamAbbr", "MundialitoId"]
+PTS_SUMS = ["GamesPlayed", "GamesWon", "GamesDrawn", "GamesLost", "Goals", "Assists", "GoalsConceded", "CleanSheets"]
+
+
+def wl_one_hot(wl):
+    """W/D/L column -> int64 GamesWon, GamesDrawn, GamesLost indicator columns."""
+    wl = np.asarray(wl, dtype=object)
+
+    return pd.DataFrame({
+        "GamesWon": (wl == "W").astype(np.int64),
+        "GamesDrawn": (wl == "D").astype(np.int64),
+        "GamesLost": (wl == "L").astype(np.int64),
+    })
+
+
+def games_table(df):
+    """One row per GameId with the lower team id as side A, and its display GameCode."""
+    team_id = df["TeamId"].to_numpy()
+    opp_id = df["OppId"].to_numpy()
+    team_is_a = team_id <= opp_id
+
+    rows = pd.DataFrame({
+        "GameId": df["GameId"].to_numpy(),
+        "MundialitoId": df["MundialitoId"].to_numpy(),
+        "TeamAId": np.minimum(team_id, opp_id),
+        "TeamBId": np.maximum(team_id, opp_id),
+        "GoalsA": np.where(team_is_a, df["Goals"].to_numpy(), 0),
+        "GoalsB": np.where(team_is_a, df["GoalsConceded"].to_numpy(), 0),
+        "Game": df["Game"].to_numpy(),
+    })
+
+    games = rows.groupby(
+        ["GameId", "MundialitoId", "TeamAId", "TeamBId", "Game"], as_index=False, observed=True
+    ).agg(
+        GoalsA=("GoalsA", "sum"),
+        GoalsB=("GoalsB", "max"),
+    )
+    games["GameCode"] = game_code(games["TeamAId"], games["TeamBId"], games["Game"])
+
+    return games
+
+
+def player_tournament_stats(df):
+    rows = pd.concat([
+        df[PTS_KEYS].reset_index(drop=True),
+        pd.DataFrame({"GamesPlayed": np.ones(len(df), dtype=np.int64)}),
+        wl_one_hot(df["WL"]),
+        pd.DataFrame({
+            "Goals": df["Goals"].to_numpy(),
+            "Assists": df["Assists"].to_numpy(),
+            "GoalsConceded": df["GoalsConceded"].to_numpy(),
+            "CleanSheets": df["CleanSheet"].to_numpy(),
+        }),
+    ], axis=1)
+
+    return rows.groupby(PTS_KEYS, as_index=False, observed=True)[PTS_SUMS].sum()
+
+
+def player_awards(df):
+    return df.groupby(["PlayerId", "MundialitoId"], as_index=False, observed=True).agg({
+        "IsMVP": "max",
+        "IsGoldenBoot": "max",
+        "IsPlaymaker": "max",
+    })
+
+
+def team_tournament_stats(pts_df):
+    """Team totals from player totals: games/results/conceded are shared by the roster, goals add up."""
+    tts_df = pts_df.groupby(["TeamId", "MundialitoId"], as_index=False, observed=True).agg(
+        GamesPlayed=("GamesPlayed", "max"),
+        GamesWon=("GamesWon", "max"),
+        GamesDrawn=("GamesDrawn", "max"),
+        GamesLost=("GamesLost", "max"),
+        Goals=("Goals", "sum"),
+        Assists=("Assists", "sum"),
+        GoalsConceded=("GoalsConceded", "max"),
+        CleanSheets=("CleanSheets", "max"),
+    )
+
+    tts_df["IsChampion"] = (tts_df["GamesWon"] == tts_df["GamesWon"].max()).astype(np.int64)
+
+    return tts_df
+
+
+def aggregate(df):
+    """Every per-tournament table from one tournament's staging rows."""
+    pts_df = player_tournament_stats(df)
+
+    return {
+        "Games": games_table(df),
+        "PlayerGameStats": df.rename(columns={"OppId": "OppTeamId"}),
+        "PlayerTournamentStats": pts_df,
+        "PlayerAwards": player_awards(df),
+        "TeamTournamentStats": team_tournament_stats(pts_df),
+    }
@@ -0,0 +1,250 @@
+"""
+Backfill import: bounded transactions, checkpointed, resumable.
+
+import_staging writes a tournament in one transaction, which is what a single
+tournament wants. For a multi-season backfill, --backfill commits every
+"backfillChunkRows" rows instead, and records how far each table got in
+ImportCheckpoint (MundialitoId, TableName, LastKey, RowsDone) in the same
+transaction as the chunk:
+
+    1. start    Mundialitos row, new players and teams, a checkpoint per table,
+                and the tournament's ImportManifest row removed, so it counts
+                as not imported until step 4; one transaction
+    2. clear    the tournament's old rows, children first, "backfillChunkRows"
+                per transaction; only tables no new row has been written to
+    3. load     each table in key order, parents first, one chunk per
+                transaction, from after its LastKey
+    4. finish   PlayerLeaderboard, then the consistency pass: every table's row
+                count for the tournament against the staging data. If they all
+                match, ImportManifest is written and the checkpoints removed, in
+                the same transaction; if not, it raises and records nothing.
+
+A chunk that fails as a deadlock victim or on a lock timeout
+(Storage.is_retryable) is retried up to "backfillRetries" times; any other
+error stops the run. Running the same command again resumes from the
+checkpoints, as long as the tournament stages to the same rows (checkpoints
+left by other staging data are discarded and the tournament starts over).
+
+Career totals cannot follow a tournament that is only partly written, so they
+are not updated per tournament: the callers rebuild them from the stored
+tournaments once the backfill is done (career_stats.rebuild_career_stats). An
+interrupted backfill finished by another import mode leaves them off until
+    python career_stats.py --rebuild
+
+    python batch_current.py --backfill
+    python import_data_current.py --backfill
+"""
+import bisect
+import datetime
+import json
+import time
+
+import pandas as pd
+
+from bulk_writer import DEFAULT_CHUNK_SIZE
+from career_stats import rebuild_career_stats
+from import_data_current import (
+    TABLE_COLUMNS, TABLE_KEYS, check_staging, derive_tables, insert_mundialito, insert_new_players_and_teams,
+    insert_table
+)
+from instrumentation import stage
+from leaderboard import leaderboard_frame, replace_leaderboard
+from manifest import imported_hashes, record_import, staging_hash
+
+DEFAULT_CHUNK_ROWS = 5000
+DEFAULT_RETRIES = 3
+
+
+def now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def in_transaction(storage, work, retries=DEFAULT_RETRIES):
+    """Run work(cursor) in a transaction of its own and commit, retrying retryable errors. Returns its result."""
+    for attempt in range(retries + 1):
+        cursor = storage.cursor()
+        storage.begin()
+
+        try:
+            result = work(cursor)
+            storage.commit()
+            return result
+        except Exception as e:
+            storage.rollback()
+
+            if attempt == retries or not storage.is_retryable(e):
+                raise
+
+            print(f"{type(e).__name__}: {e}; retrying ({attempt + 1}/{retries})...")
+            time.sleep(0.5 * 2 ** attempt)
+        finally:
+            cursor.close()
+
+
+def read_checkpoints(cursor, mundialito_id):
+    """{TableName: (LastKey tuple or None, RowsDone, StagingHash)} for one tournament."""
+    cursor.execute(
+        "SELECT TableName, LastKey, RowsDone, StagingHash FROM ImportCheckpoint WHERE MundialitoId = ?",
+        (mundialito_id,),
+    )
+
+    return {
+        table: (None if last_key is None else tuple(json.loads(last_key)), rows_done, key)
+        for table, last_key, rows_done, key in cursor.fetchall()
+    }
+
+
+def resumable(cursor, mundialito_id, staging_key):
+    """The checkpoints to resume from, or None to start over."""
+    checkpoints = read_checkpoints(cursor, mundialito_id)
+
+    if not checkpoints:
+        return None
+
+    # an import since then (ImportManifest row back) or other staging data: stale
+    if set(checkpoints) != set(TABLE_COLUMNS) or imported_hashes(cursor, mundialito_id) \
+            or any(key != staging_key for _, _, key in checkpoints.values()):
+        print("Discarding stale checkpoints (other staging data, or imported again since).")
+        return None
+
+    return checkpoints
+
+
+def start_backfill(storage, df, mundialito_id, mund_date, staging_key, chunk_size, retries):
+    def work(cursor):
+        insert_mundialito(storage, cursor, mundialito_id, mund_date)
+        insert_new_players_and_teams(storage, cursor, df, chunk_size)
+
+        cursor.execute("DELETE FROM ImportManifest WHERE MundialitoId = ?", (mundialito_id,))
+        cursor.execute("DELETE FROM ImportCheckpoint WHERE MundialitoId = ?", (mundialito_id,))
+        cursor.executemany(
+            "INSERT INTO ImportCheckpoint (MundialitoId, TableName, LastKey, RowsDone, StagingHash, UpdatedAt) "
+            "VALUES (?, ?, NULL, 0, ?, ?)",
+            [(mundialito_id, table, staging_key, now()) for table in TABLE_COLUMNS],
+        )
+
+    in_transaction(storage, work, retries)
+    return {table: (None, 0, staging_key) for table in TABLE_COLUMNS}
+
+
+def clear_table(storage, table, mundialito_id, chunk_rows, retries):
+    """Delete the tournament's rows from table, chunk_rows per transaction. Returns the number deleted."""
+    deleted = 0
+
+    while True:
+        count = in_transaction(
+            storage, lambda cursor: storage.delete_chunk(cursor, table, "MundialitoId = ?", (mundialito_id,), chunk_rows),
+            retries,
+        )
+        deleted += count
+
+        if count < chunk_rows:
+            return deleted
+
+
+def load_table(storage, table, frame, mundialito_id, last_key, chunk_rows, chunk_size, retries):
+    """Insert frame's rows after last_key (frame sorted by TABLE_KEYS), chunk_rows per transaction."""
+    keys = list(frame[TABLE_KEYS[table]].itertuples(index=False, name=None))
+    start = 0 if last_key is None else bisect.bisect_right(keys, last_key)
+
+    for i in range(start, len(frame), chunk_rows):
+        chunk = frame.iloc[i:i + chunk_rows]
+        end = i + len(chunk)
+
+        def work(cursor):
+            insert_table(cursor, table, chunk, chunk_size)
+            cursor.execute(
+                "UPDATE ImportCheckpoint SET LastKey = ?, RowsDone = ?, UpdatedAt = ? "
+                "WHERE MundialitoId = ? AND TableName = ?",
+                (json.dumps([int(v) for v in keys[end - 1]]), end, now(), mundialito_id, table),
+            )
+
+        in_transaction(storage, work, retries)
+
+    return len(frame) - start
+
+
+def finish_backfill(storage, df, tables, mundialito_id, input_key, staging_key, chunk_size, retries):
+    board = leaderboard_frame(df, tables)
+    expected = {table: len(frame) for table, frame in tables.items()}
+    expected["PlayerLeaderboard"] = len(board)
+
+    def work(cursor):
+        replace_leaderboard(cursor, mundialito_id, board, chunk_size)
+
+        mismatches = []
+        for table, rows in expected.items():
+            cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE MundialitoId = ?", (mundialito_id,))
+            stored = cursor.fetchone()[0]
+
+            if stored != rows:
+                mismatches.append(f"{table}: {stored} stored, {rows} staged")
+
+        if mismatches:
+            raise RuntimeError(f"Backfill of MundialitoId {mundialito_id} is inconsistent: {'; '.join(mismatches)}")
+
+        cursor.execute("DELETE FROM ImportCheckpoint WHERE MundialitoId = ?", (mundialito_id,))
+        record_import(cursor, mundialito_id, input_key, staging_key)
+
+    in_transaction(storage, work, retries)
+    print(f"Consistency check passed: {', '.join(f'{t} {n}' for t, n in expected.items())}")
+
+
+def backfill_staging(storage, df, mund_date, chunk_size=DEFAULT_CHUNK_SIZE, input_key=None, staging_key=None,
+                     chunk_rows=DEFAULT_CHUNK_ROWS, retries=DEFAULT_RETRIES):
+    """
+    import_staging in bounded, checkpointed transactions, resuming an interrupted
+    backfill of the same rows. Leaves the career tables to rebuild_after_backfill.
+    """
+    mundialito_id = check_staging(df)
+
+    if staging_key is None:
+        staging_key = staging_hash(df)
+
+    if df.isna().to_numpy().any():
+        df = df.where(pd.notnull(df), None)
+
+    with stage("backfill.derive", rows=len(df), mundialito_id=mundialito_id):
+        tables = {
+            table: frame.sort_values(TABLE_KEYS[table], ignore_index=True)
+            for table, frame in derive_tables(df).items()
+        }
+
+    cursor = storage.cursor()
+    try:
+        checkpoints = resumable(cursor, mundialito_id, staging_key)
+    finally:
+        cursor.close()
+
+    if checkpoints is None:
+        print(f"Backfilling MundialitoId = {mundialito_id}, {chunk_rows} rows per transaction")
+        with stage("backfill.start", mundialito_id=mundialito_id):
+            checkpoints = start_backfill(storage, df, mundialito_id, mund_date, staging_key, chunk_size, retries)
+    else:
+        done = {table: rows for table, (_, rows, _) in checkpoints.items()}
+        print(f"Resuming the backfill of MundialitoId = {mundialito_id} from its checkpoints: {done}")
+
+    # children first; a table with a LastKey was cleared before its first chunk went in
+    for table in reversed(list(TABLE_COLUMNS)):
+        if checkpoints[table][0] is None:
+            with stage(f"backfill.clear.{table}", mundialito_id=mundialito_id) as s:
+                s.rows = clear_table(storage, table, mundialito_id, chunk_rows, retries)
+
+    for table in TABLE_COLUMNS:
+        with stage(f"backfill.{table}", mundialito_id=mundialito_id) as s:
+            s.rows = load_table(
+                storage, table, tables[table], mundialito_id, checkpoints[table][0], chunk_rows, chunk_size, retries
+            )
+
+    with stage("backfill.finish", mundialito_id=mundialito_id):
+        finish_backfill(storage, df, tables, mundialito_id, input_key, staging_key, chunk_size, retries)
+
+    print("Backfill completed successfully.")
+
+
+def rebuild_after_backfill(storage, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute the career tables once the backfilled tournaments are all in."""
+    with stage("backfill.career_stats"):
+        rebuild_career_stats(storage, chunk_size)
+
+    print("Career stats rebuilt from the stored tournaments.")
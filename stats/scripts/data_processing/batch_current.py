@@ -0,0 +1,305 @@
+"""
+Stage and import every mundialito_<id>_<date>.csv in the input folder in one run.
+
+Run from this folder, like the other scripts:
+    python batch_current.py                 # every tournament, in MundialitoId order
+    python batch_current.py --ids 0 4       # only these tournaments
+    python batch_current.py --stage-only    # write staging CSVs, leave the DB alone
+    python batch_current.py --workers 4     # stage files in 4 processes
+    python batch_current.py --upsert        # import by diff instead of delete-and-reinsert
+    python batch_current.py --backfill      # bounded, checkpointed, resumable transactions
+    python batch_current.py --force         # re-import tournaments whose input is unchanged
+
+Tournaments are processed in ascending MundialitoId order against one connection.
+The Players/Teams registry is read once and advanced in memory after each
+tournament, so new PlayerId/TeamId values come out the same on every rebuild.
+
+With --workers > 1 the database-free staging work (read, validate, awards, then
+building and writing the staging CSV) runs in a process pool. New ids are still
+handed out in one deterministic merge step, in MundialitoId order, between the
+two parallel phases, so the output matches a sequential run exactly.
+
+With "streamChunkRows" set, each file is staged in chunks (streaming.py), its
+two passes in the pool with --workers, and the staging file read back for the
+import.
+
+Tournaments whose input csv and alias table hash the same as at their last
+import (ImportManifest, see manifest.py) are skipped before anything is read.
+With "snapshotPath" set, the API snapshots are refreshed afterwards (snapshots.py).
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backfill_import import DEFAULT_CHUNK_ROWS, DEFAULT_RETRIES, backfill_staging, rebuild_after_backfill
+from bulk_writer import DEFAULT_CHUNK_SIZE
+from common import load_config, connect, find_tournament_files
+from id_index import open_index
+from instrumentation import configure, stage
+from staging_format import read_staging_frame, write_staging
+from csv_creator_current import (
+    EXPECTED_COLUMNS, staging_path, resolve_file, prepare_file, assign_ids,
+    register_new_ids, build_staging
+)
+from concurrent_import import import_staging_concurrent
+from import_data_current import import_staging
+from manifest import imported_hashes, input_hash, record_import, staging_hash
+from set_import import import_staging_set_based
+from snapshots import export_after_import
+from streaming import prepare_summary, resolve_summary, stream_staging, write_streamed
+from upsert_import import upsert_staging
+
+
+def has_current_headers(file_path):
+    header = pd.read_csv(file_path, index_col=False, nrows=0).columns
+    return [c for c in header if not c.startswith("Unnamed")] == EXPECTED_COLUMNS
+
+
+def build_and_write(df, mund_id, ids, awards, output_path):
+    staging_df = build_staging(df, mund_id, ids, awards)
+    write_staging(staging_df, output_path)
+    print(f"Staging file created: {output_path}")
+
+    return staging_df
+
+
+def trim_ids(ids, names):
+    """Only the id entries for this tournament's player names, so the whole registry isn't pickled to a worker."""
+    return {
+        "player_name_to_id": {n: ids["player_name_to_id"][n] for n in names},
+        "player_name_is_new": {n: ids["player_name_is_new"][n] for n in names},
+        "team_key_to_id": ids["team_key_to_id"],
+        "team_key_is_new": ids["team_key_is_new"],
+    }
+
+
+def stage_sequential(files, storage, index, config, out_path, fmt):
+    staged = []
+    existing = None
+
+    for mund_id, mund_date, file_path in files:
+        print(f"\n===== Staging Mundialito {mund_id} ({mund_date}) =====")
+
+        df, awards = prepare_file(file_path)
+        df, awards, existing = resolve_file(storage, index, config, df, awards, mund_id, existing)
+        ids = assign_ids(df, mund_id, existing)
+        register_new_ids(existing, ids)
+
+        staging_df = build_and_write(df, mund_id, ids, awards, staging_path(file_path, out_path, fmt))
+        staged.append((mund_id, mund_date, staging_df))
+
+    return staged
+
+
+def stage_parallel(files, storage, index, config, out_path, fmt, workers):
+    existing = None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        prepared = list(pool.map(prepare_file, [f[2] for f in files]))
+
+        # Merge step: the only part that touches the shared registry, done in MundialitoId order.
+        jobs = []
+        for (mund_id, mund_date, file_path), (df, awards) in zip(files, prepared):
+            df, awards, existing = resolve_file(storage, index, config, df, awards, mund_id, existing)
+            ids = assign_ids(df, mund_id, existing)
+            register_new_ids(existing, ids)
+            jobs.append(
+                (df, mund_id, trim_ids(ids, df["Name"].unique()), awards, staging_path(file_path, out_path, fmt))
+            )
+
+        futures = [pool.submit(build_and_write, *job) for job in jobs]
+        staging_dfs = [f.result() for f in futures]
+
+    return [(mund_id, mund_date, staging_df) for (mund_id, mund_date, _), staging_df in zip(files, staging_dfs)]
+
+
+def read_back(output_path):
+    print(f"Staging file created in chunks: {output_path}")
+    return read_staging_frame(output_path)
+
+
+def stage_streamed(files, storage, index, config, out_path, fmt, workers, chunk_rows):
+    """stage_sequential / stage_parallel for "streamChunkRows": the files are staged chunk by chunk."""
+    existing = None
+    output_paths = [staging_path(f[2], out_path, fmt) for f in files]
+
+    if workers <= 1:
+        for (mund_id, mund_date, file_path), output_path in zip(files, output_paths):
+            print(f"\n===== Staging Mundialito {mund_id} ({mund_date}) =====")
+            _, existing = stream_staging(storage, index, config, file_path, output_path, mund_id, chunk_rows, existing)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(prepare_summary, [f[2] for f in files], [chunk_rows] * len(files)))
+
+            # Merge step, as in stage_parallel
+            jobs = []
+            for (mund_id, _, file_path), output_path, summary in zip(files, output_paths, summaries):
+                player_map, team_map, ids, awards, existing = resolve_summary(
+                    storage, index, config, summary, mund_id, existing
+                )
+                register_new_ids(existing, ids)
+                ids = trim_ids(ids, list(dict.fromkeys(player_map.values())))
+                jobs.append((file_path, output_path, mund_id, chunk_rows, player_map, team_map, ids, awards))
+
+            for future in [pool.submit(write_streamed, *job) for job in jobs]:
+                future.result()
+
+    return [(mund_id, mund_date, read_back(path)) for (mund_id, mund_date, _), path in zip(files, output_paths)]
+
+
+def read_import_manifest(storage):
+    cursor = storage.cursor()
+
+    try:
+        return imported_hashes(cursor)
+    finally:
+        cursor.close()
+
+
+def record_input_hash(storage, mund_id, input_key, staging_key):
+    cursor = storage.cursor()
+    storage.begin()
+
+    try:
+        record_import(cursor, mund_id, input_key, staging_key)
+        storage.commit()
+    except Exception:
+        storage.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def run_batch(config, only_ids=None, stage_only=False, workers=1, upsert=False, force=False, backfill=False):
+    input_path = config["inputPath"]
+    out_path = config["outputPath"]
+    chunk_size = config.get("importChunkSize", DEFAULT_CHUNK_SIZE)
+    fmt = config.get("stagingFormat", "csv")
+    import_workers = config.get("importWorkers", 0)
+    set_based = config.get("setBasedImport", False)
+    chunk_rows = config.get("streamChunkRows", 0)
+
+    files = find_tournament_files(input_path)
+
+    if only_ids:
+        files = [f for f in files if f[0] in only_ids]
+
+    if not files:
+        raise FileNotFoundError(f"No mundialito_<id>_<date>.csv files found in {input_path}")
+
+    skipped = [f[0] for f in files if not has_current_headers(f[2])]
+    files = [f for f in files if f[0] not in skipped]
+
+    for mund_id in skipped:
+        print(f"Skipping Mundialito {mund_id}: old header format, use old_scripts for this file")
+
+    print(f"Batch: {len(files)} tournament file(s): {[f[0] for f in files]}")
+
+    batch_start = time.perf_counter()
+
+    storage = connect(config)
+    index = None
+    unchanged = []
+
+    try:
+        with stage("check_manifest", rows=len(files)):
+            input_keys = {f[0]: input_hash(f[2], config.get("aliasesPath")) for f in files}
+            imported = {} if force else read_import_manifest(storage)
+
+            if not stage_only:
+                unchanged = [f[0] for f in files if f[0] in imported and imported[f[0]][0] == input_keys[f[0]]]
+                files = [f for f in files if f[0] not in unchanged]
+
+        for mund_id in unchanged:
+            print(f"Skipping Mundialito {mund_id}: unchanged since its last import (--force to re-import)")
+
+        index = open_index(config)
+
+        if index is not None:
+            with stage("sync_id_index"):
+                print(f"Id index sync: {index.sync(storage)}")
+
+        with stage("stage_all", workers=workers) as s:
+            if chunk_rows:
+                staged = stage_streamed(files, storage, index, config, out_path, fmt, workers, chunk_rows)
+            elif workers > 1:
+                staged = stage_parallel(files, storage, index, config, out_path, fmt, workers)
+            else:
+                staged = stage_sequential(files, storage, index, config, out_path, fmt)
+
+            s.rows = sum(len(staging_df) for _, _, staging_df in staged)
+
+        print(f"\nStaged {len(staged)} tournament(s) in {time.perf_counter() - batch_start:.2f}s")
+
+        if not stage_only:
+            for mund_id, mund_date, staging_df in staged:
+                print(f"\n===== Importing Mundialito {mund_id} ({mund_date}) =====")
+                staging_key = staging_hash(staging_df)
+
+                if mund_id in imported and imported[mund_id][1] == staging_key:
+                    # input changed (e.g. the alias table) but not the rows it stages to
+                    print("Staging data unchanged since the last import, recording the new input hash only.")
+                    record_input_hash(storage, mund_id, input_keys[mund_id], staging_key)
+                elif backfill:
+                    backfill_staging(
+                        storage, staging_df, mund_date, chunk_size, input_keys[mund_id], staging_key,
+                        config.get("backfillChunkRows", DEFAULT_CHUNK_ROWS),
+                        config.get("backfillRetries", DEFAULT_RETRIES),
+                    )
+                elif upsert:
+                    upsert_staging(storage, staging_df, mund_date, chunk_size, input_keys[mund_id], staging_key)
+                elif set_based:
+                    import_staging_set_based(
+                        storage, staging_df, mund_date, chunk_size, input_keys[mund_id], staging_key
+                    )
+                elif import_workers > 1:
+                    import_staging_concurrent(
+                        storage, staging_df, mund_date, chunk_size, import_workers, input_keys[mund_id], staging_key
+                    )
+                else:
+                    import_staging(storage, staging_df, mund_date, chunk_size, input_keys[mund_id], staging_key)
+
+            if backfill and staged:
+                rebuild_after_backfill(storage, chunk_size)
+
+            export_after_import(storage, config, [s[0] for s in staged])
+
+    finally:
+        if index is not None:
+            index.close()
+        storage.close()
+
+    done = [s[0] for s in staged]
+
+    print(f"\nBatch finished in {time.perf_counter() - batch_start:.2f}s")
+    print(f"{'Staged' if stage_only else 'Imported'}: {done}")
+    if skipped:
+        print(f"Skipped (old format): {skipped}")
+    if unchanged:
+        print(f"Skipped (unchanged): {unchanged}")
+
+    return done, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, nargs="+", help="only these MundialitoIds")
+    parser.add_argument("--stage-only", action="store_true", help="write staging CSVs without importing")
+    parser.add_argument("--workers", type=int, default=1, help="staging processes (default 1, sequential)")
+    parser.add_argument("--upsert", action="store_true", help="import by diff (see upsert_import.py)")
+    parser.add_argument("--force", action="store_true", help="re-import tournaments even if their input is unchanged")
+    parser.add_argument("--backfill", action="store_true",
+                        help="commit in bounded, checkpointed chunks and resume if interrupted (see backfill_import.py)")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure(config, "batch_current")
+
+    run_batch(config, only_ids=args.ids, stage_only=args.stage_only, workers=args.workers,
+              upsert=args.upsert, force=args.force, backfill=args.backfill)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import time
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def frame_to_params(df, columns):
+    """
+    Build executemany parameter tuples from a DataFrame, one column at a time.
+
+    columns is a list of (db_column, frame_column, kind) where kind is int, float,
+    str or bool (bool is sent as 0/1 for bit columns). Each column is converted once with
+    .tolist() so the tuples hold plain Python values pyodbc can bind.
+    """
+    values = []
+
+    for _, frame_column, kind in columns:
+        series = df[frame_column]
+
+        if kind is bool:
+            values.append(series.astype(bool).astype(int).tolist())
+        elif kind is int:
+            values.append(series.astype("int64").tolist())
+        elif kind is float:
+            values.append(series.astype(float).tolist())
+        else:
+            values.append(series.astype(str).tolist())
+
+    return list(zip(*values))
+
+
+def insert_frame(cursor, table, df, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert every row of df into table with executemany, chunk_size rows per round
+    trip (Storage cursors for SQL Server have fast_executemany on). Runs on the
+    caller's cursor so it stays inside their transaction. Returns the number of rows sent.
+    """
+    start = time.perf_counter()
+
+    params = frame_to_params(df, columns)
+
+    if not params:
+        print(f"No {table} rows to insert.")
+        return 0
+
+    db_columns = ", ".join(c[0] for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table} ({db_columns}) VALUES ({placeholders})"
+
+    chunks = 0
+
+    for i in range(0, len(params), chunk_size):
+        cursor.executemany(sql, params[i:i + chunk_size])
+        chunks += 1
+
+    elapsed = time.perf_counter() - start
+    rate = len(params) / elapsed if elapsed > 0 else float("inf")
+    print(f"Inserted {len(params)} {table} rows in {chunks} chunk(s), {elapsed:.3f}s ({rate:,.0f} rows/s)")
+
+    return len(params)
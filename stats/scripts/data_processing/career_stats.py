@@ -0,0 +1,278 @@
+"""
+All-time PlayerCareerStats and TeamHistory, maintained incrementally.
+
+Each import works out the tournament's contribution before (from the stored
+per-tournament rows) and after (from the rows about to be written), and only
+applies the difference to the career rows it touches. Re-importing a tournament
+with no changes writes nothing; nothing ever re-aggregates all of history.
+
+Schema migration 3 (schema_migrations.py) creates the tables and fills them
+from the tournaments already stored. To recompute them from scratch:
+    python career_stats.py --rebuild
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from bulk_writer import DEFAULT_CHUNK_SIZE, frame_to_params, insert_frame
+from common import load_config, connect
+
+COUNT_COLUMNS = [
+    "GamesPlayed", "GamesWon", "GamesDrawn", "GamesLost",
+    "Goals", "Assists", "CleanSheets", "GoalsConceded",
+]
+
+# key column, count columns (additive) and rate columns (count / GamesPlayed)
+CAREER_TABLES = {
+    "PlayerCareerStats": {
+        "key": ("PlayerId", int),
+        "counts": ["Tournaments", *COUNT_COLUMNS, "MVPs", "GoldenBoots", "Playmakers"],
+        "rates": {"GoalsPerGame": "Goals", "AssistsPerGame": "Assists", "WinRate": "GamesWon"},
+    },
+    "TeamHistory": {
+        "key": ("TeamName", str),
+        "counts": ["Tournaments", *COUNT_COLUMNS, "Championships"],
+        "rates": {"GoalsPerGame": "Goals", "WinRate": "GamesWon"},
+    },
+}
+
+# SQL Server allows 2100 parameters per statement
+IN_LIST_SIZE = 500
+
+
+def query_frame(cursor, sql, params, columns):
+    cursor.execute(sql, params)
+    return pd.DataFrame.from_records([tuple(r) for r in cursor.fetchall()], columns=columns)
+
+
+def player_contribution(pts, awards):
+    """PlayerId-indexed career counts from PlayerTournamentStats and PlayerAwards rows."""
+    counts = pts.groupby("PlayerId")[COUNT_COLUMNS].sum()
+    counts.insert(0, "Tournaments", pts.groupby("PlayerId")["MundialitoId"].nunique())
+
+    flags = awards[["IsMVP", "IsGoldenBoot", "IsPlaymaker"]].fillna(0).astype(np.int64)
+    flags["PlayerId"] = awards["PlayerId"].to_numpy()
+    won = flags.groupby("PlayerId").sum().rename(columns={
+        "IsMVP": "MVPs", "IsGoldenBoot": "GoldenBoots", "IsPlaymaker": "Playmakers",
+    })
+
+    return counts.join(won, how="outer").fillna(0).astype(np.int64)
+
+
+def team_contribution(tts):
+    """TeamName-indexed history counts from TeamTournamentStats rows carrying a TeamName column."""
+    tts = tts.assign(TeamName=tts["TeamName"].astype(str))
+
+    counts = tts.groupby("TeamName")[COUNT_COLUMNS].sum()
+    counts.insert(0, "Tournaments", tts.groupby("TeamName")["MundialitoId"].nunique())
+    counts["Championships"] = tts.groupby("TeamName")["IsChampion"].sum()
+
+    return counts.fillna(0).astype(np.int64)
+
+
+def tournament_contribution(df, tables):
+    """Contribution of the staging rows about to be imported (tables from derive_tables)."""
+    names = df[["TeamId", "TeamName"]].drop_duplicates("TeamId")
+    tts = tables["TeamTournamentStats"].merge(names, on="TeamId")
+
+    return {
+        "PlayerCareerStats": player_contribution(tables["PlayerTournamentStats"], tables["PlayerAwards"]),
+        "TeamHistory": team_contribution(tts),
+    }
+
+
+def stored_contribution(cursor, mundialito_id=None):
+    """Contribution of what is stored for one MundialitoId, or for every tournament if None."""
+    where, params = ("WHERE s.MundialitoId = ?", (mundialito_id,)) if mundialito_id is not None else ("", ())
+
+    pts = query_frame(
+        cursor,
+        f"SELECT s.PlayerId, s.MundialitoId, {', '.join(f's.{c}' for c in COUNT_COLUMNS)} "
+        f"FROM PlayerTournamentStats s {where}",
+        params, ["PlayerId", "MundialitoId", *COUNT_COLUMNS],
+    )
+    awards = query_frame(
+        cursor,
+        f"SELECT s.PlayerID, s.IsMVP, s.IsGoldenBoot, s.IsPlaymaker FROM PlayerAwards s {where}",
+        params, ["PlayerId", "IsMVP", "IsGoldenBoot", "IsPlaymaker"],
+    )
+    tts = query_frame(
+        cursor,
+        f"SELECT t.TeamName, s.MundialitoId, {', '.join(f's.{c}' for c in COUNT_COLUMNS)}, s.IsChampion "
+        f"FROM TeamTournamentStats s JOIN Teams t ON t.TeamId = s.TeamId {where}",
+        params, ["TeamName", "MundialitoId", *COUNT_COLUMNS, "IsChampion"],
+    )
+
+    # old rows may have NULL Assists/GamesDrawn/CleanSheets
+    pts[COUNT_COLUMNS] = pts[COUNT_COLUMNS].fillna(0)
+    tts[COUNT_COLUMNS + ["IsChampion"]] = tts[COUNT_COLUMNS + ["IsChampion"]].fillna(0)
+
+    return {
+        "PlayerCareerStats": player_contribution(pts, awards),
+        "TeamHistory": team_contribution(tts),
+    }
+
+
+def fetch_career(cursor, table, keys):
+    spec = CAREER_TABLES[table]
+    key = spec["key"][0]
+    columns = [key, *spec["counts"]]
+
+    frames = []
+    for i in range(0, len(keys), IN_LIST_SIZE):
+        chunk = keys[i:i + IN_LIST_SIZE]
+        frames.append(query_frame(
+            cursor,
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {key} IN ({', '.join('?' for _ in chunk)})",
+            tuple(chunk), columns,
+        ))
+
+    return pd.concat(frames).set_index(key).astype(np.int64)
+
+
+def with_rates(totals, table):
+    games = totals["GamesPlayed"].to_numpy()
+
+    for rate, column in CAREER_TABLES[table]["rates"].items():
+        totals[rate] = np.where(games > 0, totals[column].to_numpy() / np.maximum(games, 1), 0.0)
+
+    return totals
+
+
+def apply_delta(cursor, table, old, new, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Add new - old to the career rows of table. Returns {inserted, updated, deleted}."""
+    spec = CAREER_TABLES[table]
+    key, key_kind = spec["key"]
+    counts = spec["counts"]
+
+    delta = new.sub(old, fill_value=0)[counts]
+    delta = delta[(delta != 0).any(axis=1)]
+
+    summary = {"inserted": 0, "updated": 0, "deleted": 0}
+
+    if delta.empty:
+        return summary
+
+    if key_kind is int:
+        keys = [int(k) for k in delta.index]
+    else:
+        keys = [str(k) for k in delta.index]
+
+    stored = fetch_career(cursor, table, keys)
+    totals = stored.reindex(delta.index, fill_value=0).add(delta).astype(np.int64)
+    totals = with_rates(totals, table).rename_axis(key).reset_index()
+
+    exists = totals[key].isin(stored.index)
+    gone = totals["Tournaments"] <= 0
+
+    columns = [(c, c, int) for c in counts] + [(r, r, float) for r in spec["rates"]]
+
+    deletes = totals[exists & gone]
+    if not deletes.empty:
+        params = frame_to_params(deletes, [(key, key, key_kind)])
+        cursor.executemany(f"DELETE FROM {table} WHERE {key} = ?", params)
+
+    updates = totals[exists & ~gone]
+    if not updates.empty:
+        sql = f"UPDATE {table} SET {', '.join(f'{c} = ?' for c, _, _ in columns)} WHERE {key} = ?"
+        params = frame_to_params(updates, columns + [(key, key, key_kind)])
+        for i in range(0, len(params), chunk_size):
+            cursor.executemany(sql, params[i:i + chunk_size])
+
+    inserts = totals[~exists & ~gone]
+    if not inserts.empty:
+        insert_frame(cursor, table, inserts, [(key, key, key_kind)] + columns, chunk_size)
+
+    summary.update(inserted=len(inserts), updated=len(updates), deleted=len(deletes))
+
+    return summary
+
+
+def update_career_stats(cursor, mundialito_id, df, tables, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Swap the tournament's stored contribution for the new one. Call inside the
+    import transaction, before the per-tournament tables are rewritten.
+    """
+    old = stored_contribution(cursor, mundialito_id)
+    new = tournament_contribution(df, tables)
+
+    return apply_contribution(cursor, old, new, chunk_size)
+
+
+def apply_contribution(cursor, old, new, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Apply new - old (stored_contribution/tournament_contribution dicts) to both career tables."""
+    summary = {}
+    for table in CAREER_TABLES:
+        summary[table] = apply_delta(cursor, table, old[table], new[table], chunk_size)
+        print(
+            f"{table}: {summary[table]['inserted']} inserted, "
+            f"{summary[table]['updated']} updated, {summary[table]['deleted']} deleted"
+        )
+
+    return summary
+
+
+def rebuild_career_tables(cursor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute both tables from every stored tournament, inside the caller's transaction."""
+    for table in CAREER_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+
+    totals = stored_contribution(cursor)
+
+    for table in CAREER_TABLES:
+        frame = with_rates(totals[table].copy(), table)
+        key, key_kind = CAREER_TABLES[table]["key"]
+        columns = [(key, key, key_kind)] + [(c, c, int) for c in CAREER_TABLES[table]["counts"]] + [
+            (r, r, float) for r in CAREER_TABLES[table]["rates"]
+        ]
+        insert_frame(cursor, table, frame.rename_axis(key).reset_index(), columns, chunk_size)
+
+
+def fill_career_stats(storage, cursor):
+    """Schema migration step: fill the new, empty tables from the tournaments already stored."""
+    cursor.execute(
+        "SELECT (SELECT COUNT(*) FROM PlayerCareerStats), (SELECT COUNT(*) FROM PlayerTournamentStats)"
+    )
+    career_rows, tournament_rows = cursor.fetchone()
+
+    if career_rows == 0 and tournament_rows > 0:
+        rebuild_career_tables(cursor)
+
+
+def rebuild_career_stats(storage, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute both tables from every stored tournament (one-off backfill or repair)."""
+    cursor = storage.cursor()
+    storage.begin()
+
+    try:
+        rebuild_career_tables(cursor, chunk_size)
+        storage.commit()
+    except Exception:
+        storage.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain PlayerCareerStats and TeamHistory.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute both tables from all tournaments")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.error("imports keep the tables current; use --rebuild to recompute them from scratch")
+
+    config = load_config()
+    storage = connect(config)
+
+    try:
+        rebuild_career_stats(storage, config.get("importChunkSize", DEFAULT_CHUNK_SIZE))
+    finally:
+        storage.close()
+
+    print("Career stats rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
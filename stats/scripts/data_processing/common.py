@@ -0,0 +1,83 @@
+import glob
+import json
+import os
+import re
+
+from storage import open_storage
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# config.json at the repository root, wherever the script is started from;
+# the MUNDIALITO_CONFIG environment variable points at another one
+CONFIG_PATH = os.path.join(SCRIPTS_DIR, "..", "..", "..", "config.json")
+
+# config entries holding paths; relative ones are relative to this folder,
+# where the scripts always had to be started from
+PATH_KEYS = ["inputPath", "outputPath", "aliasesPath", "sqlitePath", "idIndexPath", "metricsLog", "snapshotPath"]
+
+# mundialito_<id>_<yyyy-mm-dd>.csv, or mundialito_<id>_<yyyy-mm-dd>_STAGING.<csv|parquet|arrow>
+TOURNAMENT_FILE_RE = re.compile(r"^mundialito_(\d+)_(\d{4}-\d{2}-\d{2})(_STAGING)?\.(csv|parquet|arrow)$")
+
+
+def load_config(path=None):
+    path = path or os.environ.get("MUNDIALITO_CONFIG") or CONFIG_PATH
+
+    with open(path, "r") as f:
+        config = json.load(f)
+
+    for key in PATH_KEYS:
+        if config.get(key) and not os.path.isabs(config[key]):
+            config[key] = os.path.normpath(os.path.join(SCRIPTS_DIR, config[key]))
+
+    return config
+
+
+def connect(config):
+    """Open the configured Storage backend (SQL Server unless config says "storage": "sqlite")."""
+    return open_storage(config)
+
+
+def parse_tournament_file(file_path):
+    """Return (mundialito_id, date_str) from a mundialito_<id>_<date>[_STAGING].<ext> path."""
+    m = TOURNAMENT_FILE_RE.match(os.path.basename(file_path))
+
+    if not m:
+        raise ValueError(f"Not a mundialito_<id>_<date>.csv file: {file_path}")
+
+    return int(m.group(1)), m.group(2)
+
+
+def find_tournament_file(folder, mund_id, ext="csv"):
+    search_pattern = os.path.join(folder, f"mundialito_{mund_id}_*.{ext}")
+    matching_files = glob.glob(search_pattern)
+
+    if len(matching_files) == 0:
+        raise FileNotFoundError(f"No file found matching: {search_pattern}")
+
+    if len(matching_files) > 1:
+        raise RuntimeError(f"Multiple files found matching: {search_pattern}\nFiles: {matching_files}")
+
+    return matching_files[0]
+
+
+def find_tournament_files(folder, staging=False, ext="csv"):
+    """
+    Every mundialito_<id>_<date>.csv in folder (or *_STAGING.<ext> when staging=True),
+    as (mundialito_id, date_str, path) sorted by mundialito id.
+    """
+    found = {}
+
+    for path in glob.glob(os.path.join(folder, f"mundialito_*.{ext}")):
+        m = TOURNAMENT_FILE_RE.match(os.path.basename(path))
+
+        if not m or bool(m.group(3)) != staging:
+            continue
+
+        mund_id = int(m.group(1))
+
+        if mund_id in found:
+            raise RuntimeError(f"Multiple files for Mundialito {mund_id}: {found[mund_id][2]}, {path}")
+
+        found[mund_id] = (mund_id, m.group(2), path)
+
+    return [found[k] for k in sorted(found)]
@@ -0,0 +1,185 @@
+"""
+Concurrent import: the per-tournament table rows are sent over parallel connections.
+
+Enabled with config "importWorkers" (> 1; 0 or 1 keeps import_staging). The
+row payloads of the five tables are derived up front and cut into importWorkers
+groups of about the same number of rows (PlayerGameStats, by far the largest
+table, is split across several groups). Each group is bulk-inserted by a loader
+connection of its own into load tables (<Table>_Load: same columns plus LoadId,
+no keys or constraints), all groups at once, so their round trips overlap
+instead of queueing behind each other. Load tables are created on first use; on
+SQLite every loader writes a file of its own next to the database, since SQLite
+allows one writer per file (and at most 10 attached files, so up to 10 workers).
+
+Atomicity comes from the main connection: while the loads run, its one
+transaction inserts Players/Teams, updates the career tables and writes
+PlayerLeaderboard; once every load is done it replaces each table's tournament
+rows with INSERT ... SELECT from the load tables (this run's LoadId only) and
+commits. A failed load leaves
+the real tables untouched; its leftover load rows are cleared by the next
+import of the same tournament.
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from bulk_writer import DEFAULT_CHUNK_SIZE, insert_frame
+from career_stats import update_career_stats
+from import_data_current import (
+    TABLE_COLUMNS, check_staging, derive_tables, insert_mundialito, insert_new_players_and_teams
+)
+from instrumentation import stage
+from leaderboard import leaderboard_frame, replace_leaderboard
+from manifest import record_import, staging_hash
+
+LOAD_COLUMNS = {table: columns + [("LoadId", str)] for table, columns in TABLE_COLUMNS.items()}
+
+
+def split_payloads(tables, groups, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Cut the tables' rows, in table order, into at most groups lists of (table, frame
+    slice) of similar size; never below chunk_size rows a group, so small imports use fewer loaders.
+    """
+    total = sum(len(frame) for frame in tables.values())
+    per_group = max(chunk_size, -(-total // groups))
+
+    split, current, room = [], [], per_group
+
+    for table, frame in tables.items():
+        start = 0
+        while start < len(frame):
+            take = min(room, len(frame) - start)
+            current.append((table, frame.iloc[start:start + take]))
+            start += take
+            room -= take
+
+            if room == 0:
+                split.append(current)
+                current, room = [], per_group
+
+    if current:
+        split.append(current)
+
+    return split
+
+
+def fill_load_tables(storage, slot, payload, load_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert one group's slices into the load tables, on loader connection slot. Returns seconds taken."""
+    start = time.perf_counter()
+    loader = storage.open_loader(slot)
+    cursor = loader.cursor()
+
+    try:
+        loader.begin()
+
+        for table, frame in payload:
+            name = loader.load_table(table)
+            loader.ensure_load_table(cursor, table, LOAD_COLUMNS[table])
+
+            # rows an earlier, failed import of this tournament left behind
+            cursor.execute(
+                f"DELETE FROM {name} WHERE MundialitoId = ? AND LoadId <> ?", (int(frame["MundialitoId"].iloc[0]), load_id)
+            )
+            insert_frame(
+                cursor, name, frame.assign(LoadId=load_id),
+                [(c, c, kind) for c, kind in LOAD_COLUMNS[table]], chunk_size
+            )
+
+        loader.commit()
+    except Exception:
+        loader.rollback()
+        raise
+    finally:
+        cursor.close()
+        loader.close()
+
+    return time.perf_counter() - start
+
+
+def swap_in(storage, cursor, table, mundialito_id, load_id, slots):
+    """
+    Replace table's rows for mundialito_id with the rows the loaders in slots
+    loaded under load_id; runs in the caller's transaction.
+    """
+    columns = ", ".join(c for c, _ in TABLE_COLUMNS[table])
+
+    cursor.execute(f"DELETE FROM {table} WHERE MundialitoId = ?", (mundialito_id,))
+
+    for source in storage.load_sources(table, slots):
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {source} WHERE LoadId = ?", (load_id,))
+        cursor.execute(f"DELETE FROM {source} WHERE LoadId = ?", (load_id,))
+
+
+def import_staging_concurrent(storage, df, mund_date, chunk_size=DEFAULT_CHUNK_SIZE, workers=5,
+                              input_key=None, staging_key=None):
+    """
+    import_staging with the table payloads loaded over up to workers parallel
+    connections while storage's own transaction writes Players/Teams and the career
+    tables, then swapped in by that same transaction.
+    """
+    mundialito_id = check_staging(df)
+    print(f"Importing for MundialitoId = {mundialito_id} over {workers} connection(s)")
+
+    if staging_key is None:
+        staging_key = staging_hash(df)
+
+    if df.isna().to_numpy().any():
+        df = df.where(pd.notnull(df), None)
+
+    with stage("import.derive", rows=len(df), mundialito_id=mundialito_id):
+        tables = derive_tables(df)
+
+    payloads = split_payloads(tables, workers, chunk_size)
+    load_id = uuid.uuid4().hex
+
+    storage.attach_loaders(range(len(payloads)))
+    cursor = storage.cursor()
+    pool = ThreadPoolExecutor(max_workers=len(payloads))
+
+    try:
+        storage.begin()
+
+        futures = [
+            pool.submit(fill_load_tables, storage, slot, payload, load_id, chunk_size)
+            for slot, payload in enumerate(payloads)
+        ]
+
+        # meanwhile, on the main connection (other tables, so nothing blocks)
+        with stage("import.players_teams", mundialito_id=mundialito_id):
+            insert_mundialito(storage, cursor, mundialito_id, mund_date)
+            insert_new_players_and_teams(storage, cursor, df, chunk_size)
+
+        with stage("import.career_stats", mundialito_id=mundialito_id):
+            update_career_stats(cursor, mundialito_id, df, tables, chunk_size)
+
+        with stage("import.PlayerLeaderboard", mundialito_id=mundialito_id) as s:
+            s.rows = replace_leaderboard(cursor, mundialito_id, leaderboard_frame(df, tables), chunk_size)
+
+        with stage("import.load", rows=sum(len(f) for f in tables.values()), workers=len(payloads),
+                   mundialito_id=mundialito_id):
+            # result() re-raises a failed load before anything is swapped in
+            for slot, future in enumerate(futures):
+                parts = ", ".join(f"{len(frame)} {table}" for table, frame in payloads[slot])
+                print(f"Loader {slot}: {parts} rows in {future.result():.3f}s")
+
+        with stage("import.swap", rows=sum(len(f) for f in tables.values()), mundialito_id=mundialito_id):
+            for table in tables:
+                slots = [slot for slot, payload in enumerate(payloads) if any(t == table for t, _ in payload)]
+                swap_in(storage, cursor, table, mundialito_id, load_id, slots)
+
+        with stage("import.commit", mundialito_id=mundialito_id):
+            record_import(cursor, mundialito_id, input_key, staging_key)
+            storage.commit()
+        print("Import completed successfully.")
+
+    except Exception:
+        print("ERROR during import, rolling back...")
+        storage.rollback()
+        raise
+
+    finally:
+        pool.shutdown(wait=True)
+        cursor.close()
+        storage.detach_loaders()
@@ -1,53 +1,16 @@
+import argparse
 import pandas as pd
-import pyodbc
-import re
+import numpy as np
 import os
-import json
-import glob
-
-with open("../../../config.json", "r") as f:
-    config = json.load(f)
-
-MUND_ID = config["mundialitoId"]
-input_path = config["inputPath"]
-out_path = config["outputPath"]
-
-search_pattern = os.path.join(input_path, f"mundialito_{MUND_ID}*.csv")
-matching_files = glob.glob(search_pattern)
-
-if len(matching_files) == 0:
-    raise FileNotFoundError(f"No file found matching: {search_pattern}")
-
-if len(matching_files) > 1:
-    raise RuntimeError(f"Multiple files found matching: {search_pattern}\nFiles: {matching_files}")
-
-file_path = matching_files[0]
-
-basename = os.path.basename(file_path).replace(".csv", "_STAGING.csv")
-output_csv = os.path.join(out_path, basename)
-
-print("Input file found:", file_path)
-print("Output staging file:", output_csv)
-
-conn_str = (
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={config['server']};"
-    f"DATABASE={config['database']};"
-    "Trusted_Connection=yes;"
-)
-
-conn = pyodbc.connect(conn_str)
-cursor = conn.cursor()
-
-MUND_STR = str.split(file_path, "/")[-1]
-MUND_NAME = str.split(MUND_STR, "_")[0].capitalize() + " " + str(MUND_ID)
-MUND_DATE = str.split(str.split(MUND_STR, "_")[2], ".")[0]
-
-df = pd.read_csv(file_path, index_col=False)
-df = df.drop(columns=df.columns[df.columns.str.startswith("Unnamed")])
-
-# DATA VALIDATION
 
+from common import load_config, connect, find_tournament_file
+from game_ids import pack_game_ids
+from id_index import open_index
+from instrumentation import configure, stage
+from manifest import input_hash, record_staging, registry_fingerprint, staging_is_current
+from name_matching import DEFAULT_SIMILARITY, SnapshotRegistry, load_aliases, match_names, print_report
+from staging_format import apply_staging_dtypes, write_staging
+from validation import check_goals
 
 # NEW HEADERS
 
@@ -58,6 +21,21 @@ EXPECTED_COLUMNS = [
     "GoalsConceded", "Game", "MVP"
 ]
 
+# read-time dtypes: names/abbreviations/WL repeat on every row, counts are small
+INPUT_DTYPES = {
+    "Name": "category",
+    "TeamName": "category",
+    "TeamAbbr": "category",
+    "OppName": "category",
+    "OppAbbr": "category",
+    "WL": "category",
+    "Goals": "int16",
+    "Assists": "int16",
+    "GoalsConceded": "int16",
+    "Game": "int16",
+    "MVP": "int8",
+}
+
 """
 
 # OLD HEADERS
@@ -66,209 +44,430 @@ EXPECTED_COLUMNS = [
 ]
 
 """
-print(df.columns)
-assert list(df.columns) == EXPECTED_COLUMNS
 
-# NEW DATA VALIDATION
 
-# Win loss input check
+def staging_path(file_path, out_path, fmt="csv"):
+    basename = os.path.basename(file_path).replace(".csv", f"_STAGING.{fmt}")
+    return os.path.join(out_path, basename)
 
-assert df["WL"].isin(["W", "L", "D"]).all()
 
-# Total goals scored == Total goals conceded
+def read_input(file_path):
+    df = pd.read_csv(file_path, index_col=False, dtype=INPUT_DTYPES)
+    df = df.drop(columns=df.columns[df.columns.str.startswith("Unnamed")])
 
-game_ids = []
+    print(df.columns)
+    assert list(df.columns) == EXPECTED_COLUMNS
 
-for _, row in df.iterrows():
-    team_abbr = row["TeamAbbr"]
-    opp_abbr = row["OppAbbr"]
-    game = row["Game"]
+    return df
 
-    if team_abbr < opp_abbr:
-        game_id = f"{team_abbr}-{opp_abbr}-{game}"
-    else:
-        game_id = f"{opp_abbr}-{team_abbr}-{game}"
 
-    game_ids.append(game_id)
+def add_row_columns(df):
+    """Row-local checks and columns: WL values, GameIdStr and CleanSheet. Safe to run per chunk."""
 
-df["GameIdStr"] = game_ids
+    # Win loss input check
 
-for game_id_str, g in df.groupby("GameIdStr"):
-    teams = g["TeamAbbr"].unique()
+    assert df["WL"].isin(["W", "L", "D"]).all()
 
-    if len(teams) != 2:
-        raise ValueError(f"Game {game_id_str} does not have exactly 2 teams")
+    team_abbr = df["TeamAbbr"].astype(str)
+    opp_abbr = df["OppAbbr"].astype(str)
 
-    teamA, teamB = teams[0], teams[1]
+    team_first = (team_abbr < opp_abbr).to_numpy()
+    abbr_lo = np.where(team_first, team_abbr, opp_abbr)
+    abbr_hi = np.where(team_first, opp_abbr, team_abbr)
 
-    A_goals = g[g["TeamAbbr"] == teamA]["Goals"].sum()
-    A_conceded = g[g["TeamAbbr"] == teamA]["GoalsConceded"].max()
+    df["GameIdStr"] = (
+        pd.Series(abbr_lo, index=df.index, dtype=object) + "-"
+        + pd.Series(abbr_hi, index=df.index, dtype=object) + "-"
+        + df["Game"].astype(str)
+    )
 
-    B_goals = g[g["TeamAbbr"] == teamB]["Goals"].sum()
-    B_conceded = g[g["TeamAbbr"] == teamB]["GoalsConceded"].max()
+    df["CleanSheet"] = (df["GoalsConceded"] == 0).astype(int)
 
-    assert A_goals == B_conceded, f"Mismatch in game {game_id_str}: {teamA} scored {A_goals} but {teamB} conceded {B_conceded}"
-    assert B_goals == A_conceded, f"Mismatch in game {game_id_str}: {teamB} scored {B_goals} but {teamA} conceded {A_conceded}"
+    return df
 
 
-df["CleanSheet"] = (df["GoalsConceded"] == 0).astype(int)
+def validate_input(df):
+    """Data validation; adds the GameIdStr and CleanSheet columns."""
+    df = add_row_columns(df)
 
-# OLD DATA STATS
+    # Total goals scored == Total goals conceded
 
-# existing players
-cursor.execute("SELECT PlayerId, Name FROM Players;")
-existing_players = cursor.fetchall()
+    check_goals(df)
 
-name_to_existing_player_id = {row.Name: row.PlayerId for row in existing_players}
+    return df
 
-cursor.execute("SELECT ISNULL(MAX(PlayerId), 0) FROM Players;")
-max_player_id = cursor.fetchone()[0]
 
-print(f"Existing players: {len(name_to_existing_player_id)}, max PlayerId in DB: {max_player_id}")
+def load_existing_ids(storage):
+    """Snapshot of the Players/Teams registry: name/team-key -> id maps plus the current max ids."""
+    cursor = storage.cursor()
 
-# existing teams (only used when pushing to database a second time for the same tourney)
-cursor.execute("""
-    SELECT TeamId, TeamName, TeamAbbr, MundialitoId
-    FROM Teams;
-""")
-existing_teams = cursor.fetchall()
+    # existing players
+    cursor.execute("SELECT PlayerId, Name FROM Players;")
+    existing_players = cursor.fetchall()
+
+    name_to_existing_player_id = {name: player_id for player_id, name in existing_players}
+
+    max_player_id = storage.max_id(cursor, "Players", "PlayerId")
+
+    print(f"Existing players: {len(name_to_existing_player_id)}, max PlayerId in DB: {max_player_id}")
+
+    # existing teams (only used when pushing to database a second time for the same tourney)
+    cursor.execute("""
+        SELECT TeamId, TeamName, TeamAbbr, MundialitoId
+        FROM Teams;
+    """)
+    existing_teams = cursor.fetchall()
+
+    existing_team_key_to_id = {
+        (team_name, team_abbr, mid): team_id
+        for team_id, team_name, team_abbr, mid in existing_teams
+    }
+
+    print(f"Existing teams: {len(existing_team_key_to_id)} total")
+
+    max_team_id = storage.max_id(cursor, "Teams", "TeamId")
+    print(f"Max TeamId in DB: {max_team_id}")
+
+    cursor.close()
+
+    return {
+        "players": name_to_existing_player_id,
+        "max_player_id": max_player_id,
+        "teams": existing_team_key_to_id,
+        "max_team_id": max_team_id,
+    }
+
+
+def lookup_existing_ids(index, df, mund_id, existing=None):
+    """
+    Like load_existing_ids, but only for df's players and mund_id's teams, read from a
+    synced IdIndex. Pass the running snapshot as existing to fold another file into it.
+    """
+    if existing is None:
+        existing = {
+            "players": {},
+            "max_player_id": index.max_player_id(),
+            "teams": {},
+            "max_team_id": index.max_team_id(),
+        }
+
+    names = [name for name in df["Name"].unique() if name not in existing["players"]]
+    found_players = index.lookup_players(names)
+    found_teams = index.lookup_teams(mund_id)
+
+    existing["players"].update(found_players)
+    existing["teams"].update(found_teams)
+
+    print(f"Id index: {len(found_players)} of {len(names)} players and {len(found_teams)} teams already registered, "
+          f"max PlayerId {existing['max_player_id']}, max TeamId {existing['max_team_id']}")
+
+    return existing
+
+
+def resolve_existing_ids(storage, index, df, mund_id, existing=None):
+    """Existing-id snapshot covering df: from the id index if configured, else one full load of the registry."""
+    if index is not None:
+        return lookup_existing_ids(index, df, mund_id, existing)
+
+    if existing is None:
+        existing = load_existing_ids(storage)
+
+    return existing
+
+
+def resolve_file(storage, index, config, df, awards, mund_id, existing=None):
+    """
+    Resolve the file's player/team spellings against the registry (reporting suspected
+    duplicates), then get the existing-id snapshot for the resolved names.
+    """
+    if index is None and existing is None:
+        existing = load_existing_ids(storage)
+
+    registry = index if index is not None else SnapshotRegistry(existing)
+
+    matched, report = match_names(
+        df, mund_id, registry, load_aliases(config.get("aliasesPath")),
+        config.get("duplicateSimilarity", DEFAULT_SIMILARITY)
+    )
+    print_report(report)
+
+    if not matched["Name"].equals(df["Name"]):
+        awards = compute_awards(matched)
+
+    existing = resolve_existing_ids(storage, index, matched, mund_id, existing)
+
+    return matched, awards, existing
+
+
+def assign_ids(df, mund_id, existing):
+    """
+    Resolve every player and team in df against the existing registry. New names get
+    ids above the current max in first-appearance order, so the result is deterministic.
+    """
+    ids = assign_name_ids(
+        df["Name"].unique(),
+        df[["TeamName", "TeamAbbr"]].drop_duplicates().itertuples(index=False),
+        mund_id, existing
+    )
+    print(f"Total games in staging for Mundialito {mund_id}: {df['GameIdStr'].nunique()}")
+
+    return ids
+
+
+def assign_name_ids(names, teams, mund_id, existing):
+    """assign_ids for player names and (TeamName, TeamAbbr) pairs given in first-appearance order."""
+    name_to_existing_player_id = existing["players"]
+    existing_team_key_to_id = existing["teams"]
+    max_player_id = existing["max_player_id"]
+    max_team_id = existing["max_team_id"]
+
+    player_name_to_id = dict(name_to_existing_player_id)
+    player_name_is_new = {name: False for name in name_to_existing_player_id}
+
+    for name in names:
+        if name not in player_name_to_id:
+            max_player_id += 1
+            player_name_to_id[name] = max_player_id
+            player_name_is_new[name] = True
+
+    team_key_to_id = {}
+    team_key_is_new = {}
+
+    for team_name, team_abbr in teams:
+        key = (team_name, team_abbr, mund_id)
+
+        if key in existing_team_key_to_id:
+            team_id = existing_team_key_to_id[key]
+            is_new = False
+        else:
+            max_team_id += 1
+            team_id = max_team_id
+            is_new = True
+
+        team_key_to_id[key] = team_id
+        team_key_is_new[key] = is_new
+
+    print(f"Total players in staging: {len(player_name_to_id)}")
+    print(f"Total teams in staging for Mundialito {mund_id}: {len(team_key_to_id)}")
+
+    return {
+        "player_name_to_id": player_name_to_id,
+        "player_name_is_new": player_name_is_new,
+        "team_key_to_id": team_key_to_id,
+        "team_key_is_new": team_key_is_new,
+    }
+
+
+def compute_awards(df):
+    """Names winning MVP, Golden Boot (most goals) and Playmaker (most assists); ties share."""
+    player_ga = df.groupby(
+            ["Name", "TeamAbbr"],
+            as_index=False,
+            observed=True
+        ).agg({
+            "Goals": "sum",
+            "Assists": "sum",
+        })
+
+    max_goals = player_ga["Goals"].max()
+    max_assists = player_ga["Assists"].max()
+
+    golden_boot_keys = set(player_ga.loc[player_ga["Goals"] == max_goals, "Name"])
+    playmaker_keys = set(player_ga.loc[player_ga["Assists"] == max_assists, "Name"])
+    mvp_keys = set(df.loc[df["MVP"] == 1, "Name"])
+
+    print("Max Goals: ")
+    print(max_goals)
+    print("Golden Boot Winners: ")
+    print(golden_boot_keys)
+    print(max_assists)
+    print("Playmaker Winners")
+    print(playmaker_keys)
+
+    return {
+        "mvp": mvp_keys,
+        "golden_boot": golden_boot_keys,
+        "playmaker": playmaker_keys,
+    }
+
+
+def build_staging(df, mund_id, ids, awards):
+    player_name_to_id = ids["player_name_to_id"]
+    player_name_is_new = ids["player_name_is_new"]
+    team_key_to_id = ids["team_key_to_id"]
+    team_key_is_new = ids["team_key_is_new"]
+    mvp_keys = awards["mvp"]
+    golden_boot_keys = awards["golden_boot"]
+    playmaker_keys = awards["playmaker"]
+
+    # (TeamName, TeamAbbr) -> TeamId / IsNewTeam for this mundialito, looked up for whole columns at once
+    team_lookup = pd.DataFrame(
+        [(name, abbr, team_id, team_key_is_new[(name, abbr, mid)])
+         for (name, abbr, mid), team_id in team_key_to_id.items()],
+        columns=["TeamName", "TeamAbbr", "TeamId", "IsNewTeam"],
+    ).set_index(["TeamName", "TeamAbbr"])
+
+    team_idx = pd.MultiIndex.from_arrays([df["TeamName"], df["TeamAbbr"]])
+    opp_idx = pd.MultiIndex.from_arrays([df["OppName"], df["OppAbbr"]])
+
+    team_ids = team_lookup["TeamId"].reindex(team_idx).to_numpy()
+    opp_ids = team_lookup["TeamId"].reindex(opp_idx).to_numpy()
+
+    if pd.isna(opp_ids).any():
+        missing_opps = df.loc[pd.isna(opp_ids), ["OppName", "OppAbbr"]].drop_duplicates()
+        raise KeyError(f"Opponents never appear as a team in this mundialito:\n{missing_opps}")
+
+    team_ids = team_ids.astype(np.int64)
+    opp_ids = opp_ids.astype(np.int64)
+
+    game_ids = pack_game_ids(
+        mund_id, np.minimum(team_ids, opp_ids), np.maximum(team_ids, opp_ids), df["Game"].to_numpy()
+    )
+
+    staging_df = pd.DataFrame({
+        "PlayerId": df["Name"].map(player_name_to_id).astype(np.int64),
+        "MundialitoId": mund_id,
+        "TeamId": team_ids,
+        "OppId": opp_ids,
+        "Game": df["Game"].astype(np.int64),
+        "WL": df["WL"].astype(str),
+        "Pts": df["WL"].map({"W": 3, "D": 1, "L": 0}).astype(np.int64),
+        "Goals": df["Goals"].astype(np.int64),
+        "Assists": df["Assists"].astype(np.int64),
+        "CleanSheet": df["CleanSheet"].astype(np.int64),
+        "GoalsConceded": df["GoalsConceded"].astype(np.int64),
+
+        "GameId": game_ids,
+        "GameIdStr": df["GameIdStr"].astype(str),
+
+        "PlayerName": df["Name"],
+        "TeamName": df["TeamName"],
+        "TeamAbbr": df["TeamAbbr"],
+        "OppName": df["OppName"],
+        "OppAbbr": df["OppAbbr"],
+        "IsNewPlayer": df["Name"].map(player_name_is_new).fillna(False).astype(bool),
+        "IsNewTeam": team_lookup["IsNewTeam"].reindex(team_idx).to_numpy().astype(bool),
+
+        "IsMVP": df["Name"].isin(list(mvp_keys)),
+        "IsGoldenBoot": df["Name"].isin(list(golden_boot_keys)),
+        "IsPlaymaker": df["Name"].isin(list(playmaker_keys)),
+    }).reset_index(drop=True)
+
+    staging_df = staging_df.sort_values(
+        ["TeamId", "PlayerName"]
+    ).reset_index(drop=True)
+
+    return apply_staging_dtypes(staging_df)
+
+
+def register_new_ids(existing, ids):
+    """Fold the players/teams assign_ids minted into the snapshot so the next tournament continues from them."""
+    for name, is_new in ids["player_name_is_new"].items():
+        if is_new:
+            player_id = ids["player_name_to_id"][name]
+            existing["players"][name] = player_id
+            existing["max_player_id"] = max(existing["max_player_id"], player_id)
+
+    for key, is_new in ids["team_key_is_new"].items():
+        if is_new:
+            team_id = ids["team_key_to_id"][key]
+            existing["teams"][key] = team_id
+            existing["max_team_id"] = max(existing["max_team_id"], team_id)
+
+    return existing
+
+
+def prepare_file(file_path):
+    """The database-free part of staging: read, validate and pick award winners."""
+    with stage("read_csv", file=os.path.basename(file_path)) as s:
+        df = read_input(file_path)
+        s.rows = len(df)
+
+    with stage("validate", rows=len(df)):
+        df = validate_input(df)
+
+    with stage("awards", rows=len(df)):
+        awards = compute_awards(df)
+
+    return df, awards
+
+
+def stage_tournament(storage, index, config, file_path, output_csv, mund_id):
+    """Stage one tournament file into output_csv (chunked when "streamChunkRows" is set)."""
+    chunk_rows = config.get("streamChunkRows", 0)
+
+    if chunk_rows:
+        # imported here: streaming builds on this module's functions
+        from streaming import stream_staging
+
+        if index is not None:
+            with stage("sync_id_index"):
+                print(f"Id index sync: {index.sync(storage)}")
+
+        rows, _ = stream_staging(storage, index, config, file_path, output_csv, mund_id, chunk_rows)
+        print(f"\nStaging file created in chunks of {chunk_rows} rows ({rows} rows, no DB modifications):\n{output_csv}")
+        return
+
+    df, awards = prepare_file(file_path)
+
+    with stage("load_ids", mundialito_id=mund_id) as s:
+        if index is not None:
+            print(f"Id index sync: {index.sync(storage)}")
+        df, awards, existing = resolve_file(storage, index, config, df, awards, mund_id)
+
+        s.rows = len(existing["players"]) + len(existing["teams"])
+
+    with stage("assign_ids", rows=len(df), mundialito_id=mund_id):
+        ids = assign_ids(df, mund_id, existing)
+
+    with stage("build_staging", rows=len(df), mundialito_id=mund_id):
+        staging_df = build_staging(df, mund_id, ids, awards)
+
+    with stage("write_staging", rows=len(staging_df), mundialito_id=mund_id):
+        write_staging(staging_df, output_csv)
+    print(f"\nStaging file created (no DB modifications):\n{output_csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the configured tournament's staging file.")
+    parser.add_argument("--force", action="store_true", help="re-stage even if the input is unchanged")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure(config, "csv_creator_current")
+
+    MUND_ID = config["mundialitoId"]
+    input_path = config["inputPath"]
+    out_path = config["outputPath"]
+    staging_fmt = config.get("stagingFormat", "csv")
+
+    file_path = find_tournament_file(input_path, MUND_ID)
+    output_csv = staging_path(file_path, out_path, staging_fmt)
+
+    print("Input file found:", file_path)
+    print("Output staging file:", output_csv)
+
+    storage = connect(config)
+    index = None
+
+    try:
+        with stage("check_manifest", mundialito_id=MUND_ID):
+            input_key = input_hash(file_path, config.get("aliasesPath"))
+            fingerprint = registry_fingerprint(storage)
+            unchanged = staging_is_current(out_path, MUND_ID, input_key, fingerprint, output_csv)
+
+        if unchanged and not args.force:
+            print(f"Mundialito {MUND_ID} input and registry unchanged, keeping {output_csv} (--force to re-stage).")
+            return
+
+        index = open_index(config)
+        stage_tournament(storage, index, config, file_path, output_csv, MUND_ID)
+        record_staging(out_path, MUND_ID, input_key, fingerprint, output_csv)
+    finally:
+        if index is not None:
+            index.close()
+        storage.close()
 
-existing_team_key_to_id = {
-    (row.TeamName, row.TeamAbbr, row.MundialitoId): row.TeamId
-    for row in existing_teams
-}
 
-print(f"Existing teams: {len(existing_team_key_to_id)} total")
-
-cursor.execute("SELECT ISNULL(MAX(TeamId), 0) FROM Teams;")
-max_team_id = cursor.fetchone()[0]
-print(f"Max TeamId in DB: {max_team_id}")
-
-player_name_to_id = dict(name_to_existing_player_id)
-player_name_is_new = {name: False for name in name_to_existing_player_id}
-
-for name in df["Name"].unique():
-    if name not in player_name_to_id:
-        max_player_id += 1
-        player_name_to_id[name] = max_player_id
-        player_name_is_new[name] = True
-
-team_key_to_id = {}
-team_key_is_new = {}
-
-unique_teams = df[["TeamName", "TeamAbbr"]].drop_duplicates()
-
-for _, row in unique_teams.iterrows():
-    team_name = row["TeamName"]
-    team_abbr = row["TeamAbbr"]
-    key = (team_name, team_abbr, MUND_ID)
-
-    if key in existing_team_key_to_id:
-        team_id = existing_team_key_to_id[key]
-        is_new = False
-    else:
-        max_team_id += 1
-        team_id = max_team_id
-        is_new = True
-
-    team_key_to_id[key] = team_id
-    team_key_is_new[key] = is_new
-
-print(f"Total players in staging: {len(player_name_to_id)}")
-print(f"Total teams in staging for Mundialito {MUND_ID}: {len(team_key_to_id)}")
-print(f"Total games in staging for Mundialito {MUND_ID}: {len(team_key_to_id)}")
-
-player_ga = df.groupby(
-        ["Name", "TeamAbbr"],
-        as_index=False
-    ).agg({
-        "Goals": "sum",
-        "Assists": "sum",
-    })
-
-max_goals = player_ga["Goals"].max()
-max_assists = player_ga["Assists"].max()
-
-golden_boot_keys = set(player_ga.loc[player_ga["Goals"] == max_goals, "Name"])
-playmaker_keys = set(player_ga.loc[player_ga["Assists"] == max_assists, "Name"])
-mvp_keys = set(df.loc[df["MVP"] == 1, "Name"])
-
-print("Max Goals: ")
-print(max_goals)
-print("Golden Boot Winners: ")
-print(golden_boot_keys)
-print(max_assists)
-print("Playmaker Winners")
-print(playmaker_keys)
-
-rows = []
-
-for _, row in df.iterrows():
-    name = row["Name"]
-    team_name = row["TeamName"]
-    team_abbr = row["TeamAbbr"]
-    opp_name = row["OppName"]
-    opp_abbr = row["OppAbbr"]
-    key = (team_name, team_abbr, MUND_ID)
-    opp_key = (opp_name, opp_abbr, MUND_ID)
-
-    player_id = player_name_to_id[name]
-    team_id = team_key_to_id[key]
-    opp_id = team_key_to_id[opp_key]
-
-    is_mvp = name in mvp_keys
-    is_golden_boot = name in golden_boot_keys
-    is_playmaker = name in playmaker_keys
-
-    if team_id < opp_id:
-        game_id = str(team_id) + "-" + str(opp_id) + "-" + str(row["Game"])
-    else:
-        game_id = str(opp_id) + "-" + str(team_id) + "-" + str(row["Game"])
-
-    match row["WL"]:
-        case "W":
-            pts = 3
-        case "D":
-            pts = 1
-        case "L":
-            pts = 0
-        case _:
-            print(f"Invalid WL input for game {str(row["GameIdStr"])}")
-
-    rows.append({
-        "PlayerId": player_id,
-        "MundialitoId": MUND_ID,
-        "TeamId": team_id,
-        "OppId": opp_id,
-        "Game": int(row["Game"]),
-        "WL": str(row["WL"]),
-        "Pts": pts,
-        "Goals": int(row["Goals"]),
-        "Assists": int(row["Assists"]),
-        "CleanSheet": int(row["CleanSheet"]),
-        "GoalsConceded": int(row["GoalsConceded"]),
-
-        "GameId": game_id,
-        "GameIdStr": str(row["GameIdStr"]),
-
-        "PlayerName": name,
-        "TeamName": team_name,
-        "TeamAbbr": team_abbr,
-        "OppName": opp_name,
-        "OppAbbr": opp_abbr,
-        "IsNewPlayer": player_name_is_new.get(name, False),
-        "IsNewTeam": team_key_is_new[key],
-
-        "IsMVP": is_mvp,
-        "IsGoldenBoot": is_golden_boot,
-        "IsPlaymaker": is_playmaker,
-    })
-
-staging_df = pd.DataFrame(rows)
-
-staging_df = staging_df.sort_values(
-    ["TeamId", "PlayerName"]
-).reset_index(drop=True)
-
-staging_df.to_csv(output_csv, index=False)
-print(f"\nStaging CSV created (no DB modifications):\n{output_csv}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
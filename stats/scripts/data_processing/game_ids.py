@@ -0,0 +1,120 @@
+"""
+Integer GameIds: (MundialitoId, TeamAId, TeamBId, Game) packed into one number.
+
+GameId used to be the string "<TeamAId>-<TeamBId>-<Game>" (nvarchar(50)), the
+Games primary key and the PlayerGameStats foreign key. It is now
+
+    MundialitoId << 41 | TeamAId << 24 | TeamBId << 7 | Game
+
+(12 + 17 + 17 + 7 bits), TeamAId the lower team id. That is a bigint on SQL
+Server and SQLite's rowid, computed from the row alone (no sequence, so
+staging stays independent of the database and re-staging gives the same ids),
+and below 2**53, so it also survives float64 and JavaScript numbers. The old
+string is kept in Games.GameCode for display only.
+
+Existing databases are converted by schema migration 6 (schema_migrations.py),
+which keeps the old ids in GameCode.
+"""
+import numpy as np
+
+from storage import SQLITE_SCHEMA
+
+# (name, bits), most significant first
+FIELDS = [("MundialitoId", 12), ("TeamAId", 17), ("TeamBId", 17), ("Game", 7)]
+SHIFTS = {"MundialitoId": 41, "TeamAId": 24, "TeamBId": 7, "Game": 0}
+
+
+def pack_game_ids(mundialito_id, team_a, team_b, game):
+    """Vectorized GameIds (int64); raises ValueError if a part does not fit its bits."""
+    parts = {
+        "MundialitoId": np.broadcast_to(np.asarray(mundialito_id, dtype=np.int64), np.shape(game)),
+        "TeamAId": np.asarray(team_a, dtype=np.int64),
+        "TeamBId": np.asarray(team_b, dtype=np.int64),
+        "Game": np.asarray(game, dtype=np.int64),
+    }
+
+    packed = np.zeros(np.shape(game), dtype=np.int64)
+
+    for name, bits in FIELDS:
+        values = parts[name]
+        if values.size and (values.min() < 0 or values.max() >= 1 << bits):
+            raise ValueError(f"{name} out of range for a packed GameId (0..{(1 << bits) - 1}): {values.max()}")
+        packed |= values << SHIFTS[name]
+
+    return packed
+
+
+def unpack_game_id(game_id):
+    """{MundialitoId, TeamAId, TeamBId, Game} of one GameId."""
+    return {name: (int(game_id) >> SHIFTS[name]) & ((1 << bits) - 1) for name, bits in FIELDS}
+
+
+def game_code(team_a, team_b, game):
+    """The former string GameId, "<TeamAId>-<TeamBId>-<Game>", vectorized over pandas Series."""
+    return team_a.astype(str) + "-" + team_b.astype(str) + "-" + game.astype(str)
+
+
+def convert_sqlite_game_ids(storage, cursor):
+    """
+    Schema migration step: convert a SQLite database with text GameIds in place,
+    inside the migration's transaction. Games and PlayerGameStats are rebuilt
+    from the current schema with packed ids, the old id moved to Games.GameCode.
+    Returns the number of games converted (0 if already done).
+    """
+    conn = storage.conn
+    columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(Games)")}
+
+    if "GameCode" in columns:
+        return 0
+
+    games = conn.execute("SELECT GameId, MundialitoId FROM Games").fetchall()
+    parts = np.array([[int(p) for p in old_id.split("-")] for old_id, _ in games], dtype=np.int64).reshape(-1, 3)
+    new_ids = pack_game_ids([m for _, m in games], parts[:, 0], parts[:, 1], parts[:, 2])
+    mapping = [(old_id, int(new_id)) for (old_id, _), new_id in zip(games, new_ids)]
+
+    # secondary indexes (schema_migrations.py) go with the old tables; recreated below
+    indexes = [sql for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        "AND tbl_name IN ('Games', 'PlayerGameStats')"
+    )]
+
+    # the usual SQLite table rebuild: move the old tables aside, create the new
+    # ones from the schema, copy across, drop the old ones. foreign_keys cannot
+    # be switched off inside a transaction, so the checks wait for the commit.
+    conn.execute("PRAGMA defer_foreign_keys = ON")
+    conn.execute("ALTER TABLE PlayerGameStats RENAME TO PlayerGameStats_Old")
+    conn.execute("ALTER TABLE Games RENAME TO Games_Old")
+
+    with open(SQLITE_SCHEMA, "r") as f:
+        for statement in f.read().split(";"):
+            if "CREATE TABLE IF NOT EXISTS Games " in statement or \
+                    "CREATE TABLE IF NOT EXISTS PlayerGameStats " in statement:
+                conn.execute(statement)
+
+    conn.execute("CREATE TEMP TABLE GameIdMap (OldId TEXT PRIMARY KEY, NewId INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO temp.GameIdMap VALUES (?, ?)", mapping)
+
+    conn.execute(
+        "INSERT INTO Games (GameId, MundialitoId, TeamAId, TeamBId, GoalsA, GoalsB, GameCode) "
+        "SELECT m.NewId, g.MundialitoId, g.TeamAId, g.TeamBId, g.GoalsA, g.GoalsB, g.GameId "
+        "FROM Games_Old g JOIN temp.GameIdMap m ON m.OldId = g.GameId"
+    )
+    conn.execute(
+        "INSERT INTO PlayerGameStats (GameId, PlayerId, TeamId, OppTeamId, WL, Goals, Assists, GoalsConceded, "
+        "MundialitoId) "
+        "SELECT m.NewId, s.PlayerId, s.TeamId, s.OppTeamId, s.WL, s.Goals, s.Assists, s.GoalsConceded, "
+        "s.MundialitoId FROM PlayerGameStats_Old s JOIN temp.GameIdMap m ON m.OldId = s.GameId"
+    )
+
+    conn.execute("DROP TABLE PlayerGameStats_Old")
+    conn.execute("DROP TABLE Games_Old")
+    conn.execute("DROP TABLE temp.GameIdMap")
+
+    for sql in indexes:
+        conn.execute(sql)
+
+    problems = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if problems:
+        raise RuntimeError(f"Foreign key violations after the GameId migration: {problems[:5]}")
+
+    return len(mapping)
@@ -0,0 +1,305 @@
+"""
+Local cache of the Players/Teams registry, so staging doesn't scan both tables.
+
+The index is a small SQLite file (config "idIndexPath") holding PlayerId by
+name (plus name_matching keys and trigrams for finding near-duplicates) and
+TeamId by (TeamName, TeamAbbr, MundialitoId). Before each lookup it
+is synced against the database with one query per table: COUNT and MAX of the
+id, and the table's change counter in RegistryVersion, which triggers bump on
+every UPDATE or DELETE (schema migration 7). If only new rows were added since
+the last sync (ids are handed out above the max, the counter has not moved)
+just those rows are fetched; if anything else changed (a rename, a deleted
+row), or the index belongs to another database, it is reloaded in full. A
+tournament then only looks up its own names, so resolving ids costs O(names in
+the file), not O(registry). Changes the triggers cannot see (edits with them
+disabled) need a rebuild:
+
+    python id_index.py --rebuild    # drop and reload the index from the database
+"""
+import argparse
+import os
+import sqlite3
+from collections import Counter
+
+from common import load_config, connect
+
+from name_matching import DEFAULT_SIMILARITY, jaccard, name_key, probe_grams, trigrams
+
+# bump when the stored layout or name_key changes; older index files are reloaded
+INDEX_VERSION = 5
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    player_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_players_name_key ON players (name_key);
+
+CREATE TABLE IF NOT EXISTS player_trigrams (
+    trigram TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    PRIMARY KEY (trigram, name_key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS trigram_counts (
+    trigram TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    team_name TEXT NOT NULL,
+    team_abbr TEXT NOT NULL,
+    mundialito_id INTEGER NOT NULL,
+    name_key TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    PRIMARY KEY (team_name, team_abbr, mundialito_id)
+);
+CREATE INDEX IF NOT EXISTS ix_teams_name_key ON teams (name_key);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INDEX_TABLES = ("players", "player_trigrams", "trigram_counts", "teams")
+
+# (index prefix, table, id column, the columns the index is built from)
+SYNCED_TABLES = [
+    ("player", "Players", "PlayerId", ["PlayerId", "Name"]),
+    ("team", "Teams", "TeamId", ["TeamId", "TeamName", "TeamAbbr", "MundialitoId"]),
+]
+
+# SQLite's default limit is 999 parameters per statement
+LOOKUP_CHUNK = 900
+
+
+class IdIndex:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # a file in an older layout: recreate its tables, sync then reloads them
+        if self._meta("version") != str(INDEX_VERSION):
+            for table in INDEX_TABLES:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+        self.conn.executescript(INDEX_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, **values):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in values.items()]
+        )
+
+    def max_player_id(self):
+        return int(self._meta("player_hwm", 0))
+
+    def max_team_id(self):
+        return int(self._meta("team_hwm", 0))
+
+    def sync(self, storage):
+        """Bring the index up to date with storage's Players/Teams. Returns how each table was synced."""
+        cursor = storage.cursor()
+
+        try:
+            if self._meta("source") != storage.source or self._meta("version") != str(INDEX_VERSION):
+                for table in INDEX_TABLES:
+                    self.conn.execute(f"DELETE FROM {table}")
+                self._set_meta(
+                    source=storage.source, version=INDEX_VERSION,
+                    player_hwm=0, player_count=0, player_changes=0, team_hwm=0, team_count=0, team_changes=0
+                )
+
+            result = {
+                f"{prefix}s": self._sync_table(cursor, prefix, table, id_column, columns)
+                for prefix, table, id_column, columns in SYNCED_TABLES
+            }
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        return result
+
+    def _sync_table(self, cursor, prefix, table, id_column, columns):
+        count = int(self._meta(f"{prefix}_count", 0))
+        hwm = int(self._meta(f"{prefix}_hwm", 0))
+        changes = int(self._meta(f"{prefix}_changes", 0))
+
+        cursor.execute(
+            f"SELECT t.n, t.hwm, r.Changes FROM (SELECT COUNT(*) AS n, COALESCE(MAX({id_column}), 0) AS hwm "
+            f"FROM {table}) t CROSS JOIN RegistryVersion r WHERE r.TableName = ?",
+            (table,),
+        )
+        db_count, db_max, db_changes = (int(v) for v in cursor.fetchone())
+        synced = {f"{prefix}_count": db_count, f"{prefix}_hwm": db_max, f"{prefix}_changes": db_changes}
+        select = f"SELECT {', '.join(columns)} FROM {table}"
+
+        if db_count == count and db_max == hwm and db_changes == changes:
+            return "current"
+
+        # nothing updated or deleted: fetch the rows above the ones already in the index
+        if db_changes == changes and db_max > hwm and count <= db_count:
+            cursor.execute(f"{select} WHERE {id_column} > ?", (hwm,))
+            rows = [tuple(r) for r in cursor.fetchall()]
+
+            if count + len(rows) == db_count:
+                self._store(prefix, rows, replace=False)
+                self._set_meta(**synced)
+                return f"{len(rows)} new"
+
+        cursor.execute(select)
+        rows = [tuple(r) for r in cursor.fetchall()]
+        self._store(prefix, rows, replace=True)
+        self._set_meta(**synced)
+
+        return f"reloaded {len(rows)}"
+
+    def _store(self, prefix, rows, replace):
+        if prefix == "player":
+            if replace:
+                for table in ("players", "player_trigrams", "trigram_counts"):
+                    self.conn.execute(f"DELETE FROM {table}")
+
+            keyed = [(name, name_key(name), player_id) for player_id, name in rows]
+            self.conn.executemany("INSERT OR REPLACE INTO players (name, name_key, player_id) VALUES (?, ?, ?)", keyed)
+
+            # counts only steer which trigrams similar_players probes, so a repeated key may count twice
+            postings = sorted({(gram, key) for _, key, _ in keyed for gram in trigrams(key)})
+            self.conn.executemany("INSERT OR IGNORE INTO player_trigrams (trigram, name_key) VALUES (?, ?)", postings)
+            self.conn.executemany(
+                "INSERT INTO trigram_counts (trigram, n) VALUES (?, ?) "
+                "ON CONFLICT (trigram) DO UPDATE SET n = n + excluded.n",
+                Counter(gram for gram, _ in postings).items(),
+            )
+        else:
+            if replace:
+                self.conn.execute("DELETE FROM teams")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO teams (team_name, team_abbr, mundialito_id, name_key, team_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(team_name, team_abbr, mid, name_key(team_name), team_id) for team_id, team_name, team_abbr, mid in rows],
+            )
+
+    def lookup_players(self, names):
+        found = {}
+        names = list(names)
+
+        for i in range(0, len(names), LOOKUP_CHUNK):
+            chunk = names[i:i + LOOKUP_CHUNK]
+            found.update(self.conn.execute(
+                f"SELECT name, player_id FROM players WHERE name IN ({', '.join('?' for _ in chunk)})", chunk
+            ).fetchall())
+
+        return found
+
+    def player_names_by_key(self, keys):
+        """name_key -> registered player names with that key."""
+        found = {}
+
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            for key, name in self.conn.execute(
+                f"SELECT name_key, name FROM players WHERE name_key IN ({', '.join('?' for _ in chunk)}) ORDER BY player_id",
+                chunk
+            ):
+                found.setdefault(key, []).append(name)
+
+        return found
+
+    def similar_players(self, name, threshold=DEFAULT_SIMILARITY):
+        """Registered players whose trigram Jaccard similarity to name is at least threshold."""
+        grams = trigrams(name_key(name))
+        placeholders = ", ".join("?" for _ in grams)
+
+        frequency = dict(self.conn.execute(
+            f"SELECT trigram, n FROM trigram_counts WHERE trigram IN ({placeholders})", list(grams)
+        ).fetchall())
+        probe = probe_grams(grams, threshold, lambda g: frequency.get(g, 0))
+
+        candidates = [r[0] for r in self.conn.execute(
+            f"SELECT DISTINCT name_key FROM player_trigrams WHERE trigram IN ({', '.join('?' for _ in probe)})", probe
+        )]
+
+        scores = {key: jaccard(grams, trigrams(key)) for key in candidates}
+        scores = {key: score for key, score in scores.items() if score >= threshold}
+
+        matches = [
+            (other, scores[key])
+            for key, names in self.player_names_by_key(list(scores)).items()
+            for other in names if other != name
+        ]
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def team_names_by_key(self, keys, mund_id):
+        """name_key -> registered team names with that key, this tournament's first."""
+        found = {}
+
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            for key, team_name in self.conn.execute(
+                f"SELECT name_key, team_name FROM teams WHERE name_key IN ({', '.join('?' for _ in chunk)}) "
+                "ORDER BY mundialito_id != ?, mundialito_id",
+                chunk + [mund_id]
+            ):
+                if team_name not in found.get(key, []):
+                    found.setdefault(key, []).append(team_name)
+
+        return found
+
+    def team_names(self):
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT team_name FROM teams ORDER BY team_name")]
+
+    def lookup_teams(self, mund_id):
+        rows = self.conn.execute(
+            "SELECT team_name, team_abbr, mundialito_id, team_id FROM teams WHERE mundialito_id = ?", (mund_id,)
+        ).fetchall()
+
+        return {(team_name, team_abbr, mid): team_id for team_name, team_abbr, mid, team_id in rows}
+
+
+def open_index(config):
+    """The configured IdIndex, or None when "idIndexPath" is not set."""
+    path = config.get("idIndexPath")
+    return IdIndex(path) if path else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync or rebuild the local Players/Teams id index.")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and reload it in full")
+    args = parser.parse_args()
+
+    config = load_config()
+    path = config.get("idIndexPath")
+
+    if not path:
+        parser.error("idIndexPath is not set in config.json")
+
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+
+    storage = connect(config)
+    index = IdIndex(path)
+
+    try:
+        result = index.sync(storage)
+    finally:
+        index.close()
+        storage.close()
+
+    print(f"Id index {path}: players {result['players']}, teams {result['teams']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,18 @@
-import pandas as pd
-import pyodbc
-import os
-import glob
-import json
-
-with open("../../../config.json", "r") as f:
-    config = json.load(f)
-
-MUND_ID = config["mundialitoId"] 
-out_path = config["outputPath"]
-
-search_pattern = os.path.join(out_path, f"mundialito_{MUND_ID}*.csv")
-matching_files = glob.glob(search_pattern)
+import argparse
 
-if len(matching_files) == 0:
-    raise FileNotFoundError(f"No file found matching: {search_pattern}")
-
-if len(matching_files) > 1:
-    raise RuntimeError(f"Multiple files found matching: {search_pattern}\nFiles: {matching_files}")
-
-staging_csv = matching_files[0]
-MUND_DATE = str.split(str.split(staging_csv, "_")[3], ".")[0]
+import pandas as pd
 
-conn_str = (
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={config['server']};"
-    f"DATABASE={config['database']};"
-    "Trusted_Connection=yes;"
+from aggregation import aggregate
+from bulk_writer import insert_frame, DEFAULT_CHUNK_SIZE
+from career_stats import update_career_stats
+from common import load_config, connect, find_tournament_file, parse_tournament_file
+from instrumentation import configure, stage
+from leaderboard import leaderboard_frame, replace_leaderboard
+from manifest import (
+    imported_hashes, record_import, record_imported_registry, registry_fingerprint, staged_input_hash, staging_hash
 )
-
-conn = pyodbc.connect(conn_str)
-cursor = conn.cursor()
-
-conn.autocommit = False
-
-df = pd.read_csv(staging_csv)
+from snapshots import export_after_import
+from staging_format import read_staging_frame
 
 required_columns = [
     "PlayerId", 
@@ -62,22 +40,111 @@ required_columns = [
     "IsPlaymaker"
 ]
 
-missing = [c for c in required_columns if c not in df.columns]
-if missing:
-    raise ValueError(f"Staging CSV missing required columns: {missing}")
-
-mundialito_ids = df["MundialitoId"].unique()
-if len(mundialito_ids) != 1:
-    raise ValueError(f"Expected exactly 1 MundialitoId in staging file, found: {mundialito_ids}")
-
-mundialito_id = int(mundialito_ids[0])
-print(f"Importing for MundialitoId = {mundialito_id}")
+# Column layout of every per-tournament table, in insert order (Games before PlayerGameStats)
+TABLE_COLUMNS = {
+    "Games": [
+        ("GameId", int),
+        ("MundialitoId", int),
+        ("TeamAId", int),
+        ("TeamBId", int),
+        ("GoalsA", int),
+        ("GoalsB", int),
+        ("GameCode", str),
+    ],
+    "PlayerGameStats": [
+        ("GameId", int),
+        ("MundialitoId", int),
+        ("PlayerId", int),
+        ("TeamId", int),
+        ("OppTeamId", int),
+        ("WL", str),
+        ("Goals", int),
+        ("Assists", int),
+        ("GoalsConceded", int),
+    ],
+    "PlayerTournamentStats": [
+        ("PlayerId", int),
+        ("MundialitoId", int),
+        ("TeamId", int),
+        ("GamesPlayed", int),
+        ("GamesWon", int),
+        ("GamesDrawn", int),
+        ("GamesLost", int),
+        ("Goals", int),
+        ("Assists", int),
+        ("CleanSheets", int),
+        ("GoalsConceded", int),
+    ],
+    "PlayerAwards": [
+        ("PlayerId", int),
+        ("MundialitoId", int),
+        ("IsMVP", bool),
+        ("IsGoldenBoot", bool),
+        ("IsPlaymaker", bool),
+    ],
+    "TeamTournamentStats": [
+        ("TeamId", int),
+        ("MundialitoId", int),
+        ("GamesPlayed", int),
+        ("GamesWon", int),
+        ("GamesDrawn", int),
+        ("GamesLost", int),
+        ("Goals", int),
+        ("Assists", int),
+        ("GoalsConceded", int),
+        ("CleanSheets", int),
+        ("IsChampion", int),
+    ],
+}
+
+# Natural key of each table within one MundialitoId (its primary key)
+TABLE_KEYS = {
+    "Games": ["GameId"],
+    "PlayerGameStats": ["GameId", "PlayerId"],
+    "PlayerTournamentStats": ["PlayerId", "MundialitoId"],
+    "PlayerAwards": ["PlayerId", "MundialitoId"],
+    "TeamTournamentStats": ["TeamId", "MundialitoId"],
+}
+
+
+def read_staging(staging_path):
+    """Read a staging csv/parquet/arrow file; the columnar formats arrive already typed."""
+    df = read_staging_frame(staging_path)
+    check_staging(df)
+    return df
+
+
+def check_staging(df):
+    missing = [c for c in required_columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Staging CSV missing required columns: {missing}")
+
+    mundialito_ids = df["MundialitoId"].unique()
+    if len(mundialito_ids) != 1:
+        raise ValueError(f"Expected exactly 1 MundialitoId in staging file, found: {mundialito_ids}")
+
+    return int(mundialito_ids[0])
+
+
+def insert_table(cursor, table, frame, chunk_size=DEFAULT_CHUNK_SIZE):
+    columns = [(c, c, kind) for c, kind in TABLE_COLUMNS[table]]
+    return insert_frame(cursor, table, frame, columns, chunk_size)
+
+
+def replace_table(cursor, table, frame, mundialito_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Delete the tournament's rows from table and insert frame in their place."""
+    print(f"Deleting existing {table} for MundialitoId = {mundialito_id}...")
+    cursor.execute(
+        f"DELETE FROM {table} WHERE MundialitoId = ?",
+        (mundialito_id,)
+    )
 
-df = df.where(pd.notnull(df), None)
+    print(f"Inserting {len(frame)} {table} rows...")
+    return insert_table(cursor, table, frame, chunk_size)
 
-try:
 
-    cursor.execute("SELECT MundialitoId FROM Mundialitos WHERE MundialitoId = ?", mundialito_id)
+def insert_mundialito(storage, cursor, mundialito_id, mund_date):
+    cursor.execute("SELECT MundialitoId FROM Mundialitos WHERE MundialitoId = ?", (mundialito_id,))
     row = cursor.fetchone()
 
     # ------ INSERTING MUNDIALITOS -------
@@ -86,18 +153,21 @@ try:
         print(f"MundialitoId {mundialito_id} not found in DB, creating it...")
         mundialito_name = f"Mundialito {mundialito_id}"
 
-        cursor.execute("SET IDENTITY_INSERT Mundialitos ON;")
+        storage.identity_insert(cursor, "Mundialitos", True)
         cursor.execute(
             """
             INSERT INTO Mundialitos (MundialitoId, Name, Date)
             VALUES (?, ?, ?)
             """,
-            mundialito_id, mundialito_name, MUND_DATE
+            (mundialito_id, mundialito_name, mund_date)
         )
-        cursor.execute("SET IDENTITY_INSERT Mundialitos OFF;")
+        storage.identity_insert(cursor, "Mundialitos", False)
     else:
         print(f"MundialitoId {mundialito_id} already exists.")
 
+
+def insert_new_players_and_teams(storage, cursor, df, chunk_size=DEFAULT_CHUNK_SIZE):
+
     # ------ INSERTING PLAYERS -------
 
     new_players = (
@@ -107,17 +177,14 @@ try:
 
     if not new_players.empty:
         print(f"Inserting {len(new_players)} new players...")
-        cursor.execute("SET IDENTITY_INSERT Players ON;")
+        storage.identity_insert(cursor, "Players", True)
 
-        for _, row in new_players.iterrows():
-            player_id = int(row["PlayerId"])
-            name = row["PlayerName"]
-            cursor.execute(
-                "INSERT INTO Players (PlayerId, Name) VALUES (?, ?)",
-                player_id, name
-            )
+        insert_frame(cursor, "Players", new_players, [
+            ("PlayerId", "PlayerId", int),
+            ("Name", "PlayerName", str),
+        ], chunk_size)
 
-        cursor.execute("SET IDENTITY_INSERT Players OFF;")
+        storage.identity_insert(cursor, "Players", False)
     else:
         print("No new players to insert.")
 
@@ -129,248 +196,153 @@ try:
     )
 
     if not new_teams.empty:
-        print(f"Inserting {len(new_teams)} new teams for Mundialito {mundialito_id}...")
-        cursor.execute("SET IDENTITY_INSERT Teams ON;")
-
-        for _, row in new_teams.iterrows():
-            team_id = int(row["TeamId"])
-            team_name = row["TeamName"]
-            team_abbr = row["TeamAbbr"]
-            mid = int(row["MundialitoId"])
-
-            cursor.execute(
-                """
-                INSERT INTO Teams (TeamId, MundialitoId, TeamName, TeamAbbr)
-                VALUES (?, ?, ?, ?)
-                """,
-                team_id, mid, team_name, team_abbr
-            )
-
-        cursor.execute("SET IDENTITY_INSERT Teams OFF;")
+        print(f"Inserting {len(new_teams)} new teams...")
+        storage.identity_insert(cursor, "Teams", True)
+
+        insert_frame(cursor, "Teams", new_teams, [
+            ("TeamId", "TeamId", int),
+            ("MundialitoId", "MundialitoId", int),
+            ("TeamName", "TeamName", str),
+            ("TeamAbbr", "TeamAbbr", str),
+        ], chunk_size)
+
+        storage.identity_insert(cursor, "Teams", False)
     else:
         print("No new teams to insert.")
 
 
-    # ------ INSERTING GAMES -------
+def derive_tables(df):
+    """Games, PlayerGameStats, PlayerTournamentStats, PlayerAwards and TeamTournamentStats rows from staging."""
+    frames = aggregate(df)
 
-    print(f"Deleting existing Games for MundialitoId = {mundialito_id}...")
-    cursor.execute(
-        "DELETE FROM Games WHERE MundialitoId = ?",
-        mundialito_id
-    )
+    return {table: frames[table][[c for c, _ in TABLE_COLUMNS[table]]] for table in TABLE_COLUMNS}
 
-    games_df = (
-        df.assign(
-            TeamAId=lambda x: x[["TeamId", "OppId"]].min(axis=1),
-            TeamBId=lambda x: x[["TeamId", "OppId"]].max(axis=1),
-        )
-        .assign(
-            GoalsA=lambda x: x["Goals"].where(x["TeamId"] == x["TeamAId"], 0),
-            GoalsB=lambda x: x["GoalsConceded"].where(x["TeamId"] == x["TeamAId"], 0),
-        )
-        .groupby(["GameId", "MundialitoId", "TeamAId", "TeamBId"], as_index=False)
-        .agg(
-            GoalsA=("GoalsA", "sum"),
-            GoalsB=("GoalsB", "max"),
-        )
-    )
 
-    print(games_df)
+def import_staging(storage, df, mund_date, chunk_size=DEFAULT_CHUNK_SIZE, input_key=None, staging_key=None):
+    """
+    Write one tournament's staging rows to every table in a single transaction,
+    recording input_key/staging_key (see manifest.py) in ImportManifest with them.
+    Commits on success, rolls back and re-raises on error; the caller owns storage.
+    """
+    cursor = storage.cursor()
 
-    print(f"Inserting {len(games_df)} Games rows...")
-    for _, row in games_df.iterrows():
-        cursor.execute(
-            """
-            INSERT INTO Games
-                (GameId, MundialitoId, TeamAId, TeamBId, GoalsA, GoalsB)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            str(row["GameId"]),
-            int(row["MundialitoId"]),
-            int(row["TeamAId"]),
-            int(row["TeamBId"]),
-            int(row["GoalsA"]),
-            int(row["GoalsB"])
-        )
+    storage.begin()
 
-    # ------ INSERTING PLAYERGAMESTATS -------
+    mundialito_id = check_staging(df)
+    print(f"Importing for MundialitoId = {mundialito_id}")
 
-    print(f"Deleting existing PlayerGameStats for MundialitoId = {mundialito_id}...")
-    cursor.execute(
-        "DELETE FROM PlayerGameStats WHERE MundialitoId = ?",
-        mundialito_id
-    )
+    if staging_key is None:
+        staging_key = staging_hash(df)
 
-    print(f"Inserting {len(df)} PlayerGameStats rows...")
-    for _, row in df.iterrows():
-        cursor.execute(
-            """
-            INSERT INTO PlayerGameStats
-                (GameId, MundialitoId, PlayerId, TeamId,
-                OppTeamId, WL, Goals,
-                Assists, GoalsConceded)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            str(row["GameId"]),
-            int(row["MundialitoId"]),
-            int(row["PlayerId"]),
-            int(row["TeamId"]),  
-            int(row["OppId"]),
-            str(row["WL"]),
-            int(row["Goals"]),
-            int(row["Assists"]),
-            int(row["GoalsConceded"])
-        )
+    if df.isna().to_numpy().any():
+        df = df.where(pd.notnull(df), None)
 
-    # ------ INSERTING PLAYERTOURNAMENTSTATS -------
+    try:
 
-    print(f"Deleting existing PlayerTournamentStats for MundialitoId = {mundialito_id}...")
-    cursor.execute(
-        "DELETE FROM PlayerTournamentStats WHERE MundialitoId = ?",
-        mundialito_id
-    )
+        with stage("import.players_teams", mundialito_id=mundialito_id):
+            insert_mundialito(storage, cursor, mundialito_id, mund_date)
+            insert_new_players_and_teams(storage, cursor, df, chunk_size)
 
-    pts_df = df.groupby(
-        ["PlayerId", "TeamName", "TeamId", "TeamAbbr", "MundialitoId"],
-        as_index=False
-    ).agg(
-        GamesPlayed=("WL", "count"),
-        GamesWon=("WL", lambda x: (x == "W").sum()),
-        GamesDrawn=("WL", lambda x: (x == "D").sum()),
-        GamesLost=("WL", lambda x: (x == "L").sum()),
-        Goals=("Goals", "sum"),
-        Assists=("Assists", "sum"),
-        GoalsConceded=("GoalsConceded", "sum"),
-        CleanSheets=("CleanSheet", "sum"),
-    )
+        with stage("import.derive", rows=len(df), mundialito_id=mundialito_id):
+            tables = derive_tables(df)
 
-    print(pts_df)
+        with stage("import.career_stats", mundialito_id=mundialito_id):
+            update_career_stats(cursor, mundialito_id, df, tables, chunk_size)
 
-    print(f"Inserting {len(df)} PlayerTournamentStats rows...")
-    for _, row in pts_df.iterrows():
-        cursor.execute(
-            """
-            INSERT INTO PlayerTournamentStats
-                (PlayerId, MundialitoId, TeamId,
-                 GamesPlayed, GamesWon, GamesDrawn, GamesLost,
-                 Goals, Assists, CleanSheets, GoalsConceded)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            int(row["PlayerId"]),
-            int(row["MundialitoId"]),
-            int(row["TeamId"]),
-            int(row["GamesPlayed"]),
-            int(row["GamesWon"]),
-            int(row["GamesDrawn"]),
-            int(row["GamesLost"]),
-            int(row["Goals"]),
-            int(row["Assists"]),
-            int(row["CleanSheets"]),    
-            int(row["GoalsConceded"])
-        )
+        for table, frame in tables.items():
+            with stage(f"import.{table}", rows=len(frame), mundialito_id=mundialito_id):
+                replace_table(cursor, table, frame, mundialito_id, chunk_size)
 
-    # ------ INSERTING PLAYERAWARDS -------
+        with stage("import.PlayerLeaderboard", mundialito_id=mundialito_id) as s:
+            s.rows = replace_leaderboard(cursor, mundialito_id, leaderboard_frame(df, tables), chunk_size)
 
-    print(f"Deleting existing PlayerAwards for MundialitoId = {mundialito_id}...")
-    cursor.execute(
-        "DELETE FROM PlayerAwards WHERE MundialitoId = ?",
-        mundialito_id
-    )
+        with stage("import.commit", mundialito_id=mundialito_id):
+            record_import(cursor, mundialito_id, input_key, staging_key)
+            storage.commit()
+        print("Import completed successfully.")
 
-    awards_df = (
-        df.groupby(["PlayerId", "MundialitoId"], as_index=False)
-          .agg({
-              "IsMVP": "max",
-              "IsGoldenBoot": "max",
-              "IsPlaymaker": "max",
-          })
-    )
+    except Exception as e:
+        print("ERROR during import, rolling back...")
+        storage.rollback()
+        raise
 
-    print(f"Inserting {len(awards_df)} PlayerAwards rows...")
-    for _, row in awards_df.iterrows():
+    finally:
+        cursor.close()
 
-        player_id = int(row["PlayerId"])
-        mid = int(row["MundialitoId"])
 
-        is_mvp = bool(row["IsMVP"])
-        is_gb = bool(row["IsGoldenBoot"])
-        is_pm = bool(row["IsPlaymaker"])
+def import_is_current(storage, mundialito_id, staging_key):
+    """True when ImportManifest shows these exact staging rows were the last import of mundialito_id."""
+    cursor = storage.cursor()
 
-        cursor.execute(
-            """
-            INSERT INTO PlayerAwards
-               (PlayerId, MundialitoId, IsMVP, IsGoldenBoot, IsPlaymaker)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            player_id,
-            mid,
-            1 if is_mvp else 0,
-            1 if is_gb else 0,
-            1 if is_pm else 0
-        )
+    try:
+        stored = imported_hashes(cursor, mundialito_id).get(mundialito_id)
+    finally:
+        cursor.close()
 
+    return stored is not None and stored[1] == staging_key
 
-    # ------ INSERTING TEAMTOURNAMENTSTATS -------
 
-    print("Deleting existing TeamTournamentStats...")
-    cursor.execute(
-        "DELETE FROM TeamTournamentStats WHERE MundialitoId = ?",
-        mundialito_id
-    )
+def main():
+    parser = argparse.ArgumentParser(description="Import the configured tournament's staging CSV.")
+    parser.add_argument("--upsert", action="store_true",
+                        help="write only the rows that differ from what is stored (see upsert_import.py)")
+    parser.add_argument("--force", action="store_true", help="import even if the staging data is unchanged")
+    parser.add_argument("--backfill", action="store_true",
+                        help="commit in bounded, checkpointed chunks and resume if interrupted (see backfill_import.py)")
+    args = parser.parse_args()
 
-    tts_df = pts_df.groupby(
-        ["TeamId", "MundialitoId"],
-        as_index=False
-    ).agg(
-        GamesPlayed=("GamesPlayed", "max"),
-        GamesWon=("GamesWon", "max"),
-        GamesDrawn=("GamesDrawn", "max"),
-        GamesLost=("GamesLost", "max"),
-        Goals=("Goals", "sum"),
-        Assists=("Assists", "sum"),
-        GoalsConceded=("GoalsConceded", "max"),
-        CleanSheets=("CleanSheets", "max"),
-    )
+    config = load_config()
+    configure(config, "import_data_current")
 
-    print(tts_df)
+    MUND_ID = config["mundialitoId"] 
+    out_path = config["outputPath"]
+    CHUNK_SIZE = config.get("importChunkSize", DEFAULT_CHUNK_SIZE)
 
-    max_wins = tts_df["GamesWon"].max()
-    tts_df["IsChampion"] = tts_df["GamesWon"].apply(
-        lambda w: 1 if w == max_wins else 0
-    )
+    staging_file = find_tournament_file(out_path, MUND_ID, config.get("stagingFormat", "csv"))
+    _, MUND_DATE = parse_tournament_file(staging_file)
 
-    print(f"Inserting {len(tts_df)} TeamTournamentStats rows...")
+    with stage("read_staging", mundialito_id=MUND_ID) as s:
+        df = read_staging(staging_file)
+        s.rows = len(df)
 
-    for _, row in tts_df.iterrows():
-        cursor.execute(
-            """
-            INSERT INTO TeamTournamentStats
-                (TeamId, MundialitoId,
-                GamesPlayed, GamesWon, GamesDrawn, GamesLost,
-                Goals, Assists, GoalsConceded, CleanSheets, IsChampion)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            int(row["TeamId"]),
-            int(row["MundialitoId"]),
-            int(row["GamesPlayed"]),
-            int(row["GamesWon"]),
-            int(row["GamesDrawn"]),
-            int(row["GamesLost"]),
-            int(row["Goals"]),
-            int(row["Assists"]),
-            int(row["GoalsConceded"]),
-            int(row["CleanSheets"]),
-            int(row["IsChampion"])
-        )
+    input_key = staged_input_hash(out_path, MUND_ID, staging_file)
+    staging_key = staging_hash(df)
+
+    storage = connect(config)
 
-    conn.commit()
-    print("Import completed successfully.")
+    try:
+        if not args.force and import_is_current(storage, MUND_ID, staging_key):
+            print(f"Mundialito {MUND_ID} is unchanged since its last import, skipping (--force to import anyway).")
+        else:
+            registry_before = registry_fingerprint(storage)
 
-except Exception as e:
-    print("ERROR during import, rolling back...")
-    conn.rollback()
-    raise
+            if args.backfill:
+                from backfill_import import DEFAULT_CHUNK_ROWS, DEFAULT_RETRIES, backfill_staging, rebuild_after_backfill
+                backfill_staging(
+                    storage, df, MUND_DATE, CHUNK_SIZE, input_key, staging_key,
+                    config.get("backfillChunkRows", DEFAULT_CHUNK_ROWS), config.get("backfillRetries", DEFAULT_RETRIES)
+                )
+                rebuild_after_backfill(storage, CHUNK_SIZE)
+            elif args.upsert:
+                from upsert_import import upsert_staging
+                upsert_staging(storage, df, MUND_DATE, CHUNK_SIZE, input_key, staging_key)
+            elif config.get("setBasedImport", False):
+                from set_import import import_staging_set_based
+                import_staging_set_based(storage, df, MUND_DATE, CHUNK_SIZE, input_key, staging_key)
+            elif config.get("importWorkers", 0) > 1:
+                from concurrent_import import import_staging_concurrent
+                import_staging_concurrent(
+                    storage, df, MUND_DATE, CHUNK_SIZE, config["importWorkers"], input_key, staging_key
+                )
+            else:
+                import_staging(storage, df, MUND_DATE, CHUNK_SIZE, input_key, staging_key)
 
-finally:
-    cursor.close()
-    conn.close()
+            record_imported_registry(out_path, MUND_ID, staging_file, registry_before, registry_fingerprint(storage))
+
+        export_after_import(storage, config, [MUND_ID])
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Long-running ingestion: watch the input folder and stage + import tournament
+files as they land, without editing config.json or running scripts by hand.
+
+Run from anywhere (config.json is found next to the repository root, or via
+the MUNDIALITO_CONFIG environment variable):
+    python ingest_daemon.py            # until Ctrl+C or SIGTERM
+    python ingest_daemon.py --once     # process what is there now, then exit
+
+The input folder is polled every "watchInterval" seconds with one scandir, a
+stat per mundialito_<id>_<date>.csv and no reads. A new or changed file is
+queued only once its size and mtime have stayed the same for
+"watchSettleSeconds", so a file still being copied is not picked up half
+written. The queue holds at most "watchQueueSize" files; when it is full,
+ready files simply wait for a later poll.
+
+One importer thread drains the queue and hands every file waiting in it to
+batch_current.run_batch at once, staging them in up to "watchWorkers"
+processes. New ids are still assigned in MundialitoId order and imports go one
+tournament at a time over a single connection, as in a batch run. Files whose
+input hash matches their last import (ImportManifest) are skipped there, so
+the files already present at startup cost only a hash each.
+
+A file counts as handled only once it has been imported. If its batch fails
+(the database unreachable, a deadlock, a bad file) it is reported and queued
+again after "watchRetrySeconds", doubling with every failure up to
+RETRY_MAX_SECONDS; a change to the file restarts it from the settle wait.
+"""
+import argparse
+import os
+import queue
+import signal
+import threading
+import time
+
+from batch_current import run_batch
+from common import load_config, TOURNAMENT_FILE_RE
+from instrumentation import configure, stage
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_RETRY_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+
+def scan(folder):
+    """{path: (mundialito_id, size, mtime_ns)} for every tournament csv (not staging) in folder."""
+    found = {}
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            m = TOURNAMENT_FILE_RE.match(entry.name)
+
+            if not m or m.group(3) or m.group(4) != "csv" or not entry.is_file():
+                continue
+
+            info = entry.stat()
+            found[entry.path] = (int(m.group(1)), info.st_size, info.st_mtime_ns)
+
+    return found
+
+
+def poll(folder, pending, handled, retries, work, settle, now):
+    """
+    One look at folder: (re)start the settle clock of new or changed files and
+    queue the ones that have settled. pending is {path: (signature, since)},
+    handled {path: signature queued or imported}, retries {path: (signature,
+    failures, retry_at)} for files whose import failed. Returns the number of
+    files queued.
+    """
+    queued = 0
+    current = scan(folder)
+
+    for path in list(pending):
+        if path not in current:
+            del pending[path]
+
+    for path, signature in current.items():
+        if handled.get(path) == signature:
+            continue
+
+        if path in retries and retries[path][0] == signature and now < retries[path][2]:
+            continue
+
+        if path not in pending or pending[path][0] != signature:
+            pending[path] = (signature, now)
+            continue
+
+        if now - pending[path][1] < settle:
+            continue
+
+        try:
+            work.put_nowait((signature[0], path, signature))
+        except queue.Full:
+            # still pending; offered again on the next poll
+            continue
+
+        handled[path] = signature
+        del pending[path]
+        queued += 1
+
+    return queued
+
+
+def record_results(results, handled, retries, retry_seconds, now):
+    """
+    Apply the importer's (path, signature, ok) reports: a failed file is no longer
+    handled and waits out its backoff before it is queued again.
+    """
+    while True:
+        try:
+            path, signature, ok = results.get_nowait()
+        except queue.Empty:
+            return
+
+        if ok:
+            retries.pop(path, None)
+            continue
+
+        if handled.get(path) == signature:
+            del handled[path]
+
+        failures = retries[path][1] + 1 if path in retries and retries[path][0] == signature else 1
+        delay = min(RETRY_MAX_SECONDS, retry_seconds * 2 ** (failures - 1))
+        retries[path] = (signature, failures, now + delay)
+        print(f"Retrying {os.path.basename(path)} in {delay:g}s (failure {failures})")
+
+
+def drain(work):
+    """Block for one queued (MundialitoId, path, signature), then take every other one waiting. None means stop."""
+    items = [work.get()]
+
+    while True:
+        try:
+            items.append(work.get_nowait())
+        except queue.Empty:
+            break
+
+    return items
+
+
+def import_loop(config, work, results, workers, upsert):
+    while True:
+        items = drain(work)
+        stop = None in items
+        items = [item for item in items if item is not None]
+        ids = sorted({mund_id for mund_id, _, _ in items})
+
+        if ids:
+            print(f"\n===== Ingesting Mundialito(s) {ids} =====")
+            try:
+                with stage("ingest", rows=len(ids)):
+                    run_batch(config, only_ids=ids, workers=min(workers, len(ids)), upsert=upsert)
+                ok = True
+            except Exception as e:
+                # tournaments imported before the failure are skipped by the manifest on the retry
+                print(f"ERROR ingesting {ids}: {type(e).__name__}: {e}")
+                ok = False
+
+            for _, path, signature in items:
+                results.put((path, signature, ok))
+
+        if stop:
+            return
+
+
+def watch(config, once=False, upsert=False):
+    folder = config["inputPath"]
+    interval = config.get("watchInterval", DEFAULT_INTERVAL)
+    settle = config.get("watchSettleSeconds", DEFAULT_SETTLE_SECONDS)
+    workers = config.get("watchWorkers", DEFAULT_WORKERS)
+    retry_seconds = config.get("watchRetrySeconds", DEFAULT_RETRY_SECONDS)
+
+    work = queue.Queue(maxsize=config.get("watchQueueSize", DEFAULT_QUEUE_SIZE))
+    results = queue.Queue()
+    importer = threading.Thread(target=import_loop, args=(config, work, results, workers, upsert), name="importer")
+    importer.start()
+
+    # SIGTERM (service managers) stops like Ctrl+C
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+    pending, handled, retries = {}, {}, {}
+    print(f"Watching {folder} every {interval}s (settle {settle}s, {workers} staging worker(s))")
+
+    try:
+        while not stopping.is_set():
+            now = time.monotonic()
+            record_results(results, handled, retries, retry_seconds, now)
+            poll(folder, pending, handled, retries, work, settle, now)
+
+            if once and not pending:
+                break
+
+            stopping.wait(interval)
+        else:
+            print("\nStopping after the current import...")
+    except KeyboardInterrupt:
+        print("\nStopping after the current import...")
+    finally:
+        work.put(None)
+        importer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="process the files present now, then exit")
+    parser.add_argument("--upsert", action="store_true", help="import by diff (see upsert_import.py)")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure(config, "ingest_daemon")
+
+    watch(config, once=args.once, upsert=args.upsert)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Per-stage metrics for the data-processing scripts.
+
+Wrap each named step in stage(); when a script has called configure() every
+stage appends one JSON line to config["metricsLog"] with its wall time, rows,
+rows/s, peak RSS and the number of DB round trips (execute/executemany calls
+made through Storage cursors) while it ran. Without configure() stages are
+only timed in memory, so helpers can be reused by batch runs and benchmarks.
+
+Set "profile": true in config.json to also dump a cProfile file
+(<script>_<run>.prof, next to the metrics log) when the script exits;
+open it with python -m pstats or snakeviz.
+"""
+import atexit
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import time
+
+_state = {
+    "log_path": None,
+    "script": None,
+    "run": None,
+    "round_trips": 0,
+}
+
+
+def configure(config, script):
+    """Start logging stages for this script run, as set up in config.json."""
+    _state["log_path"] = config.get("metricsLog")
+    _state["script"] = script
+    _state["run"] = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+
+    if config.get("profile"):
+        profile_dir = os.path.dirname(_state["log_path"] or "") or "."
+        profile_path = os.path.join(profile_dir, f"{script}_{_state['run']}.prof")
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"cProfile written to {profile_path}")
+
+        atexit.register(dump)
+
+
+def count_round_trip(n=1):
+    _state["round_trips"] += n
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        # kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    info = psutil.Process().memory_info()
+    return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+
+
+class Stage:
+    def __init__(self, name, rows=None, **fields):
+        self.name = name
+        self.rows = rows
+        self.fields = fields
+        self.seconds = None
+
+
+def _write(record):
+    with open(_state["log_path"], "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+@contextlib.contextmanager
+def stage(name, rows=None, **fields):
+    """
+    Time the enclosed block. Set .rows on the yielded Stage if the row count is
+    only known inside the block; extra keyword fields go into the record as-is.
+    """
+    s = Stage(name, rows, **fields)
+    start = time.perf_counter()
+    trips = _state["round_trips"]
+    ok = False
+
+    try:
+        yield s
+        ok = True
+    finally:
+        s.seconds = time.perf_counter() - start
+
+        if _state["log_path"]:
+            _write({
+                "ts": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                "run": _state["run"],
+                "script": _state["script"],
+                "stage": s.name,
+                **s.fields,
+                "ok": ok,
+                "seconds": round(s.seconds, 6),
+                "rows": s.rows,
+                "rows_per_s": round(s.rows / s.seconds, 1) if s.rows is not None and s.seconds > 0 else None,
+                "peak_rss_mb": peak_rss_mb(),
+                "db_round_trips": _state["round_trips"] - trips,
+            })
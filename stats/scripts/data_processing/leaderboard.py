@@ -0,0 +1,138 @@
+"""
+PlayerLeaderboard: one tournament's player table, denormalized and pre-sorted.
+
+GET /api/tournaments/{id}/players used to join PlayerTournamentStats to
+Players and Teams and sort by Goals/Assists on every call. The importers now
+write the finished rows in the import transaction: names and team abbreviation
+copied in, the award flags, and rank columns, keyed (MundialitoId, Rank) so the
+API reads one clustered range in order, with no joins and no sort.
+
+    Rank         position in the list: Goals desc, Assists desc, PlayerId
+    GoalsRank    standard competition rank by Goals (ties share a rank)
+    AssistsRank  the same by Assists
+
+import_staging, the concurrent and upsert importers build the rows from the
+frames they already hold (leaderboard_frame); set_import and --rebuild derive
+them in the database (LEADERBOARD_SQL). Schema migration 5 creates the table and
+fills it for the tournaments imported before it existed.
+
+To rewrite it for every tournament from the stored tables:
+    python leaderboard.py --rebuild
+"""
+import argparse
+
+import numpy as np
+
+from bulk_writer import DEFAULT_CHUNK_SIZE, insert_frame
+from common import load_config, connect
+
+LEADERBOARD_COLUMNS = [
+    ("MundialitoId", int),
+    ("Rank", int),
+    ("PlayerId", int),
+    ("PlayerName", str),
+    ("TeamId", int),
+    ("TeamName", str),
+    ("TeamAbbr", str),
+    ("GamesPlayed", int),
+    ("GamesWon", int),
+    ("GamesDrawn", int),
+    ("GamesLost", int),
+    ("Goals", int),
+    ("Assists", int),
+    ("CleanSheets", int),
+    ("GoalsConceded", int),
+    ("IsMVP", bool),
+    ("IsGoldenBoot", bool),
+    ("IsPlaymaker", bool),
+    ("GoalsRank", int),
+    ("AssistsRank", int),
+]
+
+# the same rows from the stored tables, for every MundialitoId in the WHERE
+LEADERBOARD_SQL = f"""
+    INSERT INTO PlayerLeaderboard ({", ".join(c for c, _ in LEADERBOARD_COLUMNS)})
+    SELECT s.MundialitoId,
+           ROW_NUMBER() OVER (PARTITION BY s.MundialitoId ORDER BY s.Goals DESC, s.Assists DESC, s.PlayerId),
+           s.PlayerId, p.Name, s.TeamId, t.TeamName, t.TeamAbbr,
+           s.GamesPlayed, s.GamesWon, s.GamesDrawn, s.GamesLost, s.Goals, s.Assists,
+           s.CleanSheets, s.GoalsConceded,
+           COALESCE(a.IsMVP, 0), COALESCE(a.IsGoldenBoot, 0), COALESCE(a.IsPlaymaker, 0),
+           RANK() OVER (PARTITION BY s.MundialitoId ORDER BY s.Goals DESC),
+           RANK() OVER (PARTITION BY s.MundialitoId ORDER BY s.Assists DESC)
+    FROM PlayerTournamentStats s
+    JOIN Players p ON p.PlayerId = s.PlayerId
+    JOIN Teams t ON t.TeamId = s.TeamId
+    LEFT JOIN PlayerAwards a ON a.PlayerID = s.PlayerId AND a.MundialitoId = s.MundialitoId
+    {{where}}
+"""
+
+
+def leaderboard_frame(df, tables):
+    """PlayerLeaderboard rows from the staging rows and derive_tables output, in Rank order."""
+    names = df[["PlayerId", "PlayerName"]].drop_duplicates("PlayerId")
+    teams = df[["TeamId", "TeamName", "TeamAbbr"]].drop_duplicates("TeamId")
+    awards = tables["PlayerAwards"][["PlayerId", "IsMVP", "IsGoldenBoot", "IsPlaymaker"]]
+
+    board = (
+        tables["PlayerTournamentStats"]
+        .merge(names, on="PlayerId")
+        .merge(teams, on="TeamId")
+        .merge(awards, on="PlayerId", how="left")
+        .sort_values(["Goals", "Assists", "PlayerId"], ascending=[False, False, True], ignore_index=True)
+    )
+
+    board[["IsMVP", "IsGoldenBoot", "IsPlaymaker"]] = board[["IsMVP", "IsGoldenBoot", "IsPlaymaker"]].fillna(False)
+    board["Rank"] = np.arange(1, len(board) + 1)
+    board["GoalsRank"] = board["Goals"].rank(method="min", ascending=False).astype(np.int64)
+    board["AssistsRank"] = board["Assists"].rank(method="min", ascending=False).astype(np.int64)
+
+    return board[[c for c, _ in LEADERBOARD_COLUMNS]]
+
+
+def replace_leaderboard(cursor, mundialito_id, board, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Swap the tournament's leaderboard rows for board; call inside the import transaction."""
+    cursor.execute("DELETE FROM PlayerLeaderboard WHERE MundialitoId = ?", (mundialito_id,))
+    return insert_frame(cursor, "PlayerLeaderboard", board, [(c, c, kind) for c, kind in LEADERBOARD_COLUMNS], chunk_size)
+
+
+def derive_leaderboard(cursor, mundialito_id=None):
+    """Rewrite the leaderboard of one tournament (or all) from the stored tables. Returns the row count."""
+    if mundialito_id is None:
+        cursor.execute("DELETE FROM PlayerLeaderboard")
+        cursor.execute(LEADERBOARD_SQL.format(where=""))
+    else:
+        cursor.execute("DELETE FROM PlayerLeaderboard WHERE MundialitoId = ?", (mundialito_id,))
+        cursor.execute(LEADERBOARD_SQL.format(where="WHERE s.MundialitoId = ?"), (mundialito_id,))
+
+    return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain PlayerLeaderboard.")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite it for every tournament from the stored tables")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.error("imports keep the table current; use --rebuild to rewrite it from scratch")
+
+    config = load_config()
+    storage = connect(config)
+    cursor = storage.cursor()
+
+    try:
+        storage.begin()
+        rows = derive_leaderboard(cursor)
+        storage.commit()
+    except Exception:
+        storage.rollback()
+        raise
+    finally:
+        cursor.close()
+        storage.close()
+
+    print(f"PlayerLeaderboard rebuilt: {rows} rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Content hashes that let unchanged tournaments be skipped (--force re-runs them).
+
+csv_creator_current.py keeps <outputPath>/staging_manifest.json: per MundialitoId
+the input hash (tournament csv + alias file), the Players/Teams registry
+fingerprint it staged against, the hash of the staging file it wrote and the
+staging schema it was written with. If all of them still match, staging is
+skipped without reading the input. import_data_current.py moves the recorded
+fingerprint past the Players/Teams rows its own import added, so the input is
+skipped right after it is imported, too.
+
+The importers keep the ImportManifest table (schema migration 4), written in the import transaction: the staging hash, and the
+input hash when it is known. The staging hash ignores row order and the
+IsNewPlayer/IsNewTeam flags (they only change once the rows are registered),
+so a re-staged but otherwise identical tournament is not imported again.
+batch_current.py skips a tournament outright when its input hash matches.
+"""
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from staging_format import STAGING_SCHEMA
+
+MANIFEST_FILE = "staging_manifest.json"
+
+# staging written with other columns or types (e.g. text GameIds) is re-staged
+SCHEMA_KEY = hashlib.sha256(json.dumps(STAGING_SCHEMA, sort_keys=True).encode()).hexdigest()[:16]
+
+# columns left out of the staging hash
+UNHASHED_COLUMNS = {"IsNewPlayer", "IsNewTeam"}
+
+
+def file_hash(path, normalize=False):
+    """sha256 of a file; normalize=True ignores CRLF vs LF line endings."""
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block.replace(b"\r\n", b"\n") if normalize else block)
+
+    return digest.hexdigest()
+
+
+def input_hash(file_path, aliases_path=None):
+    """Hash of what staging reads: the tournament csv and the alias table, if any."""
+    parts = [file_hash(file_path, normalize=True)]
+
+    if aliases_path and os.path.exists(aliases_path):
+        parts.append(file_hash(aliases_path, normalize=True))
+
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def staging_hash(df):
+    """Order-independent hash of the staging rows (sorted row hashes, sorted columns)."""
+    columns = sorted(c for c in df.columns if c not in UNHASHED_COLUMNS)
+    rows = np.sort(pd.util.hash_pandas_object(df[columns], index=False).to_numpy())
+
+    digest = hashlib.sha256(",".join(columns).encode())
+    digest.update(rows.tobytes())
+
+    return digest.hexdigest()
+
+
+def registry_fingerprint(storage):
+    """Players/Teams COUNT and MAX id: new ids are handed out from these, so staging depends on them."""
+    cursor = storage.cursor()
+
+    try:
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(PlayerId), 0) FROM Players")
+        players = tuple(cursor.fetchone())
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(TeamId), 0) FROM Teams")
+        teams = tuple(cursor.fetchone())
+    finally:
+        cursor.close()
+
+    return f"{storage.source}|players {players[0]}/{players[1]}|teams {teams[0]}/{teams[1]}"
+
+
+def read_manifest(out_path):
+    path = os.path.join(out_path, MANIFEST_FILE)
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(out_path, manifest):
+    path = os.path.join(out_path, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def record_staging(out_path, mund_id, input_key, fingerprint, staging_file):
+    manifest = read_manifest(out_path)
+    manifest[str(mund_id)] = {
+        "input_hash": input_key,
+        "registry": fingerprint,
+        "staging_file": os.path.basename(staging_file),
+        "staging_file_hash": file_hash(staging_file),
+        "schema": SCHEMA_KEY,
+    }
+
+    write_manifest(out_path, manifest)
+
+
+def staging_is_current(out_path, mund_id, input_key, fingerprint, staging_file):
+    entry = read_manifest(out_path).get(str(mund_id))
+
+    return (
+        entry is not None
+        and entry["input_hash"] == input_key
+        and entry["registry"] == fingerprint
+        and entry["staging_file"] == os.path.basename(staging_file)
+        and os.path.exists(staging_file)
+        and entry["staging_file_hash"] == file_hash(staging_file)
+        and entry.get("schema") == SCHEMA_KEY
+    )
+
+
+def record_imported_registry(out_path, mund_id, staging_file, before, after):
+    """
+    After staging_file is imported: the new Players/Teams rows it carried moved
+    the registry from before to after. If it was staged against before, record
+    after, so the unchanged input is not staged again on the next run.
+    """
+    manifest = read_manifest(out_path)
+    entry = manifest.get(str(mund_id))
+
+    if entry is None or entry["registry"] != before or entry["staging_file"] != os.path.basename(staging_file) \
+            or entry["staging_file_hash"] != file_hash(staging_file):
+        return
+
+    entry["registry"] = after
+
+    write_manifest(out_path, manifest)
+
+
+def staged_input_hash(out_path, mund_id, staging_file):
+    """The input hash csv_creator recorded for staging_file, if the file is still the one it wrote."""
+    entry = read_manifest(out_path).get(str(mund_id))
+
+    if entry and entry["staging_file"] == os.path.basename(staging_file) \
+            and entry["staging_file_hash"] == file_hash(staging_file):
+        return entry["input_hash"]
+
+    return None
+
+
+def imported_hashes(cursor, mund_id=None):
+    """{MundialitoId: (InputHash, StagingHash)} from ImportManifest, for one tournament or all."""
+    if mund_id is None:
+        cursor.execute("SELECT MundialitoId, InputHash, StagingHash FROM ImportManifest")
+    else:
+        cursor.execute(
+            "SELECT MundialitoId, InputHash, StagingHash FROM ImportManifest WHERE MundialitoId = ?", (mund_id,)
+        )
+
+    return {int(mid): (input_key, staging_key) for mid, input_key, staging_key in cursor.fetchall()}
+
+
+def record_import(cursor, mund_id, input_key, staging_key):
+    """Call inside the import transaction, so the manifest row commits with the data."""
+    cursor.execute("DELETE FROM ImportManifest WHERE MundialitoId = ?", (mund_id,))
+    cursor.execute(
+        "INSERT INTO ImportManifest (MundialitoId, InputHash, StagingHash, ImportedAt) VALUES (?, ?, ?, ?)",
+        (mund_id, input_key, staging_key, datetime.datetime.now().isoformat(timespec="seconds")),
+    )
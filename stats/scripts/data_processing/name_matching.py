@@ -0,0 +1,280 @@
+"""
+Player and team name normalization, aliases and near-duplicate detection.
+
+Names are compared by key: accents stripped, casefolded, whitespace collapsed.
+Before ids are assigned, every player/team name in a tournament is resolved to
+one spelling:
+    1. alias table (config "aliasesPath", csv Kind,Alias,Canonical; Kind is player or team)
+    2. the spelling already registered in the database for the same key
+    3. otherwise the most common spelling in the file (whitespace collapsed)
+Names that are still new are checked against a trigram index of the registry
+(and against each other) and reported as suspected duplicates, with the
+similarity score, so they can be fixed with an alias before re-running.
+"""
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+DEFAULT_SIMILARITY = 0.6
+
+
+def clean_name(name):
+    """Display form: single spaces, no leading/trailing whitespace."""
+    return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def name_key(name):
+    """Matching form: clean_name, accents stripped, casefolded."""
+    decomposed = unicodedata.normalize("NFKD", clean_name(name))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def min_shared(grams, threshold):
+    """Fewest shared trigrams a candidate needs to reach Jaccard >= threshold."""
+    return max(1, math.ceil(threshold * len(grams)))
+
+
+def probe_grams(grams, threshold, frequency):
+    """
+    The len(grams) - min_shared + 1 rarest trigrams: any name sharing min_shared
+    trigrams must share one of these, so only their postings need scanning.
+    """
+    ordered = sorted(grams, key=lambda g: (frequency(g), g))
+    return ordered[:len(grams) - min_shared(grams, threshold) + 1]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class TrigramIndex:
+    """In-memory trigram postings over names; similar() only scores names found through the rarest trigrams."""
+
+    def __init__(self, names=()):
+        self.postings = defaultdict(set)
+        self.grams = {}
+
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name in self.grams:
+            return
+
+        grams = trigrams(name_key(name))
+        self.grams[name] = grams
+
+        for gram in grams:
+            self.postings[gram].add(name)
+
+    def similar(self, name, threshold=DEFAULT_SIMILARITY):
+        grams = trigrams(name_key(name))
+        candidates = set()
+
+        for gram in probe_grams(grams, threshold, lambda g: len(self.postings.get(g, ()))):
+            candidates.update(self.postings.get(gram, ()))
+
+        matches = []
+
+        for other in candidates:
+            if other == name:
+                continue
+
+            score = jaccard(grams, self.grams[other])
+            if score >= threshold:
+                matches.append((other, score))
+
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+
+def load_aliases(path):
+    """{"player": {alias key: canonical}, "team": {...}} from the alias csv; empty if there is none."""
+    aliases = {"player": {}, "team": {}}
+
+    if not path or not os.path.exists(path):
+        return aliases
+
+    table = pd.read_csv(path, dtype=str).fillna("")
+
+    for kind, alias, canonical in table[["Kind", "Alias", "Canonical"]].itertuples(index=False):
+        kind = kind.strip().lower()
+
+        if kind not in aliases:
+            raise ValueError(f"{path}: Kind must be 'player' or 'team', got '{kind}'")
+
+        aliases[kind][name_key(alias)] = clean_name(canonical)
+
+    return aliases
+
+
+class SnapshotRegistry:
+    """Registry lookups over a load_existing_ids snapshot (used when no id index is configured)."""
+
+    def __init__(self, existing):
+        self.players = defaultdict(list)
+        for name in existing["players"]:
+            self.players[name_key(name)].append(name)
+
+        self.teams = defaultdict(list)
+        for team_name, _, mid in existing["teams"]:
+            self.teams[name_key(team_name)].append((team_name, mid))
+
+        self._player_index = None
+
+    def player_names_by_key(self, keys):
+        return {k: self.players[k] for k in keys if k in self.players}
+
+    def team_names_by_key(self, keys, mund_id):
+        """Registered spellings per key, this tournament's first."""
+        found = {}
+        for k in keys:
+            if k in self.teams:
+                found[k] = [n for n, _ in sorted(self.teams[k], key=lambda t: t[1] != mund_id)]
+        return found
+
+    def similar_players(self, name, threshold=DEFAULT_SIMILARITY):
+        if self._player_index is None:
+            self._player_index = TrigramIndex(n for names in self.players.values() for n in names)
+        return self._player_index.similar(name, threshold)
+
+    def team_names(self):
+        return sorted({n for names in self.teams.values() for n, _ in names})
+
+
+def resolve_spellings(values, kind, aliases, registered_by_key):
+    """
+    raw value -> resolved spelling for one kind of name, plus the events worth
+    reporting and the set of resolved names that are already registered.
+    """
+    counts = Counter(values)
+    resolved = {}
+    by_key = defaultdict(Counter)
+
+    for raw, n in counts.items():
+        cleaned = clean_name(raw)
+        aliased = aliases[kind].get(name_key(cleaned), cleaned)
+        key = name_key(aliased)
+
+        resolved[raw] = (cleaned, aliased, key)
+        by_key[key][aliased] += n
+
+    registered = registered_by_key(list(by_key))
+
+    chosen, known = {}, set()
+
+    for key, spellings in by_key.items():
+        if key in registered:
+            # keep the file's spelling when it is one of the registered ones
+            chosen[key] = next((s for s, _ in spellings.most_common() if s in registered[key]), registered[key][0])
+            known.add(chosen[key])
+        else:
+            # most common spelling; ties go to the first one seen
+            chosen[key] = spellings.most_common(1)[0][0]
+
+    mapping, events = {}, []
+
+    for raw, (cleaned, aliased, key) in resolved.items():
+        mapping[raw] = chosen[key]
+
+        if raw != chosen[key]:
+            if aliased != cleaned:
+                how = "alias"
+            elif chosen[key] in known and chosen[key] != cleaned:
+                how = "registered"
+            else:
+                how = "normalized"
+            events.append({"kind": kind, "type": how, "name": raw, "match": chosen[key], "score": None})
+
+    return mapping, events, known
+
+
+def suspected_duplicates(names, kind, registry_similar, threshold):
+    """New names that look like a registered name or like another new name in the same file."""
+    events = []
+    local = TrigramIndex(names)
+    seen_pairs = set()
+
+    for name in sorted(names):
+        for match, score in registry_similar(name, threshold):
+            if match in names:
+                continue
+            events.append({"kind": kind, "type": "suspect", "name": name, "match": match, "score": round(score, 3)})
+
+        for match, score in local.similar(name, threshold):
+            pair = tuple(sorted((name, match)))
+            if pair in seen_pairs:
+                continue
+            seen_pairs.add(pair)
+            events.append({"kind": kind, "type": "suspect", "name": name, "match": match, "score": round(score, 3)})
+
+    return events
+
+
+def match_names(df, mund_id, registry, aliases, threshold=DEFAULT_SIMILARITY):
+    """
+    Rewrite df's Name/TeamName/OppName to their resolved spellings. Returns
+    (df, report); report lists aliases applied, spellings normalized and
+    suspected duplicates among the names that will get new ids.
+    """
+    player_map, team_map, report = resolve_names(
+        df["Name"], pd.concat([df["TeamName"], df["OppName"]]), mund_id, registry, aliases, threshold
+    )
+
+    df = df.assign(
+        Name=df["Name"].map(player_map),
+        TeamName=df["TeamName"].map(team_map),
+        OppName=df["OppName"].map(team_map),
+    )
+
+    return df, report
+
+
+def resolve_names(player_names, team_names, mund_id, registry, aliases, threshold=DEFAULT_SIMILARITY):
+    """
+    match_names without a frame: player_names/team_names hold every occurrence of
+    each name, or a Counter of them. Returns (player_map, team_map, report).
+    """
+    player_map, player_events, known_players = resolve_spellings(
+        player_names, "player", aliases, registry.player_names_by_key
+    )
+    team_map, team_events, known_teams = resolve_spellings(
+        team_names, "team", aliases,
+        lambda keys: registry.team_names_by_key(keys, mund_id)
+    )
+
+    new_players = set(player_map.values()) - known_players
+    new_teams = set(team_map.values()) - known_teams
+    team_index = TrigramIndex(registry.team_names())
+
+    report = player_events + team_events
+    report += suspected_duplicates(new_players, "player", registry.similar_players, threshold)
+    report += suspected_duplicates(new_teams, "team", team_index.similar, threshold)
+
+    return player_map, team_map, report
+
+
+def print_report(report):
+    if not report:
+        print("Name matching: no aliases, respellings or suspected duplicates.")
+        return
+
+    print("Name matching report (before ids are assigned):")
+
+    for e in report:
+        if e["type"] == "suspect":
+            print(f"  SUSPECTED DUPLICATE {e['kind']}: '{e['name']}' ~ '{e['match']}' (similarity {e['score']:.2f})")
+        else:
+            print(f"  {e['type']} {e['kind']}: '{e['name']}' -> '{e['match']}'")
+
+    suspects = sum(e["type"] == "suspect" for e in report)
+    if suspects:
+        print(f"  {suspects} suspected duplicate(s): add an alias row to merge them, or ignore if they differ.")
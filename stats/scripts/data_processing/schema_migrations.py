@@ -0,0 +1,344 @@
+"""
+Versioned schema changes, applied in order and recorded in SchemaVersion.
+
+Each migration is a version number, a name and the steps for each dialect: SQL
+statements, or functions (storage, cursor) for what SQL alone cannot do. The
+steps are idempotent (IF NOT EXISTS, or a check of what is already there), so
+a migration interrupted halfway is simply run again, and a database changed by
+hand before it was versioned is recorded without being changed again. The
+version row is written after the steps, in the same transaction (Storage.begin
+opens one explicitly on SQLite, where DDL would otherwise autocommit). Applied
+versions are skipped.
+
+    1  mundialito_indexes   nonclustered indexes leading with MundialitoId on the
+                            tables the importers DELETE from per tournament and
+                            read back per tournament (career_stats, the
+                            TeamTournamentStats derivation), whose clustered keys
+                            lead with GameId/PlayerId/TeamId; and PlayerId on
+                            PlayerGameStats for per-player game history.
+    2  import_checkpoint    ImportCheckpoint, the progress of interrupted
+                            backfill imports (backfill_import.py).
+    3  career_stats         PlayerCareerStats and TeamHistory (career_stats.py),
+                            filled from the tournaments already stored.
+    4  import_manifest      ImportManifest, the hashes of each tournament's last
+                            import (manifest.py).
+    5  player_leaderboard   PlayerLeaderboard (leaderboard.py), filled for the
+                            tournaments already stored.
+    6  packed_game_ids      Games.GameId and PlayerGameStats.GameId from text to
+                            the packed integer (game_ids.py); the text id moves
+                            to Games.GameCode.
+    7  registry_changes     RegistryVersion, a counter per Players/Teams that
+                            triggers bump on every UPDATE or DELETE, so id_index.py
+                            can tell a rename from COUNT/MAX alone.
+
+database/schema_sqlite.sql creates the current tables, so on SQLite versions 3
+to 5 only fill them and 6 converts databases created before it.
+
+SQLite databases are migrated whenever the pipeline opens them
+(SqliteStorage.ensure_schema). To bring a SQL Server database (database/schema.sql)
+up to date, or to see where a database stands:
+    python schema_migrations.py
+    python schema_migrations.py --status
+"""
+import argparse
+import datetime
+
+from career_stats import fill_career_stats
+from common import load_config, connect
+from game_ids import convert_sqlite_game_ids
+from instrumentation import stage
+from leaderboard import LEADERBOARD_SQL
+
+VERSION_TABLE_SQL = {
+    "sqlite": (
+        "CREATE TABLE IF NOT EXISTS SchemaVersion ("
+        "Version INTEGER NOT NULL PRIMARY KEY, Name TEXT NOT NULL, AppliedAt TEXT NOT NULL)"
+    ),
+    "sqlserver": (
+        "IF OBJECT_ID(N'[dbo].[SchemaVersion]', N'U') IS NULL "
+        "CREATE TABLE [dbo].[SchemaVersion] ("
+        "[Version] [int] NOT NULL, [Name] [nvarchar](100) NOT NULL, [AppliedAt] [datetime2](0) NOT NULL, "
+        "CONSTRAINT [PK_SchemaVersion] PRIMARY KEY CLUSTERED ([Version] ASC))"
+    ),
+}
+
+# (index, table, key columns, included columns)
+MUNDIALITO_INDEXES = [
+    ("IX_Games_MundialitoId", "Games", ["MundialitoId"], []),
+    ("IX_PlayerGameStats_MundialitoId", "PlayerGameStats", ["MundialitoId"], []),
+    ("IX_PlayerGameStats_PlayerId", "PlayerGameStats", ["PlayerId"], ["MundialitoId"]),
+    # the TeamTournamentStats derivation's MAX(GamesWon) per tournament
+    ("IX_PlayerTournamentStats_MundialitoId", "PlayerTournamentStats", ["MundialitoId"], ["GamesWon"]),
+    ("IX_PlayerAwards_MundialitoId", "PlayerAwards", ["MundialitoId"], []),
+    ("IX_TeamTournamentStats_MundialitoId", "TeamTournamentStats", ["MundialitoId"], []),
+]
+
+
+IMPORT_CHECKPOINT_SQL = {
+    "sqlite": (
+        "CREATE TABLE IF NOT EXISTS ImportCheckpoint ("
+        "MundialitoId INTEGER NOT NULL REFERENCES Mundialitos (MundialitoId), TableName TEXT NOT NULL, "
+        "LastKey TEXT NULL, RowsDone INTEGER NOT NULL DEFAULT 0, StagingHash TEXT NOT NULL, UpdatedAt TEXT NOT NULL, "
+        "CONSTRAINT PK_ImportCheckpoint PRIMARY KEY (MundialitoId, TableName))"
+    ),
+    "sqlserver": (
+        "IF OBJECT_ID(N'[dbo].[ImportCheckpoint]', N'U') IS NULL "
+        "CREATE TABLE [dbo].[ImportCheckpoint] ("
+        "[MundialitoId] [int] NOT NULL, [TableName] [nvarchar](50) NOT NULL, [LastKey] [nvarchar](100) NULL, "
+        "[RowsDone] [int] NOT NULL DEFAULT ((0)), [StagingHash] [char](64) NOT NULL, [UpdatedAt] [datetime2](0) NOT NULL, "
+        "CONSTRAINT [PK_ImportCheckpoint] PRIMARY KEY CLUSTERED ([MundialitoId] ASC, [TableName] ASC), "
+        "CONSTRAINT [FK_ImportCheckpoint_Mundialitos] FOREIGN KEY([MundialitoId]) "
+        "REFERENCES [dbo].[Mundialitos] ([MundialitoId]))"
+    ),
+}
+
+
+CAREER_STATS_SQL = [
+    "IF OBJECT_ID(N'[dbo].[PlayerCareerStats]', N'U') IS NULL "
+    "CREATE TABLE [dbo].[PlayerCareerStats] ("
+    "[PlayerId] [int] NOT NULL, [Tournaments] [int] NOT NULL DEFAULT ((0)), "
+    "[GamesPlayed] [int] NOT NULL DEFAULT ((0)), [GamesWon] [int] NOT NULL DEFAULT ((0)), "
+    "[GamesDrawn] [int] NOT NULL DEFAULT ((0)), [GamesLost] [int] NOT NULL DEFAULT ((0)), "
+    "[Goals] [int] NOT NULL DEFAULT ((0)), [Assists] [int] NOT NULL DEFAULT ((0)), "
+    "[CleanSheets] [int] NOT NULL DEFAULT ((0)), [GoalsConceded] [int] NOT NULL DEFAULT ((0)), "
+    "[MVPs] [int] NOT NULL DEFAULT ((0)), [GoldenBoots] [int] NOT NULL DEFAULT ((0)), "
+    "[Playmakers] [int] NOT NULL DEFAULT ((0)), [GoalsPerGame] [float] NOT NULL DEFAULT ((0)), "
+    "[AssistsPerGame] [float] NOT NULL DEFAULT ((0)), [WinRate] [float] NOT NULL DEFAULT ((0)), "
+    "CONSTRAINT [PK_PlayerCareerStats] PRIMARY KEY CLUSTERED ([PlayerId] ASC), "
+    "CONSTRAINT [FK_PCS_Players] FOREIGN KEY([PlayerId]) REFERENCES [dbo].[Players] ([PlayerId]))",
+
+    "IF OBJECT_ID(N'[dbo].[TeamHistory]', N'U') IS NULL "
+    "CREATE TABLE [dbo].[TeamHistory] ("
+    "[TeamName] [nvarchar](100) NOT NULL, [Tournaments] [int] NOT NULL DEFAULT ((0)), "
+    "[GamesPlayed] [int] NOT NULL DEFAULT ((0)), [GamesWon] [int] NOT NULL DEFAULT ((0)), "
+    "[GamesDrawn] [int] NOT NULL DEFAULT ((0)), [GamesLost] [int] NOT NULL DEFAULT ((0)), "
+    "[Goals] [int] NOT NULL DEFAULT ((0)), [Assists] [int] NOT NULL DEFAULT ((0)), "
+    "[CleanSheets] [int] NOT NULL DEFAULT ((0)), [GoalsConceded] [int] NOT NULL DEFAULT ((0)), "
+    "[Championships] [int] NOT NULL DEFAULT ((0)), [GoalsPerGame] [float] NOT NULL DEFAULT ((0)), "
+    "[WinRate] [float] NOT NULL DEFAULT ((0)), "
+    "CONSTRAINT [PK_TeamHistory] PRIMARY KEY CLUSTERED ([TeamName] ASC))",
+]
+
+IMPORT_MANIFEST_SQL = (
+    "IF OBJECT_ID(N'[dbo].[ImportManifest]', N'U') IS NULL "
+    "CREATE TABLE [dbo].[ImportManifest] ("
+    "[MundialitoId] [int] NOT NULL, [InputHash] [char](64) NULL, [StagingHash] [char](64) NOT NULL, "
+    "[ImportedAt] [datetime2](0) NOT NULL, "
+    "CONSTRAINT [PK_ImportManifest] PRIMARY KEY CLUSTERED ([MundialitoId] ASC), "
+    "CONSTRAINT [FK_ImportManifest_Mundialitos] FOREIGN KEY([MundialitoId]) "
+    "REFERENCES [dbo].[Mundialitos] ([MundialitoId]))"
+)
+
+PLAYER_LEADERBOARD_SQL = (
+    "IF OBJECT_ID(N'[dbo].[PlayerLeaderboard]', N'U') IS NULL "
+    "CREATE TABLE [dbo].[PlayerLeaderboard] ("
+    "[MundialitoId] [int] NOT NULL, [Rank] [int] NOT NULL, [PlayerId] [int] NOT NULL, "
+    "[PlayerName] [nvarchar](100) NOT NULL, [TeamId] [int] NOT NULL, [TeamName] [nvarchar](100) NOT NULL, "
+    "[TeamAbbr] [nvarchar](10) NOT NULL, [GamesPlayed] [int] NOT NULL, [GamesWon] [int] NOT NULL, "
+    "[GamesDrawn] [int] NOT NULL, [GamesLost] [int] NOT NULL, [Goals] [int] NOT NULL, [Assists] [int] NOT NULL, "
+    "[CleanSheets] [int] NULL, [GoalsConceded] [int] NULL, [IsMVP] [bit] NOT NULL DEFAULT ((0)), "
+    "[IsGoldenBoot] [bit] NOT NULL DEFAULT ((0)), [IsPlaymaker] [bit] NOT NULL DEFAULT ((0)), "
+    "[GoalsRank] [int] NOT NULL, [AssistsRank] [int] NOT NULL, "
+    "CONSTRAINT [PK_PlayerLeaderboard] PRIMARY KEY CLUSTERED ([MundialitoId] ASC, [Rank] ASC), "
+    "CONSTRAINT [FK_PlayerLeaderboard_Mundialitos] FOREIGN KEY([MundialitoId]) "
+    "REFERENCES [dbo].[Mundialitos] ([MundialitoId]))"
+)
+
+# tournaments imported before the table existed
+LEADERBOARD_BACKFILL_SQL = LEADERBOARD_SQL.format(
+    where="WHERE NOT EXISTS (SELECT 1 FROM PlayerLeaderboard lb WHERE lb.MundialitoId = s.MundialitoId)"
+)
+
+# one batch, guarded on Games.GameCode; the new columns are only referenced
+# through EXEC, which compiles when it runs
+PACKED_GAME_IDS_SQL = """
+SET XACT_ABORT ON
+
+IF COL_LENGTH(N'dbo.Games', N'GameCode') IS NULL
+BEGIN
+    ALTER TABLE [dbo].[PlayerGameStats] DROP CONSTRAINT [FK_PGS_Games]
+    ALTER TABLE [dbo].[PlayerGameStats] DROP CONSTRAINT [PK_PlayerGameStats]
+    ALTER TABLE [dbo].[Games] DROP CONSTRAINT [PK_Games]
+
+    EXEC sp_rename N'dbo.Games.GameId', N'GameCode', N'COLUMN'
+    EXEC sp_rename N'dbo.PlayerGameStats.GameId', N'GameCode', N'COLUMN'
+
+    ALTER TABLE [dbo].[Games] ADD [GameId] [bigint] NULL
+    ALTER TABLE [dbo].[PlayerGameStats] ADD [GameId] [bigint] NULL
+
+    EXEC (N'
+        UPDATE [dbo].[Games]
+        SET [GameId] = CAST([MundialitoId] AS bigint) * 2199023255552
+            + CAST([TeamAId] AS bigint) * 16777216
+            + CAST([TeamBId] AS bigint) * 128
+            + CAST(RIGHT([GameCode], CHARINDEX(''-'', REVERSE([GameCode])) - 1) AS bigint)
+
+        UPDATE s
+        SET [GameId] = g.[GameId]
+        FROM [dbo].[PlayerGameStats] s
+        JOIN [dbo].[Games] g ON g.[GameCode] = s.[GameCode]
+    ')
+
+    ALTER TABLE [dbo].[Games] ALTER COLUMN [GameId] [bigint] NOT NULL
+    ALTER TABLE [dbo].[Games] ALTER COLUMN [GameCode] [nvarchar](50) NULL
+    ALTER TABLE [dbo].[PlayerGameStats] ALTER COLUMN [GameId] [bigint] NOT NULL
+    ALTER TABLE [dbo].[PlayerGameStats] DROP COLUMN [GameCode]
+
+    ALTER TABLE [dbo].[Games] ADD CONSTRAINT [PK_Games] PRIMARY KEY CLUSTERED ([GameId] ASC)
+    ALTER TABLE [dbo].[PlayerGameStats] ADD CONSTRAINT [PK_PlayerGameStats] PRIMARY KEY CLUSTERED ([GameId] ASC, [PlayerId] ASC)
+    ALTER TABLE [dbo].[PlayerGameStats] WITH CHECK ADD CONSTRAINT [FK_PGS_Games] FOREIGN KEY([GameId])
+        REFERENCES [dbo].[Games] ([GameId])
+        ON DELETE CASCADE
+END
+"""
+
+
+REGISTRY_TABLES = ["Players", "Teams"]
+
+REGISTRY_VERSION_SQL = {
+    "sqlite": (
+        "CREATE TABLE IF NOT EXISTS RegistryVersion ("
+        "TableName TEXT NOT NULL PRIMARY KEY, Changes INTEGER NOT NULL DEFAULT 0)"
+    ),
+    "sqlserver": (
+        "IF OBJECT_ID(N'[dbo].[RegistryVersion]', N'U') IS NULL "
+        "CREATE TABLE [dbo].[RegistryVersion] ("
+        "[TableName] [nvarchar](50) NOT NULL, [Changes] [bigint] NOT NULL DEFAULT ((0)), "
+        "CONSTRAINT [PK_RegistryVersion] PRIMARY KEY CLUSTERED ([TableName] ASC))"
+    ),
+}
+
+
+def registry_changes_statements(dialect):
+    statements = [REGISTRY_VERSION_SQL[dialect]]
+
+    for table in REGISTRY_TABLES:
+        statements.append(
+            f"INSERT INTO RegistryVersion (TableName, Changes) SELECT '{table}', 0 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM RegistryVersion WHERE TableName = '{table}')"
+        )
+        bump = f"UPDATE RegistryVersion SET Changes = Changes + 1 WHERE TableName = '{table}'"
+
+        if dialect == "sqlite":
+            # SQLite triggers fire per row; one bump per changed row is just as good
+            statements += [
+                f"CREATE TRIGGER IF NOT EXISTS TR_{table}_{event.title()} AFTER {event} ON {table} BEGIN {bump}; END"
+                for event in ("UPDATE", "DELETE")
+            ]
+        else:
+            # CREATE TRIGGER has to start its batch, hence EXEC (quotes doubled inside it)
+            quoted = bump.replace("'", "''")
+            statements.append(
+                f"IF OBJECT_ID(N'[dbo].[TR_{table}_Changes]', N'TR') IS NULL "
+                f"EXEC (N'CREATE TRIGGER [dbo].[TR_{table}_Changes] ON [dbo].[{table}] AFTER UPDATE, DELETE AS "
+                f"BEGIN SET NOCOUNT ON; IF EXISTS (SELECT 1 FROM deleted) {quoted} END')"
+            )
+
+    return statements
+
+
+def create_index_sql(dialect, name, table, columns, include):
+    if dialect == "sqlite":
+        # no INCLUDE in SQLite: trailing key columns cover the same reads
+        return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns + include)})"
+
+    included = f" INCLUDE ({', '.join(f'[{c}]' for c in include)})" if include else ""
+    return (
+        f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'{name}' AND object_id = OBJECT_ID(N'[dbo].[{table}]')) "
+        f"CREATE NONCLUSTERED INDEX [{name}] ON [dbo].[{table}] ({', '.join(f'[{c}] ASC' for c in columns)}){included}"
+    )
+
+
+def index_statements(indexes):
+    return lambda dialect: [create_index_sql(dialect, *index) for index in indexes]
+
+
+# (version, name, dialect -> statements or (storage, cursor) steps), in version order
+MIGRATIONS = [
+    (1, "mundialito_indexes", index_statements(MUNDIALITO_INDEXES)),
+    (2, "import_checkpoint", lambda dialect: [IMPORT_CHECKPOINT_SQL[dialect]]),
+    (3, "career_stats", lambda dialect: (CAREER_STATS_SQL if dialect == "sqlserver" else []) + [fill_career_stats]),
+    (4, "import_manifest", lambda dialect: [IMPORT_MANIFEST_SQL] if dialect == "sqlserver" else []),
+    (5, "player_leaderboard",
+     lambda dialect: ([PLAYER_LEADERBOARD_SQL] if dialect == "sqlserver" else []) + [LEADERBOARD_BACKFILL_SQL]),
+    (6, "packed_game_ids", lambda dialect: [PACKED_GAME_IDS_SQL] if dialect == "sqlserver" else [convert_sqlite_game_ids]),
+    (7, "registry_changes", registry_changes_statements),
+]
+
+
+def applied_versions(cursor):
+    """{Version: (Name, AppliedAt)} of the migrations recorded in SchemaVersion."""
+    cursor.execute("SELECT Version, Name, AppliedAt FROM SchemaVersion")
+    return {version: (name, str(applied_at)) for version, name, applied_at in cursor.fetchall()}
+
+
+def migrate(storage):
+    """Apply the migrations not yet recorded, in order. Returns the versions applied."""
+    cursor = storage.cursor()
+    applied = []
+
+    try:
+        cursor.execute(VERSION_TABLE_SQL[storage.dialect])
+        storage.commit()
+        done = applied_versions(cursor)
+
+        for version, name, statements in MIGRATIONS:
+            if version in done:
+                continue
+
+            storage.begin()
+            try:
+                with stage(f"migrate.{name}"):
+                    for statement in statements(storage.dialect):
+                        if callable(statement):
+                            statement(storage, cursor)
+                        else:
+                            cursor.execute(statement)
+
+                    cursor.execute(
+                        "INSERT INTO SchemaVersion (Version, Name, AppliedAt) VALUES (?, ?, ?)",
+                        (version, name, datetime.datetime.now().isoformat(timespec="seconds")),
+                    )
+                storage.commit()
+            except Exception:
+                storage.rollback()
+                raise
+
+            print(f"Schema: applied version {version} ({name})")
+            applied.append(version)
+    finally:
+        cursor.close()
+
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="list applied and pending versions instead")
+    args = parser.parse_args()
+
+    config = load_config()
+    storage = connect(config)
+
+    try:
+        if not args.status:
+            migrate(storage)
+            return
+
+        cursor = storage.cursor()
+        try:
+            cursor.execute(VERSION_TABLE_SQL[storage.dialect])
+            storage.commit()
+            done = applied_versions(cursor)
+        finally:
+            cursor.close()
+
+        for version, name, _ in MIGRATIONS:
+            state = f"applied {done[version][1]}" if version in done else "pending"
+            print(f"{version:>4}  {name:<24} {state}")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Set-based import: one bulk transfer, every table derived inside the database.
+
+Enabled with config "setBasedImport" (true; --upsert still takes precedence).
+The staging rows go over the wire once, into a connection-private temp table
+(#StagingRows on SQL Server, temp.StagingRows on SQLite). Everything else is
+INSERT ... SELECT from it in the import transaction, the same statements on
+both backends:
+
+    Players, Teams           the IsNewPlayer / IsNewTeam rows
+    Games                    GROUP BY GameId, the lower team id as side A
+    PlayerGameStats          the staging rows themselves
+    PlayerTournamentStats    GROUP BY player, W/D/L counted with CASE
+    PlayerAwards             GROUP BY player, MAX of the award flags
+    TeamTournamentStats      GROUP BY team over the PlayerTournamentStats just written
+    PlayerLeaderboard        leaderboard.LEADERBOARD_SQL, ranks by window functions
+
+so the pandas groupbys of aggregation.py never run and no derived row is sent.
+Tables are replaced per tournament (DELETE + INSERT ... SELECT) like
+import_staging does; the career tables take the difference between the
+tournament's stored contribution before and after, read back from the database.
+"""
+import pandas as pd
+
+from bulk_writer import DEFAULT_CHUNK_SIZE, insert_frame
+from career_stats import apply_contribution, stored_contribution
+from import_data_current import TABLE_COLUMNS, check_staging, insert_mundialito
+from instrumentation import stage
+from leaderboard import derive_leaderboard
+from manifest import record_import, staging_hash
+
+STAGING_TABLE = "StagingRows"
+
+# the staging columns the derivations read
+STAGED_COLUMNS = [
+    ("GameId", int),
+    ("Game", int),
+    ("MundialitoId", int),
+    ("PlayerId", int),
+    ("TeamId", int),
+    ("OppId", int),
+    ("WL", str),
+    ("Goals", int),
+    ("Assists", int),
+    ("CleanSheet", int),
+    ("GoalsConceded", int),
+    ("PlayerName", str),
+    ("TeamName", str),
+    ("TeamAbbr", str),
+    ("IsNewPlayer", bool),
+    ("IsNewTeam", bool),
+    ("IsMVP", bool),
+    ("IsGoldenBoot", bool),
+    ("IsPlaymaker", bool),
+]
+
+SIDE_A = "CASE WHEN TeamId <= OppId THEN {then} ELSE {other} END"
+TEAM_A = SIDE_A.format(then="TeamId", other="OppId")
+TEAM_B = SIDE_A.format(then="OppId", other="TeamId")
+
+# SELECT producing each table's TABLE_COLUMNS, in order; {staging} is the temp
+# table, {game_code} the GameCode expression, the ? parameters are all the MundialitoId
+DERIVE_SQL = {
+    "Games": f"""
+        SELECT GameId, MundialitoId, {TEAM_A}, {TEAM_B},
+               SUM({SIDE_A.format(then="Goals", other="0")}),
+               MAX({SIDE_A.format(then="GoalsConceded", other="0")}),
+               {{game_code}}
+        FROM {{staging}}
+        GROUP BY GameId, MundialitoId, {TEAM_A}, {TEAM_B}, Game
+    """,
+    "PlayerGameStats": """
+        SELECT GameId, MundialitoId, PlayerId, TeamId, OppId, WL, Goals, Assists, GoalsConceded
+        FROM {staging}
+    """,
+    "PlayerTournamentStats": """
+        SELECT PlayerId, MundialitoId, TeamId, COUNT(*),
+               SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN WL = 'D' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN WL = 'L' THEN 1 ELSE 0 END),
+               SUM(Goals), SUM(Assists), SUM(CleanSheet), SUM(GoalsConceded)
+        FROM {staging}
+        GROUP BY PlayerId, MundialitoId, TeamId
+    """,
+    # bit columns have no MAX on SQL Server
+    "PlayerAwards": """
+        SELECT PlayerId, MundialitoId,
+               MAX(CAST(IsMVP AS int)), MAX(CAST(IsGoldenBoot AS int)), MAX(CAST(IsPlaymaker AS int))
+        FROM {staging}
+        GROUP BY PlayerId, MundialitoId
+    """,
+    # games/results/conceded are shared by the roster, goals add up
+    "TeamTournamentStats": """
+        SELECT TeamId, MundialitoId, MAX(GamesPlayed), MAX(GamesWon), MAX(GamesDrawn), MAX(GamesLost),
+               SUM(Goals), SUM(Assists), MAX(GoalsConceded), MAX(CleanSheets),
+               CASE WHEN MAX(GamesWon) = (
+                   SELECT MAX(GamesWon) FROM PlayerTournamentStats WHERE MundialitoId = ?
+               ) THEN 1 ELSE 0 END
+        FROM PlayerTournamentStats
+        WHERE MundialitoId = ?
+        GROUP BY TeamId, MundialitoId
+    """,
+}
+
+
+def load_staging_rows(storage, cursor, df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Send the staging rows to a fresh temp table (the only bulk transfer). Returns its name."""
+    staging = storage.create_temp_table(cursor, STAGING_TABLE, STAGED_COLUMNS)
+    insert_frame(cursor, staging, df, [(c, c, kind) for c, kind in STAGED_COLUMNS], chunk_size)
+    return staging
+
+
+def insert_new_players_and_teams_sql(storage, cursor, staging):
+    storage.identity_insert(cursor, "Players", True)
+    cursor.execute(
+        f"INSERT INTO Players (PlayerId, Name) "
+        f"SELECT PlayerId, MIN(PlayerName) FROM {staging} WHERE IsNewPlayer = 1 GROUP BY PlayerId"
+    )
+    print(f"Inserted {cursor.rowcount} new players.")
+    storage.identity_insert(cursor, "Players", False)
+
+    storage.identity_insert(cursor, "Teams", True)
+    cursor.execute(
+        f"INSERT INTO Teams (TeamId, MundialitoId, TeamName, TeamAbbr) "
+        f"SELECT TeamId, MIN(MundialitoId), MIN(TeamName), MIN(TeamAbbr) FROM {staging} "
+        f"WHERE IsNewTeam = 1 GROUP BY TeamId"
+    )
+    print(f"Inserted {cursor.rowcount} new teams.")
+    storage.identity_insert(cursor, "Teams", False)
+
+
+def derive_table(storage, cursor, table, staging, mundialito_id):
+    """INSERT ... SELECT one table's rows for mundialito_id. Returns the number of rows."""
+    code = storage.concat([f"CAST({TEAM_A} AS varchar(12))", "'-'", f"CAST({TEAM_B} AS varchar(12))", "'-'",
+                           "CAST(Game AS varchar(4))"])
+    select = DERIVE_SQL[table].format(staging=staging, game_code=code)
+    columns = ", ".join(c for c, _ in TABLE_COLUMNS[table])
+
+    cursor.execute(f"INSERT INTO {table} ({columns}) {select}", (mundialito_id,) * select.count("?"))
+    print(f"Derived {cursor.rowcount} {table} rows.")
+
+    return cursor.rowcount
+
+
+def import_staging_set_based(storage, df, mund_date, chunk_size=DEFAULT_CHUNK_SIZE, input_key=None, staging_key=None):
+    """
+    import_staging with the derived tables computed by the database from one bulk
+    load of the staging rows. Commits on success, rolls back and re-raises on error.
+    """
+    cursor = storage.cursor()
+
+    storage.begin()
+
+    mundialito_id = check_staging(df)
+    print(f"Importing for MundialitoId = {mundialito_id} (set-based)")
+
+    if staging_key is None:
+        staging_key = staging_hash(df)
+
+    if df.isna().to_numpy().any():
+        df = df.where(pd.notnull(df), None)
+
+    try:
+
+        with stage("import.bulk_load", rows=len(df), mundialito_id=mundialito_id):
+            staging = load_staging_rows(storage, cursor, df, chunk_size)
+
+        with stage("import.players_teams", mundialito_id=mundialito_id):
+            insert_mundialito(storage, cursor, mundialito_id, mund_date)
+            insert_new_players_and_teams_sql(storage, cursor, staging)
+
+        old = stored_contribution(cursor, mundialito_id)
+
+        # children first on the way out, parents first on the way in
+        for table in reversed(list(TABLE_COLUMNS)):
+            cursor.execute(f"DELETE FROM {table} WHERE MundialitoId = ?", (mundialito_id,))
+
+        for table in TABLE_COLUMNS:
+            with stage(f"import.{table}", mundialito_id=mundialito_id) as s:
+                s.rows = derive_table(storage, cursor, table, staging, mundialito_id)
+
+        with stage("import.PlayerLeaderboard", mundialito_id=mundialito_id) as s:
+            s.rows = derive_leaderboard(cursor, mundialito_id)
+
+        with stage("import.career_stats", mundialito_id=mundialito_id):
+            apply_contribution(cursor, old, stored_contribution(cursor, mundialito_id), chunk_size)
+
+        with stage("import.commit", mundialito_id=mundialito_id):
+            storage.drop_temp_table(cursor, staging)
+            record_import(cursor, mundialito_id, input_key, staging_key)
+            storage.commit()
+        print("Import completed successfully.")
+
+    except Exception:
+        print("ERROR during import, rolling back...")
+        storage.rollback()
+        raise
+
+    finally:
+        cursor.close()
@@ -0,0 +1,245 @@
+"""
+Precompressed JSON snapshots of what the API serves, written after each import.
+
+The data behind GET api/tournaments and GET api/tournaments/{id}/players only
+changes when a tournament is imported, so with config "snapshotPath" set the
+importers export it as static files once they have committed:
+
+    <snapshotPath>/index.json
+    <snapshotPath>/api/tournaments.<version>.json[.gz|.br]
+    <snapshotPath>/api/tournaments/<id>/players.<version>.json[.gz|.br]
+
+The JSON has the shape the controllers return (camelCase properties, ISO
+dates, players in PlayerLeaderboard order), so the same DTOs deserialize it.
+<version> is the start of the sha256 of that JSON, so a file never changes once
+written and can be cached forever; an unchanged snapshot is not rewritten. The
+.gz siblings ("snapshotEncodings", default ["gzip"]) are there for servers that
+send precompressed files as they are. Add "br" for .br siblings too; it needs
+the brotli package, which is not a requirement of the pipeline.
+
+index.json maps each route to its current files, with the ETag (the quoted
+version), sizes and row count, so a static server or CDN can answer with the
+right file and 304s; it is the only file to serve with a short TTL. Files of
+the previous index are kept for clients still holding it, older ones removed.
+
+Export everything (e.g. the first time, or after changing snapshotPath):
+    python snapshots.py
+"""
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+from common import load_config, connect
+from instrumentation import configure, stage
+
+INDEX_FILE = "index.json"
+DEFAULT_ENCODINGS = ["gzip"]
+ENCODING_SUFFIX = {"gzip": ".gz", "br": ".br"}
+
+# PlayerTournamentStatDto, property names as the API serializes them
+PLAYER_FIELDS = [
+    ("playerId", "PlayerId"),
+    ("playerName", "PlayerName"),
+    ("teamId", "TeamId"),
+    ("teamName", "TeamName"),
+    ("teamAbbr", "TeamAbbr"),
+    ("mundialitoId", "MundialitoId"),
+    ("gamesPlayed", "GamesPlayed"),
+    ("gamesWon", "GamesWon"),
+    ("gamesDrawn", "GamesDrawn"),
+    ("gamesLost", "GamesLost"),
+    ("goals", "Goals"),
+    ("assists", "Assists"),
+    ("cleanSheets", "CleanSheets"),
+    ("goalsConceded", "GoalsConceded"),
+]
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError as e:
+        raise ImportError("br snapshots need brotli (pip install brotli), or leave br out of snapshotEncodings") from e
+
+    return brotli
+
+
+def compress(data, encoding):
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes, and so the file, identical between runs
+        return gzip.compress(data, compresslevel=9, mtime=0)
+
+    if encoding == "br":
+        return _brotli().compress(data, quality=11)
+
+    raise ValueError(f"Unknown snapshot encoding '{encoding}', expected 'gzip' or 'br'")
+
+
+def tournaments_payload(cursor):
+    cursor.execute("SELECT MundialitoId, Name, Date FROM Mundialitos ORDER BY MundialitoId")
+
+    # SQLite hands the date back as text, SQL Server as a date
+    return [
+        {"mundialitoId": int(mid), "name": name, "date": str(date)[:10]}
+        for mid, name, date in cursor.fetchall()
+    ]
+
+
+def players_payload(cursor, mundialito_id):
+    cursor.execute(
+        f"SELECT {', '.join(c for _, c in PLAYER_FIELDS)} FROM PlayerLeaderboard WHERE MundialitoId = ? ORDER BY Rank",
+        (mundialito_id,),
+    )
+
+    return [dict(zip((name for name, _ in PLAYER_FIELDS), row)) for row in cursor.fetchall()]
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def write_snapshot(snapshot_path, route, payload, encodings):
+    """Write route's JSON (and compressed copies) under a content-hashed name, unless present. Returns its index entry."""
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    version = digest[:16]
+
+    entry = {
+        "path": f"{route}.{version}.json",
+        "etag": f'"{version}"',
+        "sha256": digest,
+        "bytes": len(data),
+        "rows": len(payload),
+        "encodings": {},
+    }
+
+    path = os.path.join(snapshot_path, entry["path"])
+    if not os.path.exists(path):
+        write_file(path, data)
+
+    for encoding in encodings:
+        relative = entry["path"] + ENCODING_SUFFIX[encoding]
+        path = os.path.join(snapshot_path, relative)
+
+        if not os.path.exists(path):
+            write_file(path, compress(data, encoding))
+
+        entry["encodings"][encoding] = {"path": relative, "bytes": os.path.getsize(path)}
+
+    return entry
+
+
+def read_index(snapshot_path):
+    path = os.path.join(snapshot_path, INDEX_FILE)
+
+    if not os.path.exists(path):
+        return {"routes": {}}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def prune(snapshot_path, keep):
+    """Remove snapshot files under api/ not listed in keep (paths relative to snapshot_path)."""
+    removed = 0
+
+    for folder, _, files in os.walk(os.path.join(snapshot_path, "api")):
+        for name in files:
+            relative = os.path.relpath(os.path.join(folder, name), snapshot_path).replace(os.sep, "/")
+
+            if relative not in keep:
+                os.remove(os.path.join(folder, name))
+                removed += 1
+
+    return removed
+
+
+def index_paths(index):
+    return {
+        path
+        for entry in index["routes"].values()
+        for path in [entry["path"]] + [e["path"] for e in entry["encodings"].values()]
+    }
+
+
+def export_snapshots(storage, config, mundialito_ids=None):
+    """
+    Refresh the tournament list and the player snapshots of mundialito_ids (every
+    tournament if None), then the index. Reads committed data only; returns the index.
+    """
+    snapshot_path = config["snapshotPath"]
+    encodings = config.get("snapshotEncodings", DEFAULT_ENCODINGS)
+
+    previous = read_index(snapshot_path)
+    routes = dict(previous["routes"])
+    cursor = storage.cursor()
+
+    try:
+        tournaments = tournaments_payload(cursor)
+        routes["api/tournaments"] = write_snapshot(snapshot_path, "api/tournaments", tournaments, encodings)
+
+        known = {t["mundialitoId"] for t in tournaments}
+        ids = sorted(known) if mundialito_ids is None else [i for i in mundialito_ids if i in known]
+
+        for mundialito_id in ids:
+            route = f"api/tournaments/{mundialito_id}/players"
+            routes[route] = write_snapshot(snapshot_path, route, players_payload(cursor, mundialito_id), encodings)
+    finally:
+        cursor.close()
+
+    # tournaments no longer in the database
+    for route in [r for r in routes if r.count("/") == 3 and int(r.split("/")[2]) not in known]:
+        del routes[route]
+
+    index = {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        "routes": dict(sorted(routes.items())),
+    }
+
+    if index["routes"] != previous["routes"]:
+        write_file(os.path.join(snapshot_path, INDEX_FILE), json.dumps(index, indent=2).encode("utf-8"))
+        removed = prune(snapshot_path, index_paths(index) | index_paths(previous))
+        print(f"Snapshots: {len(ids) + 1} route(s) exported to {snapshot_path}, {removed} stale file(s) removed")
+    else:
+        print(f"Snapshots: unchanged ({len(ids) + 1} route(s) checked)")
+
+    return index
+
+
+def export_after_import(storage, config, mundialito_ids):
+    """Post-import hook for the importers: no-op unless config sets snapshotPath."""
+    if not config.get("snapshotPath"):
+        return None
+
+    with stage("export_snapshots", rows=len(mundialito_ids)):
+        return export_snapshots(storage, config, mundialito_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export precompressed API snapshots for every tournament.")
+    parser.parse_args()
+
+    config = load_config()
+    configure(config, "snapshots")
+
+    if not config.get("snapshotPath"):
+        parser.error("snapshotPath is not set in config.json")
+
+    storage = connect(config)
+
+    try:
+        with stage("export_snapshots"):
+            export_snapshots(storage, config)
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Staging file formats: csv (default), parquet, or arrow (Arrow IPC file).
+
+The columnar formats carry an explicit schema for the staging columns, so the
+importer gets int32 ids, small-int counts, categorical names and real bools back
+without parsing or dtype inference; csv is read with the same dtypes declared.
+Arrow IPC files are read memory-mapped. Parquet/Arrow need pyarrow; csv works
+without it.
+"""
+import os
+
+import pandas as pd
+
+STAGING_FORMATS = ("csv", "parquet", "arrow")
+
+# column -> arrow type name; "dictionary" columns come back as pandas categoricals
+STAGING_SCHEMA = {
+    "PlayerId": "int32",
+    "MundialitoId": "int32",
+    "TeamId": "int32",
+    "OppId": "int32",
+    "Game": "int16",
+    "WL": "dictionary",
+    "Pts": "int8",
+    "Goals": "int16",
+    "Assists": "int16",
+    "CleanSheet": "int8",
+    "GoalsConceded": "int16",
+    "GameId": "int64",
+    "GameIdStr": "string",
+    "PlayerName": "string",
+    "TeamName": "dictionary",
+    "TeamAbbr": "dictionary",
+    "OppName": "dictionary",
+    "OppAbbr": "dictionary",
+    "IsNewPlayer": "bool",
+    "IsNewTeam": "bool",
+    "IsMVP": "bool",
+    "IsGoldenBoot": "bool",
+    "IsPlaymaker": "bool",
+}
+
+# pandas dtypes of the staging columns, applied when staging is built and whenever
+# it is read back (any format): repeated strings as categoricals, the rest as above
+STAGING_DTYPES = {
+    column: "category" if type_name in ("dictionary", "string") else type_name
+    for column, type_name in STAGING_SCHEMA.items()
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("parquet/arrow staging needs pyarrow (pip install pyarrow), or use stagingFormat csv") from e
+
+    return pyarrow
+
+
+def staging_format(path):
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+
+    if ext not in STAGING_FORMATS:
+        raise ValueError(f"Unknown staging format '{ext}' for {path}, expected one of {STAGING_FORMATS}")
+
+    return ext
+
+
+def to_arrow(df, dictionaries=None):
+    """
+    Staging DataFrame -> pyarrow Table with STAGING_SCHEMA (overflowing casts raise).
+    dictionaries maps a dictionary column to a fixed value list, so chunks written
+    to one file share the same dictionary.
+    """
+    pa = _pyarrow()
+
+    arrays, fields = [], []
+
+    for column, type_name in STAGING_SCHEMA.items():
+        series = df[column]
+
+        if type_name == "dictionary" and dictionaries and column in dictionaries:
+            values = list(dictionaries[column])
+            codes = pd.Categorical(series.astype(str), categories=values).codes
+
+            if (codes < 0).any():
+                raise ValueError(f"{column} has values missing from its dictionary")
+
+            arr = pa.DictionaryArray.from_arrays(
+                pa.array(codes, type=pa.int32()), pa.array(values, type=pa.string())
+            )
+        elif type_name == "dictionary":
+            arr = pa.array(series.astype(str), type=pa.string()).dictionary_encode()
+        elif type_name == "string":
+            arr = pa.array(series.astype(str), type=pa.string())
+        else:
+            arr = pa.array(series, from_pandas=True).cast(pa.type_for_alias(type_name))
+
+        arrays.append(arr)
+        fields.append(pa.field(column, arr.type, nullable=False))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_staging(df, path):
+    fmt = staging_format(path)
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+
+    pa = _pyarrow()
+    table = to_arrow(df)
+
+    if fmt == "parquet":
+        pa.parquet.write_table(table, path)
+    else:
+        # uncompressed so the importer can map it straight into memory
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class StagingWriter:
+    """
+    Append staging chunks to one file of any staging format. For parquet/arrow,
+    pass dictionaries (see to_arrow) covering the values of every chunk.
+    """
+
+    def __init__(self, path, dictionaries=None):
+        self.path = path
+        self.fmt = staging_format(path)
+        self.dictionaries = dictionaries
+        self.rows = 0
+        self._sink = None
+        self._writer = None
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(self.path, index=False, mode="w" if self.rows == 0 else "a", header=self.rows == 0)
+        else:
+            pa = _pyarrow()
+            table = to_arrow(df, self.dictionaries)
+
+            if self._writer is None:
+                if self.fmt == "parquet":
+                    self._writer = pa.parquet.ParquetWriter(self.path, table.schema)
+                else:
+                    self._sink = pa.OSFile(self.path, "wb")
+                    self._writer = pa.ipc.new_file(self._sink, table.schema)
+
+            self._writer.write_table(table)
+
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def apply_staging_dtypes(df):
+    """Cast df's staging columns to STAGING_DTYPES; missing columns are left to check_staging."""
+    return df.astype({c: t for c, t in STAGING_DTYPES.items() if c in df.columns and df[c].dtype != t})
+
+
+def read_staging_frame(path):
+    fmt = staging_format(path)
+
+    if fmt == "csv":
+        return pd.read_csv(path, dtype=STAGING_DTYPES)
+
+    pa = _pyarrow()
+
+    if fmt == "parquet":
+        df = pa.parquet.read_table(path, memory_map=True).to_pandas()
+    else:
+        with pa.memory_map(path, "r") as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+
+    return apply_staging_dtypes(df)
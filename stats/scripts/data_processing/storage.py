@@ -0,0 +1,272 @@
+"""
+Database backends for the pipeline.
+
+Everything the scripts do goes through a Storage: it hands out cursors, owns the
+transaction, and covers the few statements that differ between SQL Server and
+SQLite (IDENTITY_INSERT, ISNULL/COALESCE, schema setup, load and temp tables). SQL Server is the
+production backend; SQLite mirrors database/schema.sql so the pipeline, tests
+and benchmarks run on any machine. Pick one with "storage" in config.json.
+"""
+import abc
+import os
+import sqlite3
+
+from instrumentation import count_round_trip
+
+SQLITE_SCHEMA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "database", "schema_sqlite.sql"
+)
+
+
+class CountingCursor:
+    """Cursor proxy that counts execute/executemany calls as DB round trips."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args):
+        count_round_trip()
+        self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        count_round_trip()
+        self._cursor.executemany(*args)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class Storage(abc.ABC):
+    dialect = None
+    # identifies the database, so caches built from it can tell when they point elsewhere
+    source = None
+    # SQL type of each bulk_writer column kind, for the tables the pipeline creates itself
+    column_types = {}
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return CountingCursor(self.conn.cursor())
+
+    def begin(self):
+        """Make sure the following statements run in one manual-commit transaction."""
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+    def identity_insert(self, cursor, table, on):
+        """Allow explicit values in table's identity column (SQL Server only needs this)."""
+
+    @abc.abstractmethod
+    def max_id(self, cursor, table, column):
+        """Largest value in table's column, 0 when the table is empty."""
+
+    def ensure_schema(self):
+        """Create the pipeline's tables if the backend manages its own schema."""
+
+    @abc.abstractmethod
+    def open_loader(self, slot):
+        """Another connection, numbered slot, that fills load tables (see concurrent_import.py)."""
+
+    @abc.abstractmethod
+    def ensure_load_table(self, cursor, table, columns):
+        """Create table's constraint-free load table if missing; columns are (name, kind) pairs."""
+
+    def load_table(self, table):
+        """Name of table's load table on a loader connection."""
+        return f"{table}_Load"
+
+    def attach_loaders(self, slots):
+        """Make the loaders' load tables visible to this connection; call outside a transaction."""
+
+    def detach_loaders(self):
+        """Undo attach_loaders."""
+
+    def load_sources(self, table, slots):
+        """The load tables the loaders in slots filled for table, as seen from this connection."""
+        return [self.load_table(table)]
+
+    @abc.abstractmethod
+    def create_temp_table(self, cursor, name, columns):
+        """
+        (Re)create a connection-private table, dropped with the connection; columns
+        are (name, kind) pairs. Returns the name to use for it in statements.
+        """
+
+    def drop_temp_table(self, cursor, name):
+        cursor.execute(f"DROP TABLE {name}")
+
+    def concat(self, parts):
+        """SQL expression joining the string expressions in parts."""
+        return " || ".join(parts)
+
+    @abc.abstractmethod
+    def delete_chunk(self, cursor, table, where, params, rows):
+        """Delete at most rows rows of table matching where. Returns the number deleted."""
+
+    def is_retryable(self, error):
+        """True for errors worth retrying the transaction for (deadlock victim, lock timeout)."""
+        return False
+
+
+class SqlServerStorage(Storage):
+    dialect = "sqlserver"
+    # int is bigint: packed GameIds (game_ids.py) pass through load and temp tables
+    column_types = {int: "bigint", float: "float", str: "nvarchar(100)", bool: "bit"}
+
+    def __init__(self, config):
+        import pyodbc
+
+        conn_str = (
+            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"SERVER={config['server']};"
+            f"DATABASE={config['database']};"
+            "Trusted_Connection=yes;"
+        )
+
+        super().__init__(pyodbc.connect(conn_str))
+        self.config = config
+        self.source = f"sqlserver:{config['server']}/{config['database']}"
+
+    def cursor(self):
+        cursor = self.conn.cursor()
+        cursor.fast_executemany = True
+        return CountingCursor(cursor)
+
+    def begin(self):
+        self.conn.autocommit = False
+
+    def identity_insert(self, cursor, table, on):
+        cursor.execute(f"SET IDENTITY_INSERT {table} {'ON' if on else 'OFF'};")
+
+    def concat(self, parts):
+        return f"CONCAT({', '.join(parts)})"
+
+    def delete_chunk(self, cursor, table, where, params, rows):
+        cursor.execute(f"DELETE TOP ({int(rows)}) FROM {table} WHERE {where}", params)
+        return cursor.rowcount
+
+    def is_retryable(self, error):
+        import pyodbc
+
+        # 40001: chosen as deadlock victim; HYT00: lock/query timeout
+        return isinstance(error, pyodbc.Error) and bool(error.args) and error.args[0] in ("40001", "HYT00")
+
+    def max_id(self, cursor, table, column):
+        cursor.execute(f"SELECT ISNULL(MAX({column}), 0) FROM {table};")
+        return cursor.fetchone()[0]
+
+    def open_loader(self, slot):
+        # load tables live in the same database; each loader is just another connection
+        return SqlServerStorage(self.config)
+
+    def ensure_load_table(self, cursor, table, columns):
+        name = self.load_table(table)
+        cursor.execute(
+            f"IF OBJECT_ID(N'[dbo].[{name}]', N'U') IS NULL "
+            f"CREATE TABLE [dbo].[{name}] ({', '.join(f'[{c}] {self.column_types[kind]} NULL' for c, kind in columns)})"
+        )
+
+    def create_temp_table(self, cursor, name, columns):
+        cursor.execute(
+            f"IF OBJECT_ID(N'tempdb..#{name}') IS NOT NULL DROP TABLE #{name}; "
+            f"CREATE TABLE #{name} ({', '.join(f'[{c}] {self.column_types[kind]} NULL' for c, kind in columns)})"
+        )
+        return f"#{name}"
+
+
+class SqliteStorage(Storage):
+    dialect = "sqlite"
+    column_types = {int: "INTEGER", float: "REAL", str: "TEXT", bool: "INTEGER"}
+
+    def __init__(self, path):
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        super().__init__(conn)
+        self.path = path
+        self.source = f"sqlite:{os.path.abspath(path)}"
+        self.attached = set()
+
+    def begin(self):
+        # sqlite3 only opens a transaction by itself before DML, so DDL (schema
+        # migrations, temp tables) would otherwise autocommit statement by statement
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+
+    def max_id(self, cursor, table, column):
+        cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table};")
+        return cursor.fetchone()[0]
+
+    def delete_chunk(self, cursor, table, where, params, rows):
+        cursor.execute(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT {int(rows)})", params
+        )
+        return cursor.rowcount
+
+    def is_retryable(self, error):
+        # another connection holds the write lock past the busy timeout
+        return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+    def ensure_schema(self):
+        from schema_migrations import migrate
+
+        with open(SQLITE_SCHEMA, "r") as f:
+            self.conn.executescript(f.read())
+
+        migrate(self)
+
+    # SQLite allows one writer per database file, so every loader gets a file of
+    # its own next to the database, ATTACHed here for the final INSERT ... SELECT
+
+    def loader_path(self, slot):
+        return f"{self.path}.load-{slot}"
+
+    def open_loader(self, slot):
+        return SqliteStorage(self.loader_path(slot))
+
+    def ensure_load_table(self, cursor, table, columns):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.load_table(table)} "
+            f"({', '.join(f'{c} {self.column_types[kind]}' for c, kind in columns)})"
+        )
+
+    def create_temp_table(self, cursor, name, columns):
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{name}")
+        cursor.execute(f"CREATE TEMP TABLE {name} ({', '.join(f'{c} {self.column_types[kind]}' for c, kind in columns)})")
+        return f"temp.{name}"
+
+    def attach_loaders(self, slots):
+        for slot in slots:
+            self.conn.execute(f"ATTACH DATABASE ? AS load_{slot}", (self.loader_path(slot),))
+            self.attached.add(slot)
+
+    def detach_loaders(self):
+        for slot in sorted(self.attached):
+            self.conn.execute(f"DETACH DATABASE load_{slot}")
+            self.attached.discard(slot)
+
+    def load_sources(self, table, slots):
+        return [f"load_{slot}.{self.load_table(table)}" for slot in slots]
+
+
+def open_storage(config):
+    backend = config.get("storage", "sqlserver")
+
+    if backend == "sqlserver":
+        return SqlServerStorage(config)
+
+    if backend == "sqlite":
+        storage = SqliteStorage(config.get("sqlitePath", "../../mundialito.db"))
+        storage.ensure_schema()
+        return storage
+
+    raise ValueError(f"Unknown storage backend '{backend}', expected 'sqlserver' or 'sqlite'")
@@ -0,0 +1,194 @@
+"""
+Chunked staging for tournament files too large to hold in memory.
+
+Enabled with config "streamChunkRows" (rows per chunk; 0 or absent reads the
+whole file at once as before). The input is read twice, chunk by chunk, with
+csv_creator_current.INPUT_DTYPES (categories for names, small ints for counts):
+
+    1. validate each chunk and keep only small accumulators: per (game, team)
+       goal totals for check_goals, per (player, team) goals/assists/MVP for
+       the awards, and the distinct names in first-appearance order
+    2. resolve names and ids from those accumulators, then re-read the file and
+       append each chunk's staging rows to the staging file
+
+Peak memory is one chunk plus the accumulators, whatever the file size. Rows
+are sorted by (TeamId, PlayerName) within each chunk only; the importer does
+not depend on the order.
+
+csv_creator_current.py stages the configured tournament this way, and
+batch_current.py (and so ingest_daemon.py) every tournament, pass 1 and pass 2
+in its worker processes with --workers; the batch then reads each staging file
+back for the import, which takes a tournament's staging rows whole.
+"""
+import os
+from collections import Counter
+
+import pandas as pd
+
+from csv_creator_current import (
+    EXPECTED_COLUMNS, INPUT_DTYPES, add_row_columns, assign_name_ids, build_staging, compute_awards,
+    load_existing_ids, lookup_existing_ids, register_new_ids,
+)
+from instrumentation import stage
+from name_matching import DEFAULT_SIMILARITY, SnapshotRegistry, load_aliases, print_report, resolve_names
+from staging_format import StagingWriter
+from validation import check_goals
+
+NAME_COLUMNS = ["Name", "TeamName", "TeamAbbr", "OppName", "OppAbbr"]
+
+
+def check_header(file_path):
+    header = pd.read_csv(file_path, nrows=0, index_col=False)
+    columns = header.columns[~header.columns.str.startswith("Unnamed")]
+
+    assert list(columns) == EXPECTED_COLUMNS
+
+
+def read_chunks(file_path, chunk_rows):
+    for chunk in pd.read_csv(
+        file_path, usecols=EXPECTED_COLUMNS, dtype=INPUT_DTYPES, chunksize=chunk_rows, index_col=False
+    ):
+        # names are matched as plain strings; the categories differ from chunk to chunk
+        for column in NAME_COLUMNS + ["WL"]:
+            chunk[column] = chunk[column].astype(str)
+        yield chunk
+
+
+def summarize(file_path, chunk_rows):
+    """Pass 1: validate every chunk and collect what ids, names and awards need."""
+    goal_parts, player_parts = [], []
+    players, teams = {}, {}
+    player_counts, team_counts = Counter(), Counter()
+    games = set()
+    rows = 0
+
+    check_header(file_path)
+
+    for chunk in read_chunks(file_path, chunk_rows):
+        chunk = add_row_columns(chunk)
+        rows += len(chunk)
+
+        goal_parts.append(
+            chunk.groupby(["GameIdStr", "TeamAbbr"], as_index=False, sort=False)
+                 .agg(OppAbbr=("OppAbbr", "first"), Goals=("Goals", "sum"), GoalsConceded=("GoalsConceded", "max"))
+        )
+        player_parts.append(
+            chunk.groupby(["Name", "TeamAbbr"], as_index=False, sort=False)
+                 .agg(Goals=("Goals", "sum"), Assists=("Assists", "sum"), MVP=("MVP", "max"))
+        )
+
+        players.update(dict.fromkeys(chunk["Name"].unique()))
+        teams.update(dict.fromkeys(chunk[["TeamName", "TeamAbbr"]].drop_duplicates().itertuples(index=False, name=None)))
+        player_counts.update(chunk["Name"].value_counts().to_dict())
+        team_counts.update(chunk["TeamName"].value_counts().to_dict())
+        team_counts.update(chunk["OppName"].value_counts().to_dict())
+        games.update(chunk["GameIdStr"].unique())
+
+        # partials from earlier chunks are folded together as they arrive
+        if len(goal_parts) > 1:
+            goal_parts = [pd.concat(goal_parts).groupby(["GameIdStr", "TeamAbbr"], as_index=False, sort=False).agg(
+                OppAbbr=("OppAbbr", "first"), Goals=("Goals", "sum"), GoalsConceded=("GoalsConceded", "max")
+            )]
+            player_parts = [pd.concat(player_parts).groupby(["Name", "TeamAbbr"], as_index=False, sort=False).agg(
+                Goals=("Goals", "sum"), Assists=("Assists", "sum"), MVP=("MVP", "max")
+            )]
+
+    return {
+        "rows": rows,
+        "goals": goal_parts[0],
+        "players": player_parts[0],
+        "player_names": list(players),
+        "teams": list(teams),
+        "player_counts": player_counts,
+        "team_counts": team_counts,
+        "games": len(games),
+    }
+
+
+def prepare_summary(file_path, chunk_rows):
+    """Pass 1 and the goals check; database-free, so batch_current runs it in worker processes."""
+    with stage("summarize", file=os.path.basename(file_path), chunk_rows=chunk_rows) as s:
+        summary = summarize(file_path, chunk_rows)
+        s.rows = summary["rows"]
+
+    with stage("validate", rows=len(summary["goals"])):
+        check_goals(summary["goals"])
+
+    return summary
+
+
+def resolve_summary(storage, index, config, summary, mund_id, existing=None):
+    """
+    resolve_file + assign_ids on the pass-1 accumulators. Pass the running snapshot
+    as existing to fold another file into it. Returns (player_map, team_map, ids, awards, existing).
+    """
+    if index is None and existing is None:
+        existing = load_existing_ids(storage)
+
+    registry = index if index is not None else SnapshotRegistry(existing)
+
+    player_map, team_map, report = resolve_names(
+        summary["player_counts"], summary["team_counts"], mund_id, registry,
+        load_aliases(config.get("aliasesPath")), config.get("duplicateSimilarity", DEFAULT_SIMILARITY)
+    )
+    print_report(report)
+
+    awards = compute_awards(summary["players"].assign(Name=summary["players"]["Name"].map(player_map)))
+
+    names = list(dict.fromkeys(player_map[n] for n in summary["player_names"]))
+    teams = list(dict.fromkeys((team_map[t], a) for t, a in summary["teams"]))
+
+    if index is not None:
+        existing = lookup_existing_ids(index, pd.DataFrame({"Name": names}), mund_id, existing)
+
+    ids = assign_name_ids(names, teams, mund_id, existing)
+    print(f"Total games in staging for Mundialito {mund_id}: {summary['games']}")
+
+    return player_map, team_map, ids, awards, existing
+
+
+def write_streamed(file_path, output_path, mund_id, chunk_rows, player_map, team_map, ids, awards):
+    """Pass 2, database-free: re-read file_path and append each chunk's staging rows. Returns the rows written."""
+    # fixed dictionaries so every parquet/arrow batch shares them
+    team_names = sorted({name for name, _, _ in ids["team_key_to_id"]})
+    team_abbrs = sorted({abbr for _, abbr, _ in ids["team_key_to_id"]})
+    dictionaries = {
+        "WL": ["D", "L", "W"],
+        "TeamName": team_names,
+        "OppName": team_names,
+        "TeamAbbr": team_abbrs,
+        "OppAbbr": team_abbrs,
+    }
+
+    with stage("write_staging", mundialito_id=mund_id) as s:
+        with StagingWriter(output_path, dictionaries) as writer:
+            for chunk in read_chunks(file_path, chunk_rows):
+                chunk = chunk.assign(
+                    Name=chunk["Name"].map(player_map),
+                    TeamName=chunk["TeamName"].map(team_map),
+                    OppName=chunk["OppName"].map(team_map),
+                )
+                writer.write(build_staging(add_row_columns(chunk), mund_id, ids, awards))
+
+        s.rows = writer.rows
+
+    return writer.rows
+
+
+def stream_staging(storage, index, config, file_path, output_path, mund_id, chunk_rows, existing=None):
+    """
+    Stage file_path into output_path chunk by chunk, against a synced index if given.
+    existing is threaded as in resolve_file, with this file's new ids registered.
+    Returns (rows written, existing).
+    """
+    summary = prepare_summary(file_path, chunk_rows)
+
+    with stage("load_ids", mundialito_id=mund_id):
+        player_map, team_map, ids, awards, existing = resolve_summary(
+            storage, index, config, summary, mund_id, existing
+        )
+        register_new_ids(existing, ids)
+
+    rows = write_streamed(file_path, output_path, mund_id, chunk_rows, player_map, team_map, ids, awards)
+
+    return rows, existing
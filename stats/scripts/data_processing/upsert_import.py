@@ -0,0 +1,202 @@
+"""
+Diff-based import: only write the rows that changed for a tournament.
+
+import_staging deletes every per-tournament row and inserts it again. Here the
+derived tables are compared with what is stored for the MundialitoId on each
+table's natural key, and only the inserts, updates and deletes that differ are
+sent, in the same single transaction.
+
+benchmarks/bench_import.py measures how much shorter that holds the write lock
+than import_staging when a stored tournament is imported again.
+"""
+import pandas as pd
+
+from bulk_writer import DEFAULT_CHUNK_SIZE
+from career_stats import update_career_stats
+from instrumentation import stage
+from leaderboard import leaderboard_frame, replace_leaderboard
+from manifest import record_import, staging_hash
+from import_data_current import (
+    TABLE_COLUMNS, TABLE_KEYS, check_staging, insert_mundialito,
+    insert_new_players_and_teams, derive_tables, insert_table
+)
+
+
+def normalize(frame, table):
+    """Cast a table's columns to comparable types (bit -> 0/1, ints stay nullable)."""
+    out = pd.DataFrame(index=frame.index)
+
+    for column, kind in TABLE_COLUMNS[table]:
+        series = frame[column]
+
+        if kind is str:
+            out[column] = series.astype(str)
+        else:
+            out[column] = series.astype(float).astype("Int64")
+
+    return out
+
+
+def fetch_stored(cursor, table, mundialito_id):
+    columns = [c for c, _ in TABLE_COLUMNS[table]]
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE MundialitoId = ?", (mundialito_id,))
+
+    return pd.DataFrame.from_records([tuple(r) for r in cursor.fetchall()], columns=columns)
+
+
+def diff_table(table, new, stored):
+    """Split into rows to insert, rows to update and keys to delete."""
+    keys = TABLE_KEYS[table]
+    values = [c for c, _ in TABLE_COLUMNS[table] if c not in keys]
+
+    new = normalize(new, table)
+    stored = normalize(stored, table)
+
+    merged = new.merge(stored, on=keys, how="outer", suffixes=("", "_stored"), indicator=True)
+
+    inserts = merged.loc[merged["_merge"] == "left_only", list(new.columns)]
+    deletes = merged.loc[merged["_merge"] == "right_only", keys]
+
+    both = merged[merged["_merge"] == "both"]
+    changed = pd.Series(False, index=both.index)
+    for c in values:
+        a, b = both[c], both[f"{c}_stored"]
+        changed |= (a != b).fillna(a.isna() != b.isna()).astype(bool)
+
+    updates = both.loc[changed, list(new.columns)]
+
+    return inserts, updates, deletes, len(both) - len(updates)
+
+
+def execute_chunked(cursor, sql, params, chunk_size):
+    for i in range(0, len(params), chunk_size):
+        cursor.executemany(sql, params[i:i + chunk_size])
+
+
+def key_params(frame, columns):
+    return list(zip(*[
+        frame[c].astype(str).tolist() if kind is str else frame[c].astype("int64").tolist()
+        for c, kind in columns
+    ]))
+
+
+def apply_updates(cursor, table, updates, chunk_size):
+    keys = TABLE_KEYS[table]
+    spec = dict(TABLE_COLUMNS[table])
+    values = [c for c in spec if c not in keys]
+
+    sql = (
+        f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in values)} "
+        f"WHERE {' AND '.join(f'{k} = ?' for k in keys)}"
+    )
+
+    params = key_params(updates, [(c, spec[c]) for c in values + keys])
+    execute_chunked(cursor, sql, params, chunk_size)
+
+
+def apply_deletes(cursor, table, deletes, chunk_size):
+    keys = TABLE_KEYS[table]
+    spec = dict(TABLE_COLUMNS[table])
+
+    sql = f"DELETE FROM {table} WHERE {' AND '.join(f'{k} = ?' for k in keys)}"
+
+    params = key_params(deletes, [(k, spec[k]) for k in keys])
+    execute_chunked(cursor, sql, params, chunk_size)
+
+
+def upsert_staging(storage, df, mund_date, chunk_size=DEFAULT_CHUNK_SIZE, input_key=None, staging_key=None):
+    """
+    Import one tournament by diff. Returns {table: {inserted, updated, deleted,
+    unchanged, stored, staged}} and prints the change summary. input_key and
+    staging_key are recorded in ImportManifest as in import_staging.
+    """
+    cursor = storage.cursor()
+
+    mundialito_id = check_staging(df)
+    print(f"Upserting for MundialitoId = {mundialito_id}")
+
+    if staging_key is None:
+        staging_key = staging_hash(df)
+
+    if df.isna().to_numpy().any():
+        df = df.where(pd.notnull(df), None)
+
+    summary = {}
+
+    try:
+        storage.begin()
+
+        with stage("upsert.derive", rows=len(df), mundialito_id=mundialito_id):
+            tables = derive_tables(df)
+
+        insert_mundialito(storage, cursor, mundialito_id, mund_date)
+        insert_new_players_and_teams(storage, cursor, df, chunk_size)
+
+        diffs = {}
+        for table, frame in tables.items():
+            with stage(f"upsert.diff.{table}", rows=len(frame), mundialito_id=mundialito_id):
+                stored = fetch_stored(cursor, table, mundialito_id)
+                diffs[table] = diff_table(table, frame, stored)
+
+            inserts, updates, deletes, unchanged = diffs[table]
+            summary[table] = {
+                "inserted": len(inserts),
+                "updated": len(updates),
+                "deleted": len(deletes),
+                "unchanged": unchanged,
+                "stored": len(stored),
+                "staged": len(frame),
+            }
+
+        touched = sum(s["inserted"] + s["updated"] + s["deleted"] for s in summary.values())
+
+        with stage("upsert.write", rows=touched, mundialito_id=mundialito_id) as write:
+            update_career_stats(cursor, mundialito_id, df, tables, chunk_size)
+
+            # children first for deletes, parents first for inserts
+            for table in reversed(list(tables)):
+                _, _, deletes, _ = diffs[table]
+                if not deletes.empty:
+                    apply_deletes(cursor, table, deletes, chunk_size)
+
+            for table in tables:
+                inserts, updates, _, _ = diffs[table]
+                if not updates.empty:
+                    apply_updates(cursor, table, updates, chunk_size)
+                if not inserts.empty:
+                    insert_table(cursor, table, inserts, chunk_size)
+
+            # ranks shift with any change, so the leaderboard is rewritten whole, and only then
+            if touched:
+                replace_leaderboard(cursor, mundialito_id, leaderboard_frame(df, tables), chunk_size)
+
+            record_import(cursor, mundialito_id, input_key, staging_key)
+            storage.commit()
+
+    except Exception:
+        print("ERROR during upsert, rolling back...")
+        storage.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    print_summary(summary, write.seconds)
+
+    return summary
+
+
+def print_summary(summary, write_seconds):
+    print(f"\n{'Table':<24}{'insert':>8}{'update':>8}{'delete':>8}{'same':>8}")
+
+    touched = reload_rows = 0
+
+    for table, s in summary.items():
+        print(f"{table:<24}{s['inserted']:>8}{s['updated']:>8}{s['deleted']:>8}{s['unchanged']:>8}")
+        touched += s["inserted"] + s["updated"] + s["deleted"]
+        reload_rows += s["stored"] + s["staged"]
+
+    print(
+        f"\nRows written: {touched} of the {reload_rows} rows a delete-and-reinsert deletes and writes."
+        f"\nWrite phase took {write_seconds:.3f}s (bench_import.py times it against import_staging)."
+    )
@@ -0,0 +1,80 @@
+import pandas as pd
+
+REPORT_COLUMNS = ["GameIdStr", "TeamAbbr", "OppAbbr", "Scored", "OppConceded", "Issue"]
+
+
+class GoalsValidationError(ValueError):
+    """Raised with every inconsistent game at once; the rows are in .report."""
+
+    def __init__(self, report):
+        self.report = report
+        lines = [f"{len(report)} goal consistency problem(s):"]
+        lines += [f"  {describe(row)}" for row in report.itertuples(index=False)]
+        super().__init__("\n".join(lines))
+
+
+def describe(row):
+    if row.Issue == "team_count":
+        return f"Game {row.GameIdStr} does not have exactly 2 teams (found {row.TeamAbbr})"
+
+    return (
+        f"Mismatch in game {row.GameIdStr}: {row.TeamAbbr} scored {int(row.Scored)} "
+        f"but {row.OppAbbr} conceded {int(row.OppConceded)}"
+    )
+
+
+def goals_report(df):
+    """
+    Check "goals scored == goals conceded by the opponent" for every game in one pass.
+
+    Player rows are summed to one row per (game, team): Goals summed, GoalsConceded
+    maxed (every player on a team carries the same value). Each team row is then
+    joined to its opponent's row on (GameIdStr, OppAbbr), so a single comparison
+    covers both directions of every game. Returns an empty frame when all is well.
+    """
+    team_totals = (
+        df.groupby(["GameIdStr", "TeamAbbr"], as_index=False, observed=True)
+          .agg(
+              OppAbbr=("OppAbbr", "first"),
+              Scored=("Goals", "sum"),
+              Conceded=("GoalsConceded", "max"),
+          )
+    )
+
+    teams_per_game = team_totals.groupby("GameIdStr")["TeamAbbr"].transform("size")
+    paired = team_totals[teams_per_game == 2]
+
+    # only the games being reported get their team list joined into a string
+    wrong_count = (
+        team_totals[teams_per_game != 2]
+        .astype({"TeamAbbr": str})
+        .groupby("GameIdStr", as_index=False)
+        .agg(TeamAbbr=("TeamAbbr", list))
+    )
+    wrong_count["TeamAbbr"] = wrong_count["TeamAbbr"].str.join(", ")
+    wrong_count["Issue"] = "team_count"
+
+    opponents = paired[["GameIdStr", "TeamAbbr", "Conceded"]].rename(
+        columns={"TeamAbbr": "OppAbbr", "Conceded": "OppConceded"}
+    )
+
+    joined = paired.merge(opponents, on=["GameIdStr", "OppAbbr"], how="left")
+    mismatched = joined[joined["Scored"] != joined["OppConceded"]].assign(Issue="goals")
+
+    problems = [p.reindex(columns=REPORT_COLUMNS) for p in (wrong_count, mismatched) if not p.empty]
+
+    if not problems:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    report = pd.concat(problems, ignore_index=True)
+
+    return report.sort_values(["GameIdStr", "TeamAbbr"]).reset_index(drop=True)
+
+
+def check_goals(df):
+    report = goals_report(df)
+
+    if not report.empty:
+        raise GoalsValidationError(report)
+
+    return report
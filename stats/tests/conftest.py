@@ -0,0 +1,83 @@
+"""
+Shared fixtures: every test runs the pipeline against a fresh SqliteStorage in
+tmp_path, staging from the tournament files in stats/input_data.
+
+Run from the repository root:
+    python -m pytest stats/tests
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+STATS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+INPUT_DIR = os.path.join(STATS_DIR, "input_data")
+
+sys.path.insert(0, os.path.join(STATS_DIR, "scripts", "data_processing"))
+
+from common import find_tournament_file, parse_tournament_file  # noqa: E402
+from csv_creator_current import stage_tournament, staging_path  # noqa: E402
+from import_data_current import read_staging  # noqa: E402
+from storage import open_storage  # noqa: E402
+
+# columns that record when, not what
+TIMESTAMP_COLUMNS = {"ImportManifest": "ImportedAt", "SchemaVersion": "AppliedAt", "ImportCheckpoint": "UpdatedAt"}
+
+
+def make_config(tmp_path, name="db"):
+    out_path = tmp_path / f"{name}_out"
+    out_path.mkdir(exist_ok=True)
+
+    return {
+        "storage": "sqlite",
+        "sqlitePath": str(tmp_path / f"{name}.sqlite"),
+        "inputPath": INPUT_DIR,
+        "outputPath": str(out_path),
+        "aliasesPath": os.path.join(INPUT_DIR, "aliases.csv"),
+        "stagingFormat": "csv",
+    }
+
+
+@pytest.fixture
+def config(tmp_path):
+    return make_config(tmp_path)
+
+
+@pytest.fixture
+def storage(config):
+    storage = open_storage(config)
+    yield storage
+    storage.close()
+
+
+def stage_file(storage, config, mund_id):
+    """Stage input_data's tournament mund_id against storage; returns (staging rows, tournament date)."""
+    file_path = find_tournament_file(config["inputPath"], mund_id)
+    output = staging_path(file_path, config["outputPath"], config["stagingFormat"])
+
+    stage_tournament(storage, None, config, file_path, output, mund_id)
+    _, mund_date = parse_tournament_file(file_path)
+
+    return read_staging(output), mund_date
+
+
+def dump(storage, skip=()):
+    """{table: sorted rows} of every table in the database, timestamp columns left out."""
+    conn = sqlite3.connect(storage.path)
+
+    try:
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        result = {}
+
+        for table in tables:
+            if table in skip:
+                continue
+
+            columns = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+            kept = [c for c in columns if c != TIMESTAMP_COLUMNS.get(table)]
+            result[table] = sorted(conn.execute(f"SELECT {', '.join(kept)} FROM {table}").fetchall(), key=repr)
+
+        return result
+    finally:
+        conn.close()
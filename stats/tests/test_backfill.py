@@ -0,0 +1,95 @@
+import pytest
+
+import backfill_import
+from backfill_import import backfill_staging, rebuild_after_backfill
+from conftest import dump, make_config, stage_file
+from import_data_current import import_staging
+from manifest import staging_hash
+from storage import open_storage
+
+CHUNK_ROWS = 40
+
+
+@pytest.fixture
+def reference(tmp_path, config):
+    """The tournament imported in one transaction, to compare the backfill against."""
+    storage = open_storage(make_config(tmp_path, "reference"))
+    df, mund_date = stage_file(storage, config, 4)
+    import_staging(storage, df, mund_date)
+    yield storage
+    storage.close()
+
+
+def checkpoints(storage):
+    cursor = storage.cursor()
+    try:
+        cursor.execute("SELECT TableName, RowsDone FROM ImportCheckpoint WHERE MundialitoId = 4")
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def test_backfill_resumes_from_its_checkpoints(storage, config, reference, monkeypatch, capsys):
+    df, mund_date = stage_file(storage, config, 4)
+
+    insert_table = backfill_import.insert_table
+    written = []
+
+    def failing_insert(cursor, table, chunk, chunk_size):
+        if table == "PlayerGameStats" and len(written) == 3:
+            raise RuntimeError("connection lost")
+        insert_table(cursor, table, chunk, chunk_size)
+        written.append(table)
+
+    monkeypatch.setattr(backfill_import, "insert_table", failing_insert)
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        backfill_staging(storage, df, mund_date, chunk_rows=CHUNK_ROWS, retries=0)
+
+    done = checkpoints(storage)
+    assert done["Games"] > 0
+    assert 0 < done["PlayerGameStats"] < len(df)
+    assert dump(storage)["ImportManifest"] == []
+
+    monkeypatch.setattr(backfill_import, "insert_table", insert_table)
+    capsys.readouterr()
+
+    backfill_staging(storage, df, mund_date, chunk_rows=CHUNK_ROWS, retries=0)
+    rebuild_after_backfill(storage)
+
+    assert "Resuming the backfill of MundialitoId = 4" in capsys.readouterr().out
+    assert checkpoints(storage) == {}
+    assert dump(storage) == dump(reference)
+
+
+def test_other_staging_data_discards_the_checkpoints(storage, config, monkeypatch, capsys):
+    df, mund_date = stage_file(storage, config, 4)
+
+    def failing_insert(cursor, table, chunk, chunk_size):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(backfill_import, "insert_table", failing_insert)
+
+    with pytest.raises(RuntimeError):
+        backfill_staging(storage, df, mund_date, chunk_rows=CHUNK_ROWS, retries=0)
+
+    monkeypatch.undo()
+
+    # the input was corrected before the backfill was run again
+    restaged, _ = stage_file(storage, config, 4)
+    restaged["Assists"] += 1
+    capsys.readouterr()
+
+    backfill_staging(storage, restaged, mund_date, chunk_rows=CHUNK_ROWS, retries=0)
+
+    assert "Discarding stale checkpoints" in capsys.readouterr().out
+    assert checkpoints(storage) == {}
+
+    cursor = storage.cursor()
+    try:
+        cursor.execute("SELECT SUM(Assists) FROM PlayerGameStats WHERE MundialitoId = 4")
+        assert cursor.fetchone()[0] == df["Assists"].sum() + len(df)
+        cursor.execute("SELECT StagingHash FROM ImportManifest WHERE MundialitoId = 4")
+        assert cursor.fetchone()[0] == staging_hash(restaged)
+    finally:
+        cursor.close()
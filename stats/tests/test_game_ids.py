@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from game_ids import FIELDS, game_code, pack_game_ids, unpack_game_id
+
+LIMITS = {name: (1 << bits) - 1 for name, bits in FIELDS}
+
+
+def test_pack_unpack_round_trip():
+    rng = np.random.default_rng(0)
+    team_a = rng.integers(0, LIMITS["TeamAId"] + 1, size=500)
+    team_b = rng.integers(0, LIMITS["TeamBId"] + 1, size=500)
+    game = rng.integers(0, LIMITS["Game"] + 1, size=500)
+
+    for mundialito_id in (0, 4, LIMITS["MundialitoId"]):
+        packed = pack_game_ids(mundialito_id, team_a, team_b, game)
+
+        assert packed.dtype == np.int64
+        assert len(np.unique(packed)) == len(set(zip(team_a, team_b, game)))
+
+        for game_id, a, b, g in zip(packed, team_a, team_b, game):
+            assert unpack_game_id(game_id) == {"MundialitoId": mundialito_id, "TeamAId": a, "TeamBId": b, "Game": g}
+
+
+def test_largest_id_is_exact_as_a_float():
+    packed = pack_game_ids(LIMITS["MundialitoId"], [LIMITS["TeamAId"]], [LIMITS["TeamBId"]], [LIMITS["Game"]])
+
+    assert int(packed[0]) < 2 ** 53
+    assert int(float(packed[0])) == int(packed[0])
+
+
+@pytest.mark.parametrize("field, value", [
+    ("MundialitoId", LIMITS["MundialitoId"] + 1),
+    ("TeamAId", LIMITS["TeamAId"] + 1),
+    ("TeamBId", LIMITS["TeamBId"] + 1),
+    ("Game", LIMITS["Game"] + 1),
+    ("Game", -1),
+    ("TeamAId", -1),
+])
+def test_out_of_range_parts_raise(field, value):
+    parts = {"MundialitoId": 1, "TeamAId": [1], "TeamBId": [2], "Game": [1]}
+    parts[field] = value if field == "MundialitoId" else [value]
+
+    with pytest.raises(ValueError, match=field):
+        pack_game_ids(parts["MundialitoId"], parts["TeamAId"], parts["TeamBId"], parts["Game"])
+
+
+def test_empty_input_packs_to_nothing():
+    assert len(pack_game_ids(1, [], [], [])) == 0
+
+
+def test_game_code_is_the_former_text_id():
+    codes = game_code(pd.Series([3, 10]), pd.Series([7, 12]), pd.Series([1, 2]))
+
+    assert list(codes) == ["3-7-1", "10-12-2"]
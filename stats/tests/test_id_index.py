@@ -0,0 +1,73 @@
+import pytest
+
+from conftest import make_config
+from id_index import IdIndex
+from storage import open_storage
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = IdIndex(str(tmp_path / "id_index.db"))
+    yield index
+    index.close()
+
+
+def execute(storage, *statements):
+    cursor = storage.cursor()
+    storage.begin()
+    try:
+        for sql, params in statements:
+            cursor.execute(sql, params)
+        storage.commit()
+    finally:
+        cursor.close()
+
+
+def add_players(storage, *players):
+    execute(storage, *[("INSERT INTO Players (PlayerId, Name) VALUES (?, ?)", p) for p in players])
+
+
+def test_new_players_are_appended(storage, index):
+    add_players(storage, (1, "Ana"), (2, "Bea"))
+    assert index.sync(storage)["players"] == "2 new"
+    assert index.sync(storage)["players"] == "current"
+
+    add_players(storage, (3, "Cris"))
+    assert index.sync(storage)["players"] == "1 new"
+    assert index.lookup_players(["Ana", "Cris", "Dora"]) == {"Ana": 1, "Cris": 3}
+    assert index.max_player_id() == 3
+
+
+def test_a_rename_reloads_the_table(storage, index):
+    add_players(storage, (1, "Ana"), (2, "Bea"))
+    index.sync(storage)
+
+    # same COUNT and MAX(PlayerId): only the change counter tells
+    execute(storage, ("UPDATE Players SET Name = ? WHERE PlayerId = ?", ("Beatriz", 2)))
+
+    assert index.sync(storage)["players"] == "reloaded 2"
+    assert index.lookup_players(["Bea", "Beatriz"]) == {"Beatriz": 2}
+
+
+def test_a_delete_and_insert_reloads_the_table(storage, index):
+    add_players(storage, (1, "Ana"), (2, "Bea"))
+    index.sync(storage)
+
+    execute(storage, ("DELETE FROM Players WHERE PlayerId = ?", (1,)))
+    add_players(storage, (3, "Cris"))
+
+    assert index.sync(storage)["players"] == "reloaded 2"
+    assert index.lookup_players(["Ana", "Bea", "Cris"]) == {"Bea": 2, "Cris": 3}
+
+
+def test_an_index_of_another_database_is_reloaded(tmp_path, storage, index):
+    add_players(storage, (1, "Ana"))
+    index.sync(storage)
+
+    other = open_storage(make_config(tmp_path, "other"))
+    try:
+        add_players(other, (1, "Zoe"))
+        assert index.sync(other)["players"] == "1 new"
+        assert index.lookup_players(["Ana", "Zoe"]) == {"Zoe": 1}
+    finally:
+        other.close()
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from common import find_tournament_file
+from conftest import stage_file
+from game_ids import unpack_game_id
+from import_data_current import import_is_current, import_staging
+from manifest import staging_hash
+
+
+def count(storage, sql, params=()):
+    cursor = storage.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def test_stage_and_import_tournament_4(storage, config):
+    df, mund_date = stage_file(storage, config, 4)
+    raw = pd.read_csv(find_tournament_file(config["inputPath"], 4), index_col=False)
+
+    assert len(df) == len(raw)
+    assert (df["MundialitoId"] == 4).all()
+    # an empty database: everyone is new
+    assert df["IsNewPlayer"].all() and df["IsNewTeam"].all()
+
+    import_staging(storage, df, mund_date, input_key="input", staging_key=staging_hash(df))
+
+    players = df["PlayerId"].nunique()
+    teams = df["TeamId"].nunique()
+    games = df["GameId"].nunique()
+
+    assert count(storage, "SELECT COUNT(*) FROM Players") == players
+    assert count(storage, "SELECT COUNT(*) FROM Teams") == teams
+    assert count(storage, "SELECT COUNT(*) FROM Games WHERE MundialitoId = 4") == games
+    assert count(storage, "SELECT COUNT(*) FROM PlayerGameStats WHERE MundialitoId = 4") == len(df)
+    assert count(storage, "SELECT COUNT(*) FROM PlayerTournamentStats WHERE MundialitoId = 4") == players
+    assert count(storage, "SELECT COUNT(*) FROM TeamTournamentStats WHERE MundialitoId = 4") == teams
+    assert count(storage, "SELECT COUNT(*) FROM PlayerLeaderboard WHERE MundialitoId = 4") == players
+    assert count(storage, "SELECT COUNT(*) FROM PlayerCareerStats") == players
+    assert count(storage, "SELECT SUM(Goals) FROM PlayerTournamentStats") == raw["Goals"].sum()
+
+    cursor = storage.cursor()
+    try:
+        cursor.execute("SELECT GameId, TeamAId, TeamBId, GoalsA, GoalsB FROM Games")
+        stored_games = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for game_id, team_a, team_b, goals_a, goals_b in stored_games:
+        parts = unpack_game_id(game_id)
+        assert (parts["MundialitoId"], parts["TeamAId"], parts["TeamBId"]) == (4, team_a, team_b)
+
+        rows = df[df["GameId"] == game_id]
+        assert rows.loc[rows["TeamId"] == team_a, "Goals"].sum() == goals_a
+        assert rows.loc[rows["TeamId"] == team_b, "Goals"].sum() == goals_b
+
+    assert import_is_current(storage, 4, staging_hash(df))
+
+
+def test_restaging_after_import_finds_the_registered_ids(storage, config):
+    df, mund_date = stage_file(storage, config, 4)
+    import_staging(storage, df, mund_date)
+
+    again, _ = stage_file(storage, config, 4)
+
+    assert not again["IsNewPlayer"].any() and not again["IsNewTeam"].any()
+    assert staging_hash(again) == staging_hash(df)
+    assert import_is_current(storage, 4, staging_hash(again))
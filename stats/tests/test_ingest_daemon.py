@@ -0,0 +1,150 @@
+import os
+import queue
+
+import pytest
+
+from ingest_daemon import RETRY_MAX_SECONDS, poll, record_results
+
+SETTLE = 2.0
+RETRY = 5.0
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "input"
+    folder.mkdir()
+    return folder
+
+
+def write(folder, name, text="Name,TeamName\n"):
+    path = folder / name
+    path.write_text(text)
+    return str(path)
+
+
+class Watcher:
+    """poll/record_results with the daemon's state, on a clock the test sets."""
+
+    def __init__(self, folder, queue_size=16):
+        self.folder = str(folder)
+        self.pending, self.handled, self.retries = {}, {}, {}
+        self.work = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue()
+
+    def poll(self, now):
+        record_results(self.results, self.handled, self.retries, RETRY, now)
+        return poll(self.folder, self.pending, self.handled, self.retries, self.work, SETTLE, now)
+
+    def take(self):
+        items = []
+        while not self.work.empty():
+            items.append(self.work.get_nowait())
+        return items
+
+    def report(self, items, ok):
+        for _, path, signature in items:
+            self.results.put((path, signature, ok))
+
+
+def test_a_file_is_queued_once_it_has_settled(folder):
+    path = write(folder, "mundialito_5_2026-01-03.csv")
+    write(folder, "mundialito_5_2026-01-03_STAGING.csv")
+    write(folder, "notes.csv")
+    watcher = Watcher(folder)
+
+    assert watcher.poll(0.0) == 0
+    assert watcher.poll(1.0) == 0
+    assert watcher.poll(2.5) == 1
+
+    [(mund_id, queued_path, _)] = watcher.take()
+    assert (mund_id, queued_path) == (5, path)
+
+    # handled: not queued again while unchanged
+    assert watcher.poll(10.0) == 0
+
+
+def test_a_changed_file_restarts_the_settle_wait(folder):
+    path = write(folder, "mundialito_5_2026-01-03.csv")
+    watcher = Watcher(folder)
+    watcher.poll(0.0)
+
+    with open(path, "a") as f:
+        f.write("still being copied\n")
+
+    assert watcher.poll(2.5) == 0
+    assert watcher.poll(4.0) == 0
+    assert watcher.poll(4.6) == 1
+
+
+def test_a_full_queue_leaves_files_pending(folder):
+    write(folder, "mundialito_5_2026-01-03.csv")
+    write(folder, "mundialito_6_2026-01-10.csv")
+    watcher = Watcher(folder, queue_size=1)
+    watcher.poll(0.0)
+
+    assert watcher.poll(3.0) == 1
+    assert len(watcher.pending) == 1
+
+    watcher.take()
+    assert watcher.poll(3.5) == 1
+    assert watcher.pending == {}
+
+
+def test_a_failed_import_is_retried_with_backoff(folder):
+    path = write(folder, "mundialito_5_2026-01-03.csv")
+    watcher = Watcher(folder)
+    watcher.poll(0.0)
+    watcher.poll(3.0)
+    watcher.report(watcher.take(), ok=False)
+
+    # first failure: wait RETRY, then settle again
+    assert watcher.poll(4.0) == 0
+    assert path not in watcher.handled
+    assert watcher.retries[path][1:] == (1, 4.0 + RETRY)
+    assert watcher.poll(8.0) == 0
+    assert watcher.poll(9.5) == 0
+    assert watcher.poll(11.5) == 1
+
+    # second failure: the wait doubles
+    watcher.report(watcher.take(), ok=False)
+    watcher.poll(12.0)
+    assert watcher.retries[path][1:] == (2, 12.0 + 2 * RETRY)
+
+    # success clears the backoff
+    watcher.poll(22.0)
+    assert watcher.poll(24.5) == 1
+    watcher.report(watcher.take(), ok=True)
+    watcher.poll(25.0)
+
+    assert watcher.retries == {}
+    assert watcher.poll(100.0) == 0
+
+
+def test_backoff_is_capped(folder):
+    path = write(folder, "mundialito_5_2026-01-03.csv")
+    watcher = Watcher(folder)
+    watcher.poll(0.0)
+    signature = watcher.pending[path][0]
+
+    for _ in range(11):
+        watcher.results.put((path, signature, False))
+        watcher.poll(0.0)
+
+    assert watcher.retries[path][1] == 11
+    assert watcher.retries[path][2] == RETRY_MAX_SECONDS
+
+
+def test_a_file_changed_while_waiting_to_retry_is_picked_up_at_once(folder):
+    path = write(folder, "mundialito_5_2026-01-03.csv")
+    watcher = Watcher(folder)
+    watcher.poll(0.0)
+    watcher.poll(3.0)
+    watcher.report(watcher.take(), ok=False)
+    watcher.poll(4.0)
+
+    with open(path, "a") as f:
+        f.write("fixed\n")
+    os.utime(path, ns=(0, 10 ** 18))
+
+    assert watcher.poll(5.0) == 0
+    assert watcher.poll(7.5) == 1
@@ -0,0 +1,33 @@
+from conftest import dump, stage_file
+from import_data_current import import_staging
+from schema_migrations import MIGRATIONS, applied_versions, migrate
+
+
+def versions(storage):
+    cursor = storage.cursor()
+    try:
+        return set(applied_versions(cursor))
+    finally:
+        cursor.close()
+
+
+def test_a_new_database_is_fully_migrated(storage):
+    assert versions(storage) == {version for version, _, _ in MIGRATIONS}
+    assert migrate(storage) == []
+
+
+def test_leaderboard_migration_fills_stored_tournaments(storage, config):
+    df, mund_date = stage_file(storage, config, 4)
+    import_staging(storage, df, mund_date)
+    expected = dump(storage)
+
+    # as before the leaderboard and career tables were versioned
+    cursor = storage.cursor()
+    for sql in ("DELETE FROM PlayerLeaderboard", "DELETE FROM PlayerCareerStats", "DELETE FROM TeamHistory",
+                "DELETE FROM SchemaVersion WHERE Version IN (3, 5)"):
+        cursor.execute(sql)
+    storage.commit()
+    cursor.close()
+
+    assert migrate(storage) == [3, 5]
+    assert dump(storage) == expected
@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import dump, make_config, stage_file
+from import_data_current import import_staging
+from storage import open_storage
+from upsert_import import upsert_staging
+
+
+@pytest.fixture
+def other_storage(tmp_path):
+    storage = open_storage(make_config(tmp_path, "other"))
+    yield storage
+    storage.close()
+
+
+def changed(df):
+    """The same tournament with some assists corrected and its last game struck off."""
+    df = df.copy()
+    df.loc[df.index[::5], "Assists"] += 1
+
+    return df[df["GameId"] != df["GameId"].max()].reset_index(drop=True)
+
+
+def test_upsert_matches_full_reimport(storage, other_storage, config):
+    df, mund_date = stage_file(storage, config, 4)
+
+    for target in (storage, other_storage):
+        import_staging(target, df, mund_date)
+
+    # staged again once the tournament is registered: no new players or teams
+    restaged, _ = stage_file(storage, config, 4)
+    update = changed(restaged)
+
+    import_staging(storage, update, mund_date)
+    summary = upsert_staging(other_storage, update, mund_date)
+
+    assert dump(storage) == dump(other_storage)
+    assert summary["PlayerGameStats"]["deleted"] > 0
+    assert summary["PlayerGameStats"]["updated"] > 0
+    assert summary["Games"]["unchanged"] > 0
+
+
+def test_upsert_of_unchanged_rows_writes_nothing(storage, config):
+    df, mund_date = stage_file(storage, config, 4)
+    import_staging(storage, df, mund_date)
+    before = dump(storage, skip={"ImportManifest"})
+
+    restaged, _ = stage_file(storage, config, 4)
+    summary = upsert_staging(storage, restaged, mund_date)
+
+    assert all(s["inserted"] == s["updated"] == s["deleted"] == 0 for s in summary.values())
+    assert dump(storage, skip={"ImportManifest"}) == before